@@ -1,9 +1,10 @@
 import logging
 from fastapi import APIRouter, Body
-from app.utils.paths import DB_PATH
-import sqlite3
+from app.services.connections import read_connection
+from app.services.rollups import rollup_query
 import pandas as pd
 from app.ai.insights import build_insight_prompt, call_ai_model
+from app.services.response_cache import cached_response
 
 # Configure logger
 logger = logging.getLogger("active_contexts")
@@ -43,6 +44,7 @@ def add_timestamp_columns(df):
 # ✅ General Active Contexts
 # ---------------------------------------------------------
 @router.get("/active-contexts/{table_name}")
+@cached_response
 def fetch_active_context_chart(
     table_name: str,
     limit: int = 200,
@@ -52,7 +54,7 @@ def fetch_active_context_chart(
 ):
     logger.info(f"[GENERAL] Fetching active-contexts for table={table_name}")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     if granularity == "daily":
@@ -91,11 +93,17 @@ def fetch_active_context_chart(
         """
 
     try:
-        df = pd.read_sql_query(query, conn)
+        # Hourly/daily views read the ingest-time rollups when the date range allows
+        df = rollup_query(
+            conn, table_name, "ACTIVECONTEXTSMAX", "max_active", granularity,
+            start_date, end_date, limit, by_jvm=False
+        )
+        if df is None:
+            df = pd.read_sql_query(query, conn)
     except Exception as e:
         logger.error(f"[GENERAL] Query failed: {e}")
         conn.close()
-        return {"rows": [], "message": "Error executing query"}
+        return {"rows": [], "message": "Error executing query", "error": str(e)}
     finally:
         conn.close()
 
@@ -110,6 +118,7 @@ def fetch_active_context_chart(
 # ✅ JVM-specific Active Contexts
 # ---------------------------------------------------------
 @router.get("/active-contexts-jvm")
+@cached_response
 def fetch_active_contexts_by_jvm(
     table_name: str,
     limit: int = 200,
@@ -119,7 +128,7 @@ def fetch_active_contexts_by_jvm(
 ):
     logger.info(f"[JVM] Fetching JVM data for table={table_name}")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     if granularity == "daily":
@@ -161,11 +170,16 @@ def fetch_active_contexts_by_jvm(
         """
 
     try:
-        df = pd.read_sql_query(query, conn)
+        df = rollup_query(
+            conn, table_name, "ACTIVECONTEXTSMAX", "max_active", granularity,
+            start_date, end_date, limit
+        )
+        if df is None:
+            df = pd.read_sql_query(query, conn)
     except Exception as e:
         logger.error(f"[JVM] Query failed: {e}")
         conn.close()
-        return {"rows": [], "message": "Error executing JVM query"}
+        return {"rows": [], "message": "Error executing JVM query", "error": str(e)}
     finally:
         conn.close()
 
@@ -188,7 +202,7 @@ def active_contexts_ai_query(
     start_date: str = None,
     end_date: str = None,
 ):
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     query = f"""
@@ -239,7 +253,7 @@ def active_contexts_ai_insights(
     start_date: str = None,
     end_date: str = None,
 ):
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     # Build query (unchanged)
@@ -282,7 +296,12 @@ def active_contexts_ai_insights(
         """
 
     try:
-        df = pd.read_sql_query(query, conn)
+        df = rollup_query(
+            conn, table_name, "ACTIVECONTEXTSMAX", "max_active", granularity,
+            start_date, end_date, limit
+        )
+        if df is None:
+            df = pd.read_sql_query(query, conn)
     except Exception:
         conn.close()
         return {
@@ -1,11 +1,12 @@
 import logging
-import sqlite3
 import pandas as pd
 from fastapi import APIRouter
 
-from app.utils.paths import DB_PATH
+from app.services.analytics import run_aggregate
+from app.services.connections import read_connection
 from app.api.endpoints.tables import get_current_active_folder
 from app.ai.insights import build_insight_prompt, call_ai_model
+from app.services.response_cache import cached_response
 
 # ---------------------------------------------------------
 # Logger setup
@@ -48,6 +49,7 @@ def resolve_table_name(base: str) -> str | None:
 # GLOBAL SUMMARY ENDPOINT
 # ---------------------------------------------------------
 @router.get("/active-sessions-summary")
+@cached_response
 def active_sessions_summary():
     logger.info("[SUMMARY] Fetching global session summary")
 
@@ -57,42 +59,55 @@ def active_sessions_summary():
 
     table_q = f'"{table}"'
 
-    query = f"SELECT * FROM {table_q}"
-
-    conn = sqlite3.connect(DB_PATH)
+    # Aggregated in one scan by the analytics engine instead of loading every row
+    query = f"""
+        SELECT
+            COUNT(DISTINCT JVM_ID) AS total_jvms,
+            COUNT(*) AS total_samples,
+            MAX(ACTIVESESSIONSMAX) AS peak_active_sessions,
+            AVG(ACTIVESESSIONSMAX) AS avg_active_sessions,
+            COALESCE(SUM(SESSIONSCREATED), 0) AS total_sessions_created,
+            COALESCE(SUM(SESSIONSDESTROYED), 0) AS total_sessions_destroyed,
+            COALESCE(SUM(SESSIONSACTIVATED), 0) AS total_sessions_activated,
+            COALESCE(SUM(SESSIONSPASSIVATED), 0) AS total_sessions_passivated,
+            MAX(ELAPSEDSECONDS) AS max_elapsed_seconds,
+            MIN(LE_TIMESTAMP) AS min_ts,
+            MAX(LE_TIMESTAMP) AS max_ts,
+            (
+                SELECT JVM_ID FROM {table_q}
+                WHERE ACTIVESESSIONSMAX = (SELECT MAX(ACTIVESESSIONSMAX) FROM {table_q})
+                ORDER BY LE_TIMESTAMP, JVM_ID
+                LIMIT 1
+            ) AS jvm_with_peak_sessions
+        FROM {table_q}
+    """
 
     try:
-        df = pd.read_sql_query(query, conn)
+        rows = run_aggregate(query, [table])
     except Exception as e:
         logger.error(f"[SUMMARY] Query failed: {e}")
-        conn.close()
-        return {"summary": {}, "message": "Error executing summary query"}
-    finally:
-        conn.close()
+        return {"summary": {}, "message": "Error executing summary query", "error": str(e)}
 
-    if df.empty:
+    row = rows[0] if rows else {}
+    if not row.get("total_samples"):
         return {"summary": {}, "message": "No session data found"}
 
-    # Convert timestamps
-    df["iso"] = df["LE_TIMESTAMP"].apply(
-        lambda x: pd.to_datetime(int(x), unit="ms").isoformat()
-    )
+    def iso(ts):
+        return pd.to_datetime(int(ts), unit="ms").isoformat() if ts is not None else None
 
     summary = {
-        "total_jvms": df["JVM_ID"].nunique(),
-        "total_samples": len(df),
-        "peak_active_sessions": df["ACTIVESESSIONSMAX"].max(),
-        "avg_active_sessions": float(df["ACTIVESESSIONSMAX"].mean()),
-        "total_sessions_created": int(df["SESSIONSCREATED"].sum()),
-        "total_sessions_destroyed": int(df["SESSIONSDESTROYED"].sum()),
-        "total_sessions_activated": int(df["SESSIONSACTIVATED"].sum()),
-        "total_sessions_passivated": int(df["SESSIONSPASSIVATED"].sum()),
-        "max_elapsed_seconds": float(df["ELAPSEDSECONDS"].max()),
-        "min_timestamp_iso": df["iso"].min(),
-        "max_timestamp_iso": df["iso"].max(),
-        "jvm_with_peak_sessions": df.loc[
-            df["ACTIVESESSIONSMAX"].idxmax(), "JVM_ID"
-        ] if df["ACTIVESESSIONSMAX"].max() > 0 else None
+        "total_jvms": row["total_jvms"],
+        "total_samples": row["total_samples"],
+        "peak_active_sessions": row["peak_active_sessions"],
+        "avg_active_sessions": float(row["avg_active_sessions"]) if row["avg_active_sessions"] is not None else None,
+        "total_sessions_created": int(row["total_sessions_created"]),
+        "total_sessions_destroyed": int(row["total_sessions_destroyed"]),
+        "total_sessions_activated": int(row["total_sessions_activated"]),
+        "total_sessions_passivated": int(row["total_sessions_passivated"]),
+        "max_elapsed_seconds": float(row["max_elapsed_seconds"]) if row["max_elapsed_seconds"] is not None else None,
+        "min_timestamp_iso": iso(row["min_ts"]),
+        "max_timestamp_iso": iso(row["max_ts"]),
+        "jvm_with_peak_sessions": row["jvm_with_peak_sessions"] if (row["peak_active_sessions"] or 0) > 0 else None,
     }
 
     return {"summary": summary}
@@ -118,7 +133,7 @@ def active_sessions_ai_summary(limit: int = 200):
         LIMIT {limit}
     """
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
 
     try:
         df = pd.read_sql_query(query, conn)
@@ -157,6 +172,7 @@ def active_sessions_ai_summary(limit: int = 200):
 # GRAPH DATA ENDPOINT
 # ---------------------------------------------------------
 @router.get("/active-sessions-graph")
+@cached_response
 def active_sessions_graph(limit: int = 500):
     logger.info("[GRAPH] Building active sessions graph data")
 
@@ -173,14 +189,14 @@ def active_sessions_graph(limit: int = 500):
         LIMIT {limit}
     """
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
 
     try:
         df = pd.read_sql_query(query, conn)
     except Exception as e:
         logger.error(f"[GRAPH] Query failed: {e}")
         conn.close()
-        return {"nodes": [], "edges": [], "message": "Error executing graph query"}
+        return {"nodes": [], "edges": [], "message": "Error executing graph query", "error": str(e)}
     finally:
         conn.close()
 
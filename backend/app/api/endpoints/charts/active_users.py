@@ -1,14 +1,15 @@
 import logging
 import math
-import sqlite3
 from typing import Any
 
 import pandas as pd
 from fastapi import APIRouter, Body, Query
 
-from app.utils.paths import DB_PATH
+from app.services.connections import read_connection
+from app.services.rollups import rollup_query
 from app.ai.insights import build_insight_prompt, call_ai_model
 from app.api.endpoints.tables import get_current_active_folder
+from app.services.response_cache import cached_response
 
 router = APIRouter()
 
@@ -123,7 +124,7 @@ def active_users_ai_insights(
     if not table_name:
         return {"rows": [], "ai_insights": "No active folder set."}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     if jvm != "all":
@@ -174,7 +175,13 @@ def active_users_ai_insights(
         """
 
     try:
-        df = pd.read_sql_query(query, conn)
+        # Hourly/daily views read the ingest-time rollups when the date range allows
+        df = rollup_query(
+            conn, table_name, "TOTALACTIVEUSERCOUNT", "total_active_users", granularity,
+            start_date, end_date, limit, jvm=None if jvm == "all" else jvm
+        )
+        if df is None:
+            df = pd.read_sql_query(query, conn)
     except Exception as e:
         logger.error("Query failed for table=%s | error=%s", table_name, e)
         return {"rows": [], "ai_insights": "Query execution failed.", "error": str(e), "table_name": table_name}
@@ -214,7 +221,7 @@ def active_users_ai_query(
         logger.warning("AI query aborted: no active folder")
         return {"answer": "No active folder set."}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     if jvm != "all":
@@ -262,6 +269,7 @@ Answer concisely.
 
 
 @router.get("/active-users-jvms")
+@cached_response
 def active_users_jvms(start_date: str = None, end_date: str = None):
     """
     Returns unique JVM_ID list from the active users table (folder_SMHealthStats).
@@ -271,7 +279,7 @@ def active_users_jvms(start_date: str = None, end_date: str = None):
         logger.warning("No active folder set (active-users-jvms)")
         return {"jvms": []}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     where_clause = build_where(start_date, end_date)
 
     query = f"""
@@ -287,7 +295,7 @@ def active_users_jvms(start_date: str = None, end_date: str = None):
         df = pd.read_sql_query(query, conn)
     except Exception as e:
         logger.error("active-users-jvms query failed for table=%s | error=%s", table_name, e)
-        return {"jvms": []}
+        return {"jvms": [], "error": str(e), "table_name": table_name}
     finally:
         conn.close()
 
@@ -301,6 +309,7 @@ def active_users_jvms(start_date: str = None, end_date: str = None):
 from datetime import datetime
 
 @router.get("/active-users-date-range")
+@cached_response
 def active_users_date_range():
     """
     Returns oldest and latest date from <activeFolder>_SMHealthStats.
@@ -309,7 +318,7 @@ def active_users_date_range():
     if not table_name:
         return {"start_date": None, "end_date": None, "message": "No active folder set"}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     query = f"""
         SELECT MIN(LE_TIMESTAMP) AS min_ts, MAX(LE_TIMESTAMP) AS max_ts
         FROM "{table_name}"
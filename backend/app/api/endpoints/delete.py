@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 from app.services.files import clear_directory
-from app.utils.paths import OUTPUT_DIR, LOG_DIR, UPLOAD_DIR, DB_PATH
+from app.utils.paths import OUTPUT_DIR, LOG_DIR, UPLOAD_DIR, DB_PATH, ARCHIVE_DIR
+from app.services.archive import delete_archive
+from app.services.connections import active_folder, deactivate_folder, delete_database, delete_folder_database
+from app.services.response_cache import invalidate_responses
 from app.utils.logging import logger
 
 router = APIRouter()
@@ -9,14 +12,17 @@ router = APIRouter()
 @router.post("/delete-data")
 def delete_data(options: dict):
     """
-    Delete selected data categories: database, output_csv, logs, uploads.
+    Delete selected data categories: database (with the Parquet archives), output_csv, logs, uploads.
+    "folders": [...] deletes the database or archive of each listed upload only.
+    Deleting the active upload's database leaves no dataset active.
     """
     summary = {}
 
     if options.get("database"):
         try:
-            if DB_PATH.exists():
-                DB_PATH.unlink()
+            clear_directory(ARCHIVE_DIR)
+            deactivate_folder(active_folder())
+            if delete_database():
                 logger.info("🗑️ Deleted database %s", DB_PATH)
                 summary["database"] = "deleted"
             else:
@@ -25,6 +31,16 @@ def delete_data(options: dict):
             logger.error("❌ Failed to delete database: %s", e)
             summary["database"] = f"error: {e}"
 
+    for folder in options.get("folders") or []:
+        try:
+            deleted = delete_folder_database(folder)
+            deleted = delete_archive(folder) or deleted
+            deactivate_folder(folder)
+            summary[folder] = "deleted" if deleted else "not found"
+        except Exception as e:
+            logger.error("❌ Failed to delete database of upload %s: %s", folder, e)
+            summary[folder] = f"error: {e}"
+
     if options.get("output_csv"):
         try:
             clear_directory(OUTPUT_DIR)
@@ -46,4 +62,5 @@ def delete_data(options: dict):
         except Exception as e:
             summary["uploads"] = f"error: {e}"
 
+    invalidate_responses("delete-data")
     return {"summary": summary}
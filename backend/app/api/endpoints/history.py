@@ -3,6 +3,8 @@ from pathlib import Path
 from app.utils.paths import UPLOAD_DIR, OUTPUT_DIR
 from app.utils.logging import logger
 from app.services.files import list_files_in_folder
+from app.services.columnar import PARQUET_SUFFIX
+from app.services.archive import is_archived
 
 router = APIRouter()
 
@@ -11,7 +13,8 @@ router = APIRouter()
 def upload_history():
     """
     Return JSON list of all past uploads and their linked output_csv files.
-    Includes created_at timestamp for each folder so frontend can identify latest.
+    Includes created_at timestamp for each folder so frontend can identify latest,
+    and whether its tables are archived (rehydrated when it is activated).
     """
     history = []
 
@@ -23,7 +26,10 @@ def upload_history():
             output_folder = OUTPUT_DIR / folder.name
             output_files = []
             if output_folder.exists():
-                output_files = [str(f.resolve()) for f in output_folder.glob("*.csv")]
+                output_files = [
+                    str(f.resolve()) for f in output_folder.iterdir()
+                    if f.suffix in (".csv", PARQUET_SUFFIX)
+                ]
 
             entry = {
                 "folder_name": folder.name,
@@ -31,7 +37,8 @@ def upload_history():
                 "upload_files": upload_files,
                 "output_path": str(output_folder.resolve()) if output_folder.exists() else None,
                 "output_files": output_files,
-                "created_at": folder.stat().st_mtime  # ✅ add timestamp
+                "created_at": folder.stat().st_mtime,  # ✅ add timestamp
+                "archived": is_archived(folder.name)
             }
             history.append(entry)
 
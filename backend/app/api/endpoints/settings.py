@@ -25,12 +25,8 @@ def update_settings(settings: dict):
     # Load existing config (if any)
     existing = load_config()
 
-    # Merge settings (new values override old)
-    merged = {
-        "days": settings.get("days", existing.get("days", 7)),
-        "autoDelete": settings.get("autoDelete", existing.get("autoDelete", False)),
-        "language": settings.get("language", existing.get("language", "en")),
-    }
+    # Merge settings (new values override old, every known key is kept)
+    merged = {key: settings.get(key, value) for key, value in existing.items()}
 
     save_config(merged)
     return {"message": "Settings saved", "settings": merged}
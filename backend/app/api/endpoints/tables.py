@@ -1,13 +1,16 @@
 from fastapi import APIRouter
-import json
+from app.services.archive import ensure_hot, record_activation
+from app.services.connections import active_dataset, set_active_dataset
 from app.services.database import list_tables, get_table
-from app.utils.paths import ACTIVE_TABLES_PATH
+from app.services.preview import preview_folder, set_preview_folder
+from app.services.response_cache import cached_response, invalidate_responses
 from app.utils.logging import logger
 
 router = APIRouter()
 
 
 @router.get("/tables")
+@cached_response
 def list_all_tables():
     """
     List all tables currently in SQLite.
@@ -18,6 +21,7 @@ def list_all_tables():
 
 
 @router.get("/table/{table_name}")
+@cached_response
 def fetch_table(table_name: str, limit: int = 100):
     """
     Fetch rows from a given table.
@@ -29,21 +33,17 @@ def fetch_table(table_name: str, limit: int = 100):
 @router.get("/active-tables")
 def get_active_tables():
     """
-    Return currently active tables from active_tables.json.
+    Return currently active tables (active_tables.json, kept in memory).
+    "preview" is True while they only hold samples and the full import is still running.
     """
-    if ACTIVE_TABLES_PATH.exists():
-        try:
-            with open(ACTIVE_TABLES_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return {
-                "folder": data.get("folder"),
-                "tables": data.get("tables", [])
-            }
-        except Exception as e:
-            logger.error("❌ Failed to read active_tables.json: %s", e)
-            return {"folder": None, "tables": [], "error": str(e)}
-    else:
+    data = active_dataset()
+    if data["folder"] is None:
         return {"folder": None, "tables": []}
+    return {
+        "folder": data["folder"],
+        "tables": data["tables"],
+        "preview": data["folder"] == preview_folder()
+    }
 
 
 
@@ -52,11 +52,15 @@ def set_active_tables_from_history(payload: dict):
     """
     Update active_tables.json when user clicks 'View Dashboard' from Upload History.
     Payload should include {"folder_name": "..."}.
+    An archived upload is rehydrated into SQLite first.
     """
     folder_name = payload.get("folder_name")
     if not folder_name:
         return {"message": "❌ folder_name is required"}
 
+    ensure_hot(folder_name)
+    record_activation(folder_name)
+
     # Build table names based on convention
     tables = []
     tables_info = []
@@ -67,13 +71,10 @@ def set_active_tables_from_history(payload: dict):
             tables_info.append({"tableName": t})
 
     # ✅ Write new JSON structure
-    data = {
-        "folder": folder_name,
-        "tables": tables
-    }
-
-    with open(ACTIVE_TABLES_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    set_active_dataset(folder_name, tables)
+    if preview_folder() != folder_name:
+        set_preview_folder(None)
+    invalidate_responses(f"{folder_name} activated from history")
 
     logger.info("💾 Active tables updated from history: %s", tables)
 
@@ -87,31 +88,24 @@ def set_active_tables_from_history(payload: dict):
 @router.get("/current-active-folder")
 def get_current_active_folder():
     """
-    Returns the currently active folder from active_tables.json.
+    Returns the currently active folder from active_tables.json (read once, then kept
+    in memory and updated on activation, so this does no I/O).
     JSON structure expected:
     {
         "folder": "20251218_upload1",
         "tables": ["20251218_upload1_MethodContextStats", ...]
     }
     """
-    if not ACTIVE_TABLES_PATH.exists():
-        logger.warning("⚠️ active_tables.json not found")
+    data = active_dataset()
+    folder = data["folder"]
+    if folder is None:
+        logger.warning("⚠️ No active folder set")
         return {"folder": None, "message": "No active folder set"}
 
-    try:
-        with open(ACTIVE_TABLES_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    logger.info(f"📁 Current active folder: {folder}")
 
-        folder = data.get("folder")
-        tables = data.get("tables", [])
-
-        logger.info(f"📁 Current active folder: {folder}")
-
-        return {
-            "folder": folder,
-            "tables": tables
-        }
-
-    except Exception as e:
-        logger.error(f"❌ Failed to read active_tables.json: {e}")
-        return {"folder": None, "tables": [], "error": str(e)}
\ No newline at end of file
+    return {
+        "folder": folder,
+        "tables": data["tables"],
+        "preview": folder == preview_folder()
+    }
@@ -1,11 +1,13 @@
 import logging
-import sqlite3
 import pandas as pd
 from fastapi import APIRouter,Body
 
-from app.utils.paths import DB_PATH
+from app.services.analytics import run_aggregate
+from app.services.catalog import table_exists
+from app.services.log_cube import log_cube_name_for, log_event_counts
 from app.api.endpoints.tables import get_current_active_folder
 from app.ai.insights import build_insight_prompt, call_ai_model
+from app.services.response_cache import cached_response
 
 # ---------------------------------------------------------
 # Logger setup
@@ -45,785 +47,241 @@ def resolve_table_name(base: str) -> str | None:
 
 
 # ---------------------------------------------------------
-# API: Log Events Error Summary
+# Log event summary: logger x level counts for many levels in one scan
 # ---------------------------------------------------------
-@router.get("/log-events-error")
-def fetch_log_events_error(limit: int = 20):
-    """
-    Returns top ERROR loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
-    """
-
-    logger.info("[LOGEVENTS] Fetching ERROR log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
+LEVELS = ["ERROR", "WARN", "INFO", "DEBUG", "TRACE", "FATAL", "OFF"]
 
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
+# ALL means: every level (no LE_LEVEL filter)
+ALL_LEVELS = "ALL"
 
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
+# Source tables and the logger name reported for them (None: their LE_LOGGERNAME column)
+LOG_EVENT_SOURCES = [
+    ("MISCLOGEVENTS", None),
+    ("JMXNOTIFICATIONS", None),
+    ("METHODCONTEXTS", "wt.method.MethodContext.contextMBean.finish"),
+    ("SERVLETREQUESTS", "wt.servlet.ServletRequestMonitor.requestMBean.finish"),
+]
 
-    # ---------------------------------------------------------
-    # SQLite-compatible rewritten query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'ERROR'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'ERROR'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'ERROR'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'ERROR'
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
-    """
 
-    logger.info(f"[LOGEVENTS] Executing query:\n{query}")
+def _to_ms(date: str) -> int:
+    # Same instant as the chart filters' strftime('%s', date) * 1000 (naive dates are UTC)
+    return int(pd.Timestamp(date).value // 1_000_000)
 
-    conn = sqlite3.connect(DB_PATH)
 
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No ERROR log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
-
-
-# ---------------------------------------------------------
-# API: Log Events WARN Summary
-# ---------------------------------------------------------
-@router.get("/log-events-warn")
-def fetch_log_events_warn(limit: int = 20):
+def parse_levels(levels: str | None) -> list[str]:
     """
-    Returns top WARN loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
+    "error,warn" -> ["ERROR", "WARN"]; empty -> every level plus ALL.
     """
+    parsed = [level.strip().upper() for level in (levels or "").split(",") if level.strip()]
+    return list(dict.fromkeys(parsed)) or LEVELS + [ALL_LEVELS]
 
-    logger.info("[LOGEVENTS-WARN] Fetching WARN log summary")
 
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
+def _existing_cubes(tables: list[str]) -> list[str | None]:
+    # Cubes are missing while a dataset is in preview mode or for tables imported before them
+    return [log_cube_name_for(t) if table_exists(log_cube_name_for(t)) else None for t in tables]
 
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
 
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
+def summarize_log_events(
+    levels: list[str],
+    limit: int = 20,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    jvm: str | None = None,
+) -> dict:
+    """
+    Top loggers per level across MiscLogEvents, JmxNotifications, MethodContexts and
+    ServletRequests, computed by one aggregation for all levels. Counts come from the
+    hourly log event cubes built at ingest (the tables themselves are only read for the
+    partial hours at the edges of the time range, or when a table has no cube).
+    The top limit loggers of each level are ranked in SQL (ROW_NUMBER per LE_LEVEL, and a
+    LIMIT over every level for ALL), so only the returned rows leave the database.
+    Returns {"levels": {level: {"rows": [...]}}} (rows ordered by COUNT DESC,
+    LE_LOGGERNAME, LE_LEVEL, at most limit per level), or {"levels": {}, "message"}.
+    """
+    tables = [resolve_table_name(base) for base, _ in LOG_EVENT_SOURCES]
+    if not all(tables):
+        return {"levels": {}, "message": "Active folder tables not found"}
 
-    # ---------------------------------------------------------
-    # SQLite-compatible WARN query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'WARN'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'WARN'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'WARN'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'WARN'
-            GROUP BY LE_LEVEL
+    filters, params = [], []
+    specific = [level for level in levels if level != ALL_LEVELS]
+    if ALL_LEVELS not in levels:
+        filters.append(f"LE_LEVEL IN ({', '.join('?' for _ in specific)})")
+        params.extend(specific)
+    if jvm:
+        filters.append("JVM_ID = ?")
+        params.append(jvm)
+    try:
+        start_ms = _to_ms(start_date) if start_date else None
+        end_ms = _to_ms(end_date) if end_date else None
+    except ValueError as e:
+        return {"levels": {}, "message": "Invalid date", "error": str(e)}
+
+    selects, query_params, query_tables = [], [], []
+    for table_name, cube_name, (_, fixed_logger) in zip(tables, _existing_cubes(tables), LOG_EVENT_SOURCES):
+        logger_sql = f"'{fixed_logger}' AS LE_LOGGERNAME" if fixed_logger else "LE_LOGGERNAME"
+        group_sql = "LE_LEVEL" if fixed_logger else "LE_LOGGERNAME, LE_LEVEL"
+        counts_sql, counts_params, counts_tables = log_event_counts(
+            table_name, cube_name, group_sql, filters, params, start_ms, end_ms
+        )
+        selects.append(f"""
+            SELECT {logger_sql}, LE_LEVEL, SUM(n) AS COUNT
+            FROM ({counts_sql})
+            GROUP BY {group_sql}""")
+        query_params.extend(counts_params)
+        query_tables.extend(counts_tables)
+
+    # SUMMARY_LEVEL: the requested level each row is ranked for
+    limit = max(limit, 0)
+    arms = []
+    if specific:
+        arms.append("""
+        SELECT LE_LOGGERNAME, LE_LEVEL, COUNT, LE_LEVEL AS SUMMARY_LEVEL
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY LE_LEVEL ORDER BY COUNT DESC, LE_LOGGERNAME) AS LEVEL_RANK
+            FROM LOGEVENTS
         )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
+        WHERE LEVEL_RANK <= ?""")
+        query_params.append(limit)
+    if ALL_LEVELS in levels:
+        arms.append(f"""
+        SELECT * FROM (
+            SELECT LE_LOGGERNAME, LE_LEVEL, COUNT, '{ALL_LEVELS}' AS SUMMARY_LEVEL
+            FROM LOGEVENTS
+            ORDER BY COUNT DESC, LE_LOGGERNAME, LE_LEVEL
+            LIMIT ?
+        )""")
+        query_params.append(limit)
+
+    union = "\n\n            UNION ALL\n".join(selects)
+    ranked = "\n\n        UNION ALL\n".join(arms)
+    query = f"""
+        WITH LOGEVENTS AS ({union}
+        ){ranked}
+        ORDER BY COUNT DESC, LE_LOGGERNAME, LE_LEVEL
     """
-
-    logger.info(f"[LOGEVENTS-WARN] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
+    logger.info(f"[LOGEVENTS] Executing summary query for {levels}:\n{query}")
 
     try:
-        df = pd.read_sql_query(query, conn)
+        rows = run_aggregate(query, query_tables, query_params)
     except Exception as e:
-        logger.error(f"[LOGEVENTS-WARN] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing WARN log events query"}
-    finally:
-        conn.close()
+        logger.error(f"[LOGEVENTS] Summary query failed: {e}")
+        return {"levels": {}, "message": "Error executing log events query", "error": str(e)}
+
+    by_level = {}
+    for row in rows:
+        by_level.setdefault(row.pop("SUMMARY_LEVEL"), []).append(row)
+
+    summary = {}
+    for level in levels:
+        level_rows = by_level.get(level, [])
+        entry = {"rows": level_rows}
+        if not level_rows and limit:
+            entry["message"] = "No log events found" if level == ALL_LEVELS else f"No {level} log events found"
+        summary[level] = entry
+    return {"levels": summary}
 
-    if df.empty:
-        return {"rows": [], "message": "No WARN log events found"}
 
-    return {"rows": df.to_dict(orient="records")}
+def _level_view(level: str, limit: int, start_date: str | None, end_date: str | None, jvm: str | None) -> dict:
+    summary = summarize_log_events([level], limit, start_date, end_date, jvm)
+    if level not in summary["levels"]:
+        return {"rows": [], **{k: v for k, v in summary.items() if k != "levels"}}
+    return summary["levels"][level]
 
 
 # ---------------------------------------------------------
-# API: Log Events INFO Summary
+# API: Log Events summary for several levels
 # ---------------------------------------------------------
-@router.get("/log-events-info")
-def fetch_log_events_info(limit: int = 20):
-    """
-    Returns top INFO loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
+@router.get("/log-events-summary")
+@cached_response
+def fetch_log_events_summary(
+    levels: str | None = None,
+    limit: int = 20,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    jvm: str | None = None,
+):
     """
-
-    logger.info("[LOGEVENTS-INFO] Fetching INFO log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
-
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    # ---------------------------------------------------------
-    # SQLite-compatible INFO query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'INFO'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'INFO'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'INFO'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'INFO'
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
+    Top loggers for each requested level (comma separated, default: every level and ALL),
+    keyed by level, from a single pass over the log event tables.
+    Optional start_date/end_date (inclusive) and JVM_ID filters.
     """
-
-    logger.info(f"[LOGEVENTS-INFO] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-INFO] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing INFO log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No INFO log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
+    logger.info(f"[LOGEVENTS-SUMMARY] levels={levels} jvm={jvm} start={start_date} end={end_date}")
+    return summarize_log_events(parse_levels(levels), limit, start_date, end_date, jvm)
 
 
 # ---------------------------------------------------------
-# API: Log Events DEBUG Summary
+# API: Log Events per level (views over the summary)
 # ---------------------------------------------------------
-@router.get("/log-events-debug")
-def fetch_log_events_debug(limit: int = 20):
+@router.get("/log-events-error")
+@cached_response
+def fetch_log_events_error(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-    Returns top DEBUG loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
+    Returns top ERROR loggers aggregated across the log event tables.
     """
+    return _level_view("ERROR", limit, start_date, end_date, jvm)
 
-    logger.info("[LOGEVENTS-DEBUG] Fetching DEBUG log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
 
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    # ---------------------------------------------------------
-    # SQLite-compatible DEBUG query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'DEBUG'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'DEBUG'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'DEBUG'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'DEBUG'
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
+@router.get("/log-events-warn")
+@cached_response
+def fetch_log_events_warn(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-
-    logger.info(f"[LOGEVENTS-DEBUG] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-DEBUG] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing DEBUG log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No DEBUG log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
+    Returns top WARN loggers aggregated across the log event tables.
+    """
+    return _level_view("WARN", limit, start_date, end_date, jvm)
 
 
-# ---------------------------------------------------------
-# API: Log Events TRACE Summary
-# ---------------------------------------------------------
-@router.get("/log-events-trace")
-def fetch_log_events_trace(limit: int = 20):
+@router.get("/log-events-info")
+@cached_response
+def fetch_log_events_info(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-    Returns top TRACE loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
+    Returns top INFO loggers aggregated across the log event tables.
     """
+    return _level_view("INFO", limit, start_date, end_date, jvm)
 
-    logger.info("[LOGEVENTS-TRACE] Fetching TRACE log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
-
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
 
-    # ---------------------------------------------------------
-    # SQLite-compatible TRACE query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'TRACE'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'TRACE'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'TRACE'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'TRACE'
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
+@router.get("/log-events-debug")
+@cached_response
+def fetch_log_events_debug(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-
-    logger.info(f"[LOGEVENTS-TRACE] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-TRACE] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing TRACE log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No TRACE log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
+    Returns top DEBUG loggers aggregated across the log event tables.
+    """
+    return _level_view("DEBUG", limit, start_date, end_date, jvm)
 
 
-# ---------------------------------------------------------
-# API: Log Events ALL Levels Summary
-# ---------------------------------------------------------
-@router.get("/log-events-all")
-def fetch_log_events_all(limit: int = 20):
+@router.get("/log-events-trace")
+@cached_response
+def fetch_log_events_trace(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-    Returns top ALL loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
-
-    NOTE:
-    LE_LEVEL='ALL' means: include ALL levels (no WHERE filter)
+    Returns top TRACE loggers aggregated across the log event tables.
     """
+    return _level_view("TRACE", limit, start_date, end_date, jvm)
 
-    logger.info("[LOGEVENTS-ALL] Fetching ALL-level log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
 
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    # ---------------------------------------------------------
-    # SQLite-compatible ALL-levels query (NO WHERE LE_LEVEL filter)
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
+@router.get("/log-events-all")
+@cached_response
+def fetch_log_events_all(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
+    Returns top loggers of ALL levels aggregated across the log event tables.
+    """
+    return _level_view(ALL_LEVELS, limit, start_date, end_date, jvm)
 
-    logger.info(f"[LOGEVENTS-ALL] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-ALL] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing ALL log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
 
-# ---------------------------------------------------------
-# API: Log Events FATAL Summary
-# ---------------------------------------------------------
 @router.get("/log-events-fatal")
-def fetch_log_events_fatal(limit: int = 20):
-    """
-    Returns top FATAL loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
+@cached_response
+def fetch_log_events_fatal(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-
-    logger.info("[LOGEVENTS-FATAL] Fetching FATAL log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
-
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    # ---------------------------------------------------------
-    # SQLite-compatible FATAL query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'FATAL'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'FATAL'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'FATAL'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'FATAL'
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
+    Returns top FATAL loggers aggregated across the log event tables.
     """
+    return _level_view("FATAL", limit, start_date, end_date, jvm)
 
-    logger.info(f"[LOGEVENTS-FATAL] Executing query:\n{query}")
 
-    conn = sqlite3.connect(DB_PATH)
-
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-FATAL] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing FATAL log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No FATAL log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
-
-
-# ---------------------------------------------------------
-# API: Log Events OFF Summary
-# ---------------------------------------------------------
 @router.get("/log-events-off")
-def fetch_log_events_off(limit: int = 20):
+@cached_response
+def fetch_log_events_off(limit: int = 20, start_date: str | None = None, end_date: str | None = None, jvm: str | None = None):
     """
-    Returns top OFF loggers aggregated across:
-    - MiscLogEvents
-    - JmxNotifications
-    - MethodContexts
-    - ServletRequests
+    Returns top OFF loggers aggregated across the log event tables.
     """
-
-    logger.info("[LOGEVENTS-OFF] Fetching OFF log summary")
-
-    # Resolve dynamic table names
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "message": "Active folder tables not found"}
-
-    # Quote table names for SQLite
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    # ---------------------------------------------------------
-    # SQLite-compatible OFF query
-    # ---------------------------------------------------------
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {misc_q}
-            WHERE LE_LEVEL = 'OFF'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {jmx_q}
-            WHERE LE_LEVEL = 'OFF'
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {method_q}
-            WHERE LE_LEVEL = 'OFF'
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 
-                'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                LE_LEVEL,
-                COUNT(*) AS COUNT
-            FROM {servlet_q}
-            WHERE LE_LEVEL = 'OFF'
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
-    """
-
-    logger.info(f"[LOGEVENTS-OFF] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-OFF] Query failed: {e}")
-        conn.close()
-        return {"rows": [], "message": "Error executing OFF log events query"}
-    finally:
-        conn.close()
-
-    if df.empty:
-        return {"rows": [], "message": "No OFF log events found"}
-
-    return {"rows": df.to_dict(orient="records")}
+    return _level_view("OFF", limit, start_date, end_date, jvm)
 
 
 # ---------------------------------------------------------
@@ -837,75 +295,17 @@ def log_events_ai_insights(level: str = "ALL", limit: int = 50):
 
     logger.info(f"[LOGEVENTS-AI-INSIGHTS] Level={level}")
 
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"rows": [], "ai_insights": "Active folder tables not found."}
-
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    where = "" if level.upper() == "ALL" else f"WHERE LE_LEVEL = '{level.upper()}'"
-
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT LE_LOGGERNAME, LE_LEVEL, COUNT(*) AS COUNT
-            FROM {misc_q}
-            {where}
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT LE_LOGGERNAME, LE_LEVEL, COUNT(*) AS COUNT
-            FROM {jmx_q}
-            {where}
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                   LE_LEVEL,
-                   COUNT(*) AS COUNT
-            FROM {method_q}
-            {where}
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                   LE_LEVEL,
-                   COUNT(*) AS COUNT
-            FROM {servlet_q}
-            {where}
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
-    """
-
-    logger.info(f"[LOGEVENTS-AI-INSIGHTS] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception:
-        conn.close()
+    level = level.upper()
+    summary = summarize_log_events([level], limit)
+    if level not in summary["levels"]:
+        if summary["message"] == "Active folder tables not found":
+            return {"rows": [], "ai_insights": "Active folder tables not found."}
         return {"rows": [], "ai_insights": "Error executing log events query."}
-    finally:
-        conn.close()
 
-    if df.empty:
+    rows = summary["levels"][level]["rows"]
+    if not rows:
         return {"rows": [], "ai_insights": "No log events found."}
 
-    rows = df.to_dict(orient="records")
-
     prompt = build_insight_prompt(rows, f"Log Events ({level})", "summary")
     ai_text = call_ai_model(prompt)
 
@@ -930,78 +330,17 @@ def log_events_ai_query(
 
     logger.info(f"[LOGEVENTS-AI-QUERY] Level={level}")
 
-    # Resolve dynamic tables
-    misc_table = resolve_table_name("MISCLOGEVENTS")
-    jmx_table = resolve_table_name("JMXNOTIFICATIONS")
-    method_table = resolve_table_name("METHODCONTEXTS")
-    servlet_table = resolve_table_name("SERVLETREQUESTS")
-
-    if not all([misc_table, jmx_table, method_table, servlet_table]):
-        return {"answer": "Active folder tables not found."}
-
-    misc_q = f'"{misc_table}"'
-    jmx_q = f'"{jmx_table}"'
-    method_q = f'"{method_table}"'
-    servlet_q = f'"{servlet_table}"'
-
-    # WHERE clause logic
-    where = "" if level.upper() == "ALL" else f"WHERE LE_LEVEL = '{level.upper()}'"
-
-    query = f"""
-        WITH LOGEVENTS AS (
-            SELECT LE_LOGGERNAME, LE_LEVEL, COUNT(*) AS COUNT
-            FROM {misc_q}
-            {where}
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT LE_LOGGERNAME, LE_LEVEL, COUNT(*) AS COUNT
-            FROM {jmx_q}
-            {where}
-            GROUP BY LE_LOGGERNAME, LE_LEVEL
-
-            UNION ALL
-
-            SELECT 'wt.method.MethodContext.contextMBean.finish' AS LE_LOGGERNAME,
-                   LE_LEVEL,
-                   COUNT(*) AS COUNT
-            FROM {method_q}
-            {where}
-            GROUP BY LE_LEVEL
-
-            UNION ALL
-
-            SELECT 'wt.servlet.ServletRequestMonitor.requestMBean.finish' AS LE_LOGGERNAME,
-                   LE_LEVEL,
-                   COUNT(*) AS COUNT
-            FROM {servlet_q}
-            {where}
-            GROUP BY LE_LEVEL
-        )
-        SELECT *
-        FROM LOGEVENTS
-        ORDER BY COUNT DESC
-        LIMIT {limit}
-    """
-
-    logger.info(f"[LOGEVENTS-AI-QUERY] Executing query:\n{query}")
-
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        df = pd.read_sql_query(query, conn)
-    except Exception as e:
-        logger.error(f"[LOGEVENTS-AI-QUERY] Query failed: {e}")
-        conn.close()
+    level = level.upper()
+    summary = summarize_log_events([level], limit)
+    if level not in summary["levels"]:
+        if summary["message"] == "Active folder tables not found":
+            return {"answer": "Active folder tables not found."}
         return {"answer": "Error executing log events query."}
-    finally:
-        conn.close()
 
-    if df.empty:
+    rows = summary["levels"][level]["rows"]
+    if not rows:
         return {"answer": "No log events found for this level."}
 
-    rows = df.to_dict(orient="records")
-
     prompt = f"""
     You are an observability assistant.
     The user asked: "{question}"
@@ -1,11 +1,11 @@
 import logging
-import sqlite3
 from typing import Any
 
 import pandas as pd
 from fastapi import APIRouter, Body, Query
 
-from app.utils.paths import DB_PATH
+from app.services.catalog import table_columns, table_exists
+from app.services.connections import read_connection
 from app.api.endpoints.tables import get_current_active_folder
 from app.ai.insights import call_ai_model  # Ollama integration
 
@@ -33,21 +33,6 @@ def _resolve_full_table_name(short_table: str) -> str | None:
     return f"{folder}_{short_table}"
 
 
-def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-        (table_name,)
-    )
-    return cur.fetchone() is not None
-
-
-def _get_columns(conn: sqlite3.Connection, table_name: str) -> list[str]:
-    cur = conn.cursor()
-    cur.execute(f'PRAGMA table_info("{table_name}")')
-    return [r[1] for r in cur.fetchall()]
-
-
 def _json_safe(value: Any):
     try:
         import numpy as np
@@ -113,13 +98,14 @@ def perf_ai_query(
 
     logger.info("Resolved full_table=%s", full_table)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     try:
-        if not _table_exists(conn, full_table):
+        # Existence and columns come from the schema catalog (no PRAGMA per request)
+        if not table_exists(full_table):
             logger.warning("Table not found in DB: %s", full_table)
             return {"answer": f"Table not found: {full_table}"}
 
-        cols = _get_columns(conn, full_table)
+        cols = table_columns(full_table)
         if not cols:
             return {"answer": f"No columns in table: {full_table}"}
 
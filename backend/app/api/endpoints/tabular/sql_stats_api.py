@@ -2,11 +2,13 @@ from fastapi import APIRouter, Query
 from typing import Optional
 
 from app.services.sql_stats import fetch_top_sql_stats
+from app.services.response_cache import cached_response
 
 router = APIRouter(prefix="/sql-stats", tags=["SQL Stats"])
 
 
 @router.get("/")
+@cached_response
 def get_sql_stats(
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
@@ -15,10 +17,12 @@ def get_sql_stats(
     min_secs: Optional[float] = None,
     sort_by_elapsed_time: bool = False,
     page: int = Query(1, ge=1),
-    page_size: int = Query(50, ge=1, le=500)
+    page_size: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
 ):
     """
     Full SQL Stats API with filtering, sorting, and pagination.
+    Pass the returned next_cursor to read the following page (page is then ignored).
     """
     return fetch_top_sql_stats(
         start_time=start_time,
@@ -28,5 +32,6 @@ def get_sql_stats(
         min_secs=min_secs,
         sort_by_elapsed_time=sort_by_elapsed_time,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor
     )
@@ -1,19 +1,31 @@
 import datetime
+import io
 import json
 import logging
+import re
 import shutil
-import subprocess
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from app.services.database import import_csv_to_sqlite
-
-from fastapi import APIRouter, UploadFile, File
+from app.services.archive import archive_cold_folders, ensure_hot, record_activation
+from app.services.database import drop_table, import_jmxdata_to_sqlite, table_name_for
+from app.services.ingest import import_csv_folder, import_file_preview, import_source_folders, import_staged_preview
+from app.services.connections import active_dataset, set_active_dataset
+from app.services.columnar import PARQUET_SUFFIX, convert_jmxdata_to_parquet, convert_many_to_parquet
+from app.services.config import load_config
+from app.services.converter import converter_worker, convert_many
+from app.services.jobs import IngestJob, job_queue
+from app.services.upload_manifest import COPY_CHUNK_BYTES, copy_and_hash, find_upload, record_upload
+from app.services.profile import ConversionProfile, parse_profile
+from app.services.preview import finish_preview, set_preview_folder
+from app.services.response_cache import invalidate_responses
+
+from fastapi import APIRouter, UploadFile, File, Form
+from starlette.concurrency import run_in_threadpool
 
 from app.utils.paths import (
     UPLOAD_DIR,
     OUTPUT_DIR,
-    JAVA_DIR,
-    ACTIVE_TABLES_PATH,
     PROPERTY_DIR,
     SERVER_LOGS_DIR,
 )
@@ -22,6 +34,12 @@ from app.utils.paths import (
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Zip members streamed straight to a per-upload folder, by extension
+ROUTED_EXTENSIONS = {
+    ".log": SERVER_LOGS_DIR,
+    ".properties": PROPERTY_DIR,
+}
+
 
 def _create_upload_folder_name() -> str:
     today = datetime.datetime.now().strftime("%Y%m%d")
@@ -29,87 +47,201 @@ def _create_upload_folder_name() -> str:
     return f"{today}_upload{len(existing) + 1}"
 
 
-def _save_upload_to_disk(file: UploadFile, dest_path: Path) -> None:
+def _save_upload_to_disk(file: UploadFile, dest_path: Path) -> str:
+    """
+    Saves the upload and returns the sha256 of its content (hashed while writing).
+    """
     logger.info("💾 [UPLOAD] Saving uploaded file to: %s", dest_path)
     dest_path.parent.mkdir(parents=True, exist_ok=True)
-    with dest_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    return copy_and_hash(file.file, dest_path)
 
 
-def _extract_zip(zip_path: Path, extract_to: Path) -> None:
-    logger.info("🧩 [UPLOAD] Extracting zip: %s -> %s", zip_path, extract_to)
-    extract_to.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        zf.extractall(extract_to)
-    logger.info("✅ [UPLOAD] Zip extraction completed")
+def _write_active_tables(folder_name: str, tables: list[str], preview: bool = False) -> None:
+    """
+    Activate folder_name's tables. With preview=True they only hold samples until the
+    full import finishes (reported by /active-tables and the X-Dataset-Preview header).
+    """
+    set_preview_folder(folder_name if preview else None)
+    record_activation(folder_name)
+    logger.info("📝 [UPLOAD] Writing active_tables.json: %s", {"folder": folder_name, "tables": tables})
+
+    try:
+        set_active_dataset(folder_name, tables)
+        logger.info("✅ [UPLOAD] active_tables.json updated successfully")
+    except Exception as e:
+        logger.error("❌ [UPLOAD] Failed to write active_tables.json: %s", e)
+    invalidate_responses(f"upload {folder_name} activated")
 
 
-def _iter_files(root: Path):
-    yield from (p for p in root.rglob("*") if p.is_file())
+def _copy_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        dest.unlink()
+    with zf.open(info) as src, dest.open("wb") as out:
+        shutil.copyfileobj(src, out, COPY_CHUNK_BYTES)
 
 
-def _move_matching_files(extract_root: Path, folder_name: str, ext: str, target_root: Path) -> int:
+def _source_name(prefix: str, member_name: str, taken: list[str]) -> str:
     """
-    Moves files with given extension directly under:
-      target_root/<folder_name>/
-    (Subfolders inside the zip are NOT preserved.)
+    Name of the server/node a JMXData.gz belongs to, from its folders inside the bundle
+    (and the nested zip it came from), e.g. "node1_MethodServer". Unique within one upload.
     """
-    moved = 0
-    dest_base = target_root / folder_name
-    dest_base.mkdir(parents=True, exist_ok=True)
+    parts = [prefix] + list(Path(member_name).parent.parts)
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", "_".join(p for p in parts if p)).strip("_") or "source"
+    unique, n = name, 2
+    while unique in taken:
+        unique, n = f"{name}_{n}", n + 1
+    return unique
 
-    for f in _iter_files(extract_root):
-        if f.suffix.lower() != ext.lower():
+
+def _route_zip(zf: zipfile.ZipFile, folder_name: str, jmx_dir: Path, summary: dict, prefix: str = "") -> None:
+    """
+    One pass over the archive's central directory:
+      *.log        -> SERVER_LOGS_DIR/<folder_name>/ (flattened)
+      *.properties -> PROPERTY_DIR/<folder_name>/ (flattened)
+      JMXData.gz   -> jmx_dir/<source>/JMXData.gz (every one of them, one per server/node)
+      *.zip        -> opened in memory and routed the same way
+    Everything else is skipped without touching the disk.
+    """
+    for info in zf.infolist():
+        if info.is_dir():
             continue
 
-        dest = dest_base / f.name  # FLATTEN (no nested folder like "test/")
+        name = Path(info.filename).name
+        suffix = Path(name).suffix.lower()
 
-        logger.info("📁 [UPLOAD] Moving %s file: %s -> %s", ext, f, dest)
         try:
-            if dest.exists():
-                dest.unlink()
-            shutil.move(str(f), str(dest))
-            moved += 1
+            if suffix == ".zip":
+                logger.info("🧩 [UPLOAD] Routing nested zip in memory: %s", info.filename)
+                nested_prefix = "_".join(p for p in [prefix, Path(info.filename).stem] if p)
+                with zipfile.ZipFile(io.BytesIO(zf.read(info))) as nested:
+                    _route_zip(nested, folder_name, jmx_dir, summary, nested_prefix)
+
+            elif suffix in ROUTED_EXTENSIONS:
+                dest = ROUTED_EXTENSIONS[suffix] / folder_name / name  # FLATTEN (no nested folder like "test/")
+                logger.info("📁 [UPLOAD] Streaming %s file: %s -> %s", suffix, info.filename, dest)
+                _copy_member(zf, info, dest)
+                summary[suffix] += 1
+
+            elif name.lower() == "jmxdata.gz":
+                source = _source_name(prefix, info.filename, [s for s, _ in summary["jmxdata"]])
+                dest = jmx_dir / source / "JMXData.gz"
+                logger.info("✅ [UPLOAD] Found JMXData.gz at: %s (source %s)", info.filename, source)
+                _copy_member(zf, info, dest)
+                summary["jmxdata"].append((source, dest))
+
+        except zipfile.BadZipFile as e:
+            logger.error("❌ [UPLOAD] Failed reading nested zip %s: %s", info.filename, e)
         except Exception as e:
-            logger.error("❌ [UPLOAD] Failed moving %s file %s: %s", ext, f, e)
+            logger.error("❌ [UPLOAD] Failed routing %s: %s", info.filename, e)
 
-    logger.info("✅ [UPLOAD] Moved %d '%s' files to %s", moved, ext, dest_base)
-    return moved
 
+def _route_upload(zip_path: Path, folder_name: str, jmx_dir: Path) -> dict:
+    """
+    Routes the members of the uploaded zip without extracting it.
+    Returns {".log": n, ".properties": n, "jmxdata": [(source, path), ...]}.
+    """
+    logger.info("🧩 [UPLOAD] Routing zip members: %s", zip_path)
+    summary = {ext: 0 for ext in ROUTED_EXTENSIONS}
+    summary["jmxdata"] = []
 
-def _find_jmxdata_gz(extract_root: Path) -> Path | None:
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        _route_zip(zf, folder_name, jmx_dir, summary)
+
+    logger.info(
+        "📦 [UPLOAD] File routing done | logs=%d properties=%d jmxdata=%d",
+        summary[".log"], summary[".properties"], len(summary["jmxdata"])
+    )
+    return summary
+
+
+def _run_java_converter(input_path: Path, output_folder: Path, on_table=None, profile: ConversionProfile | None = None) -> None:
     """
-    Finds JMXData.gz anywhere under extract_root (case-insensitive).
-    Returns first match.
+    Sends the conversion job to the long-lived Java converter worker
+    (compiled once, recompiled only when ConvertPerfToCsv.java changes).
     """
-    logger.info("🔎 [UPLOAD] Searching for JMXData.gz under: %s", extract_root)
+    logger.info("⚙️ [UPLOAD] Running Java converter on file: %s", input_path)
+    tables = converter_worker.convert(input_path, output_folder, on_table, profile.to_spec(converter=True) if profile else "")
+    logger.info("✅ [UPLOAD] Java conversion completed successfully (%d tables)", len(tables))
+
+
+def _run_python_converter(
+    input_path: Path,
+    output_folder: Path,
+    folder_name: str,
+    on_table=None,
+    profile: ConversionProfile | None = None,
+    on_staged=None,
+) -> list[dict]:
+    """
+    Decodes JMXData.gz in-process and imports every table straight into SQLite (no JVM, no CSV).
+    Writes conversion_summary.json to the output folder, same format as the Java converter.
+    on_table(table_name, rows) gets the bare table names, like the other converters report them;
+    on_staged(conn, table_name, staging_name) is passed to import_jmxdata_to_sqlite.
+    """
+    logger.info("⚙️ [UPLOAD] Running native JMXData decoder on file: %s", input_path)
+
+    def on_imported(table_name: str, rows: int):
+        if on_table:
+            on_table(table_name[len(folder_name) + 1:], rows)
 
-    matches = [f for f in _iter_files(extract_root) if f.name.lower() == "jmxdata.gz"]
-    if not matches:
-        logger.warning("⚠️ [UPLOAD] No JMXData.gz found in extracted zip")
-        return None
+    imported = import_jmxdata_to_sqlite(
+        input_path, folder_name, on_table=on_imported, profile=profile, on_staged=on_staged
+    )
 
-    if len(matches) > 1:
-        logger.warning("⚠️ [UPLOAD] Multiple JMXData.gz found (%d). Using first: %s", len(matches), matches[0])
+    tables_info = [{"tableName": table_name, "rows": int(rows)} for table_name, rows in imported]
+    summary = [
+        {"tableName": table_name[len(folder_name) + 1:], "rows": int(rows)}
+        for table_name, rows in imported
+    ]
+    with (output_folder / "conversion_summary.json").open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
 
-    logger.info("✅ [UPLOAD] Found JMXData.gz at: %s", matches[0])
-    return matches[0]
+    logger.info("✅ [UPLOAD] Native conversion completed: %d tables", len(tables_info))
+    return tables_info
 
 
-def _run_java_converter(input_path: Path, output_folder: Path) -> None:
+def _run_parquet_converter(input_path: Path, output_folder: Path, on_table=None, profile: ConversionProfile | None = None) -> None:
     """
-    Compiles and runs the Java converter (same behavior as your original code).
+    Decodes JMXData.gz in-process into one typed, zstd-compressed Parquet file per table
+    (imported afterwards like the Java converter's CSVs, without re-parsing text).
     """
-    logger.info("🛠️ [UPLOAD] Compiling Java converter...")
-    subprocess.run(["javac", "--release", "8", f"{JAVA_DIR}/ConvertPerfToCsv.java"], check=True)
+    logger.info("⚙️ [UPLOAD] Running native JMXData decoder (Parquet output) on file: %s", input_path)
+    tables = convert_jmxdata_to_parquet(input_path, output_folder, on_table=on_table, profile=profile)
 
-    logger.info("⚙️ [UPLOAD] Running Java converter on file: %s", input_path)
-    subprocess.run(
-        ["java", "-cp", str(JAVA_DIR), "ConvertPerfToCsv", str(input_path), str(output_folder)],
-        check=True
-    )
+    with (output_folder / "conversion_summary.json").open("w", encoding="utf-8") as f:
+        json.dump(tables, f, indent=2)
+
+    logger.info("✅ [UPLOAD] Parquet conversion completed: %d tables", len(tables))
+
+
+def _convert_sources(
+    converter: str,
+    sources: list[tuple[str, Path]],
+    output_folder: Path,
+    on_table=None,
+    profile: ConversionProfile | None = None,
+) -> list[tuple[str, Path]]:
+    """
+    Converts every JMXData.gz of a multi-server bundle in parallel (bounded by cores),
+    each into output_folder/<source>/. The "python" converter writes Parquet here, since
+    parallel decoders cannot all write to SQLite at once.
+    on_table(table_name, rows, source) is called as each source's table is converted.
+    Returns [(source, source_output_folder), ...].
+    """
+    source_folders = [(source, output_folder / source) for source, _ in sources]
+    jobs = [(path, source_folder) for (_, path), (_, source_folder) in zip(sources, source_folders)]
 
-    logger.info("✅ [UPLOAD] Java conversion completed successfully")
+    def on_source_table(index: int, table_name: str, rows: int):
+        if on_table:
+            on_table(table_name, rows, sources[index][0])
+
+    logger.info("⚙️ [UPLOAD] Converting %d JMXData.gz sources in parallel", len(sources))
+    if converter == "java":
+        convert_many(jobs, on_source_table, profile_spec=profile.to_spec(converter=True) if profile else "")
+    else:
+        convert_many_to_parquet(jobs, on_source_table, profile=profile)
+    return source_folders
 
 
 def _safe_cleanup_path(path: Path) -> None:
@@ -165,115 +297,268 @@ def _load_conversion_summary(folder_path: Path) -> list[dict]:
         logger.error("❌ [UPLOAD] Failed to read conversion_summary.json: %s", e)
         return []
 
-def _extract_nested_zips(extract_root: Path):
+@router.post("/upload")
+async def upload(file: UploadFile = File(...), profile: str | None = Form(None)):
     """
-    Finds ANY .zip inside the extracted parent zip (except JMXData.gz),
-    extracts them in-place, then deletes the nested zip.
+    Saves the uploaded zip and queues it for background ingest.
+    Returns immediately with a job id; poll /upload/jobs/{job_id} for progress.
+    profile is an optional JSON conversion profile limiting the tables, columns and
+    LE_TIMESTAMP window that are converted and imported, e.g.
+      {"tables": ["TopSQLStats", "ServletRequests"], "lastHours": 6}
     """
-    nested_zips = [f for f in _iter_files(extract_root) if f.suffix.lower() == ".zip"]
+    logger.info("📥 [UPLOAD] Starting upload process for file: %s", file.filename)
 
-    for z in nested_zips:
-        logger.info("🧩 [UPLOAD] Found nested zip: %s", z)
+    try:
+        conversion_profile = parse_profile(json.loads(profile)) if profile else None
+    except (ValueError, TypeError) as e:
+        logger.error("❌ [UPLOAD] Invalid conversion profile: %s", e)
+        return {"message": "Invalid conversion profile", "error": str(e)}
+    if conversion_profile:
+        logger.info("🎯 [UPLOAD] Conversion profile: %s", conversion_profile.to_spec())
 
-        try:
-            nested_target = z.parent / f"{z.stem}_unzipped"
-            nested_target.mkdir(parents=True, exist_ok=True)
+    # ✅ Create folder name
+    folder_name = _create_upload_folder_name()
+    folder_path = UPLOAD_DIR / folder_name
+    logger.info("📁 [UPLOAD] Creating upload folder: %s", folder_path)
+    folder_path.mkdir(parents=True, exist_ok=True)
 
-            logger.info("📦 [UPLOAD] Extracting nested zip: %s -> %s", z, nested_target)
-            with zipfile.ZipFile(z, "r") as zf:
-                zf.extractall(nested_target)
+    job = job_queue.create(folder_name, file.filename)
 
-            logger.info("🧹 [UPLOAD] Removing nested zip after extraction: %s", z)
-            z.unlink()
+    # ✅ Save uploaded zip (off the event loop), hashing it on the way
+    job.set_stage("saving")
+    uploaded_zip_path = folder_path / file.filename
+    content_hash = await run_in_threadpool(_save_upload_to_disk, file, uploaded_zip_path)
+    if conversion_profile:
+        # A partial conversion is only a duplicate of the same bundle with the same profile
+        content_hash = f"{content_hash}:{conversion_profile.to_spec()}"
+
+    # ✅ Same bundle uploaded before: re-activate its dataset instead of reprocessing
+    previous = await run_in_threadpool(find_upload, content_hash)
+    if previous:
+        logger.info("♻️ [UPLOAD] Duplicate of %s (sha256=%s), re-activating it", previous["folder"], content_hash[:12])
+        await run_in_threadpool(_safe_cleanup_path, folder_path)
+        tables = [t["tableName"] for t in previous["tables"]]
+        await run_in_threadpool(ensure_hot, previous["folder"])
+        await run_in_threadpool(_write_active_tables, previous["folder"], tables)
+        job.folder_name = previous["folder"]
+        job.finish({
+            "message": f"File already uploaded under directory {previous['folder']}, re-activated it",
+            "converter_success": True,
+            "csv_count": len(previous["tables"]),
+            "tables": previous["tables"],
+            "active_folder": previous["folder"],
+            "active_tables": tables,
+            "refresh_performance": True,
+            "duplicate": True,
+        })
+        return {
+            "message": f"Upload is a duplicate of {previous['folder']}",
+            "job_id": job.id,
+            "status_url": f"/upload/jobs/{job.id}",
+            "active_folder": previous["folder"],
+            "duplicate": True,
+        }
+
+    # ✅ Hand off to the ingest queue
+    job_queue.submit(
+        job,
+        lambda j: _process_upload(j, folder_name, folder_path, uploaded_zip_path, content_hash, conversion_profile)
+    )
 
-        except Exception as e:
-            logger.error("❌ [UPLOAD] Failed extracting nested zip %s: %s", z, e)
+    return {
+        "message": f"Upload queued under directory {folder_name}",
+        "job_id": job.id,
+        "status_url": f"/upload/jobs/{job.id}",
+        "active_folder": folder_name,
+    }
 
 
+@router.get("/upload/jobs")
+def list_upload_jobs():
+    """
+    Status of recent and running upload jobs.
+    """
+    return {"jobs": [job.to_dict() for job in job_queue.list()]}
 
-@router.post("/upload")
-async def upload(file: UploadFile = File(...)):
-    logger.info("📥 [UPLOAD] Starting upload process for file: %s", file.filename)
 
+@router.get("/upload/jobs/{job_id}")
+def get_upload_job(job_id: str):
+    """
+    Stage (saving, extracting, converting, importing, activating), per-table progress,
+    rows/sec and ETA of one upload job. "result" holds the final upload summary.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        return {"job_id": job_id, "status": "unknown", "error": "Job not found"}
+    return job.to_dict()
+
+
+def _process_upload(
+    job: IngestJob,
+    folder_name: str,
+    folder_path: Path,
+    uploaded_zip_path: Path,
+    content_hash: str,
+    profile: ConversionProfile | None = None,
+) -> dict:
+    """
+    Runs on the ingest queue: extract, route files, convert, import and activate one upload.
+    Returns the upload summary (or {"message", "error"} on failure).
+    """
     # Cleanup toggles
     CLEANUP_EXTRACTED = True
     CLEANUP_UPLOADED_ZIP = True  # set False to keep original zip
 
-    # ✅ Create folder name
-    folder_name = _create_upload_folder_name()
-    folder_path = UPLOAD_DIR / folder_name
-    logger.info("📁 [UPLOAD] Creating upload folder: %s", folder_path)
-    folder_path.mkdir(parents=True, exist_ok=True)
-
-    # ✅ Save uploaded zip
-    uploaded_zip_path = folder_path / file.filename
-    _save_upload_to_disk(file, uploaded_zip_path)
-
-    # ✅ Extract uploaded zip into temp folder
-    extract_root = folder_path / "_extracted"
+    # ✅ Route zip members in one pass (logs/properties streamed out, JMXData.gz files kept for the converter)
+    job.set_stage("extracting")
+    jmx_dir = folder_path / "_jmxdata"
+    routed_jmxdata = False
     try:
-        _extract_zip(uploaded_zip_path, extract_root)
-    #extract nested zips
-        _extract_nested_zips(extract_root)
-    except zipfile.BadZipFile as e:
-        logger.error("❌ [UPLOAD] Invalid zip file: %s", e)
-        _safe_cleanup_path(extract_root)
-        return {"message": "Invalid zip file", "error": str(e)}
-    except Exception as e:
-        logger.error("❌ [UPLOAD] Zip extraction failed: %s", e)
-        _safe_cleanup_path(extract_root)
-        return {"message": "Zip extraction failed", "error": str(e)}
+        try:
+            routed = _route_upload(uploaded_zip_path, folder_name, jmx_dir)
+        except zipfile.BadZipFile as e:
+            logger.error("❌ [UPLOAD] Invalid zip file: %s", e)
+            return {"message": "Invalid zip file", "error": str(e)}
+        except Exception as e:
+            logger.error("❌ [UPLOAD] Zip extraction failed: %s", e)
+            return {"message": "Zip extraction failed", "error": str(e)}
 
-    # ✅ Move .log and .properties files (flattened)
-    try:
-        logs_moved = _move_matching_files(extract_root, folder_name, ".log", SERVER_LOGS_DIR)
-        props_moved = _move_matching_files(extract_root, folder_name, ".properties", PROPERTY_DIR)
-        logger.info("📦 [UPLOAD] File routing done | logs=%d properties=%d", logs_moved, props_moved)
-    except Exception as e:
-        logger.error("❌ [UPLOAD] Error routing .log/.properties files: %s", e)
+        if not routed["jmxdata"]:
+            logger.error("❌ [UPLOAD] JMXData.gz not found. Cannot run converter.")
+            return {"message": "JMXData.gz not found in uploaded zip", "error": "Missing JMXData.gz"}
 
-    # ✅ Locate JMXData.gz and pass to converter
-    jmx_gz_path = _find_jmxdata_gz(extract_root)
-    if not jmx_gz_path:
-        logger.error("❌ [UPLOAD] JMXData.gz not found. Cannot run converter.")
+        routed_jmxdata = True
+        return _convert_and_import(job, folder_name, folder_path, routed["jmxdata"], content_hash, profile)
+    finally:
+        # ✅ Cleanup the routed JMXData.gz files and the uploaded zip, also when routing, conversion or import failed
         if CLEANUP_EXTRACTED:
-            _safe_cleanup_path(extract_root)
+            _safe_cleanup_path(jmx_dir)
         if CLEANUP_UPLOADED_ZIP:
             _safe_cleanup_path(uploaded_zip_path)
-        return {"message": "JMXData.gz not found in uploaded zip", "error": "Missing JMXData.gz"}
-
+            if not routed_jmxdata:
+                # Nothing to import: drop the upload folder (it would still count in
+                # _create_upload_folder_name) and the logs/properties routed out of the zip
+                _safe_cleanup_path(folder_path)
+                for directory in ROUTED_EXTENSIONS.values():
+                    _safe_cleanup_path(directory / folder_name)
+
+
+def _convert_and_import(
+    job: IngestJob,
+    folder_name: str,
+    folder_path: Path,
+    sources: list[tuple[str, Path]],
+    content_hash: str,
+    profile: ConversionProfile | None = None,
+) -> dict:
+    """
+    Convert, import and activate the routed JMXData.gz sources of one upload.
+    With progressiveIngest (single source), each table's sample is written and activated
+    as soon as the converter reports it, while the rest is still converting; the full
+    import then replaces every sample in one swap.
+    Returns the upload summary (or {"message", "error"} on failure).
+    """
     # ✅ Prepare output folder
     output_folder = OUTPUT_DIR / folder_name
     logger.info("📁 [UPLOAD] Creating output folder: %s", output_folder)
     output_folder.mkdir(parents=True, exist_ok=True)
 
-    # ✅ Run Java converter
-    try:
-        _run_java_converter(jmx_gz_path, output_folder)
-    except Exception as e:
-        logger.error("❌ [UPLOAD] Java converter failed: %s", e)
-        if CLEANUP_EXTRACTED:
-            _safe_cleanup_path(extract_root)
-        if CLEANUP_UPLOADED_ZIP:
-            _safe_cleanup_path(uploaded_zip_path)
-        return {"message": "Java converter failed", "error": str(e)}
-
-    # ✅ Import CSVs into SQLite (FIXED INDENTATION)
+    # ✅ Run converter ("java" -> CSVs, "parquet" -> typed Parquet files, "python" -> decode straight into SQLite)
+    config = load_config()
+    converter = config.get("converter", "java")
+    # The native decoder inserts straight into SQLite, its conversion is the import
+    direct_import = converter == "python" and len(sources) == 1
+    job.set_stage("importing" if direct_import else "converting")
     tables_info, tables = [], []
-    logger.info("📊 [UPLOAD] Importing CSV files into SQLite...")
 
-    csv_files = list(output_folder.glob("*.csv"))
-    logger.info("📦 [UPLOAD] CSV files found in output folder: %d", len(csv_files))
+    # ✅ Progressive ingest: samples of the tables converted so far are active while the rest converts
+    progressive = bool(config.get("progressiveIngest")) and len(sources) == 1
+    preview_limit = int(config.get("previewRows", 5000))
+    stratified = config.get("previewSampling", "stratified") == "stratified"
+    previews = []
+    previous_dataset = active_dataset()
+    # Samples of converted files are written off the converter's progress thread, in order
+    preview_pool = ThreadPoolExecutor(max_workers=1) if progressive and not direct_import else None
+
+    def activate_preview(preview: dict | None):
+        if preview:
+            previews.append(preview)
+            _write_active_tables(folder_name, [t["tableName"] for t in previews], preview=True)
+
+    def preview_converted(table_name: str):
+        suffix = PARQUET_SUFFIX if converter == "parquet" else ".csv"
+        activate_preview(import_file_preview(
+            output_folder / f"{table_name}{suffix}", folder_name, preview_limit, stratified, profile
+        ))
+
+    def preview_staged(conn, table_name: str, staging_name: str):
+        try:
+            activate_preview(import_staged_preview(conn, table_name, staging_name, preview_limit, stratified))
+        except Exception as e:
+            logger.error("❌ [UPLOAD] Failed to import preview of %s: %s", table_name, e)
+
+    def on_converted(table_name: str, rows: int, source: str | None = None):
+        # Progress always names the SQLite table (<folder>_<Table>) the rows end up in
+        job.add_expected_rows(rows)
+        job.table_done(table_name_for(Path(table_name), folder_name), rows, source)
+        if preview_pool:
+            preview_pool.submit(preview_converted, table_name)
+
+    jmx_gz_path = sources[0][1]
 
-    for csv_file in csv_files:
-        logger.info("➡️ [UPLOAD] Importing CSV: %s", csv_file)
+    imported, failed_tables = [], []
+    still_preview = False
+    try:
         try:
-            table_name, row_count = import_csv_to_sqlite(csv_file, folder_name)
-            logger.info("✅ [UPLOAD] Imported %s (%d rows)", table_name, row_count)
-            tables_info.append({"tableName": str(table_name), "rows": int(row_count)})
-            tables.append(str(table_name))
+            if len(sources) > 1:
+                source_folders = _convert_sources(converter, sources, output_folder, on_converted, profile)
+            elif converter == "python":
+                tables_info = _run_python_converter(
+                    jmx_gz_path, output_folder, folder_name, on_converted, profile,
+                    on_staged=preview_staged if progressive else None,
+                )
+                tables = [t["tableName"] for t in tables_info]
+                imported = tables_info
+            elif converter == "parquet":
+                _run_parquet_converter(jmx_gz_path, output_folder, on_converted, profile)
+            else:
+                _run_java_converter(jmx_gz_path, output_folder, on_converted, profile)
         except Exception as e:
-            logger.error("❌ [UPLOAD] Failed to import CSV %s: %s", csv_file, e)
+            label = "Java" if converter == "java" else "Native"
+            logger.error("❌ [UPLOAD] %s converter failed: %s", label, e)
+            return {"message": f"{label} converter failed", "error": str(e)}
+        finally:
+            if preview_pool:
+                preview_pool.shutdown(wait=True)
+
+        # ✅ Import CSV/Parquet files into SQLite (parallel parse, single writer)
+        if not direct_import:
+            job.set_stage("importing")
+            logger.info("📊 [UPLOAD] Importing CSV files into SQLite...")
+            if len(sources) > 1:
+                imported = import_source_folders(source_folders, folder_name, on_table=job.table_done, profile=profile)
+            else:
+                imported = import_csv_folder(output_folder, folder_name, on_table=job.table_done, profile=profile)
+    finally:
+        if previews:
+            # Samples whose full import failed (or never ran) must not pass for the full data
+            full = {info["tableName"] for info in imported}
+            failed_tables = [t["tableName"] for t in previews if t["tableName"] not in full]
+            for table_name in failed_tables:
+                logger.warning("⚠️ [UPLOAD] Full import of %s failed, dropping its preview sample", table_name)
+                drop_table(table_name)
+            still_preview = finish_preview(folder_name)
+            if still_preview and not imported:
+                # Nothing was fully imported: the dataset active before the previews comes back
+                logger.warning("⚠️ [UPLOAD] No table of %s was imported, reactivating the previous dataset", folder_name)
+                set_active_dataset(previous_dataset["folder"], previous_dataset["tables"])
+                invalidate_responses(f"upload {folder_name} failed")
+                still_preview = False
+
+    if not direct_import:
+        for info in imported:
+            tables_info.append(info)
+            tables.append(info["tableName"])
 
     # ✅ Fallback: if no CSVs registered, load conversion_summary.json
     if not tables_info:
@@ -288,23 +573,18 @@ async def upload(file: UploadFile = File(...)):
             logger.warning("⚠️ [UPLOAD] No fallback conversion summary available")
 
     # ✅ Write active_tables.json
-    active_json = {"folder": folder_name, "tables": tables}
-    logger.info("📝 [UPLOAD] Writing active_tables.json: %s", active_json)
-
-    try:
-        with open(ACTIVE_TABLES_PATH, "w", encoding="utf-8") as f:
-            json.dump(active_json, f, indent=2)
-        logger.info("✅ [UPLOAD] active_tables.json updated successfully")
-    except Exception as e:
-        logger.error("❌ [UPLOAD] Failed to write active_tables.json: %s", e)
+    job.set_stage("activating")
+    if not previews or still_preview:
+        _write_active_tables(folder_name, tables)
+    else:
+        logger.info("ℹ️ [UPLOAD] Another dataset was activated during the import, leaving it active")
 
-    # ✅ Cleanup extracted temp files
-    if CLEANUP_EXTRACTED:
-        _safe_cleanup_path(extract_root)
+    # ✅ Remember this content so a re-upload just re-activates it
+    if tables_info:
+        record_upload(content_hash, folder_name, job.filename, tables_info)
 
-    # ✅ Optional: cleanup uploaded zip too
-    if CLEANUP_UPLOADED_ZIP:
-        _safe_cleanup_path(uploaded_zip_path)
+    # ✅ Archive uploads that have not been opened for archiveAfterDays
+    archive_cold_folders()
 
     logger.info("🎉 [UPLOAD] Upload process completed for folder: %s", folder_name)
 
@@ -315,5 +595,6 @@ async def upload(file: UploadFile = File(...)):
         "tables": tables_info,
         "active_folder": folder_name,
         "active_tables": tables,
+        "failed_tables": failed_tables,
         "refresh_performance": True
     }
@@ -1,8 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
-from app.startup import ingest_latest_folder
+from app.startup import start_background_ingest
+from app.services.analytics import close_analytics
+from app.services.connections import close_connections
+from app.services.converter import converter_worker
+from app.services.jobs import job_queue
+from app.services.preview import preview_folder
+from app.services.response_cache import invalidate_responses
+from app.utils.logging import logger
 
 app = FastAPI()
 
@@ -14,12 +21,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Dataset-Preview"],
 )
 
+
+# ✅ Flag responses served while the active dataset only holds preview samples
+@app.middleware("http")
+async def dataset_preview_header(request: Request, call_next):
+    response = await call_next(request)
+    if preview_folder():
+        response.headers["X-Dataset-Preview"] = "true"
+    return response
+
 # ✅ API routes
 app.include_router(api_router)
 
 # ✅ Startup event
 @app.on_event("startup")
 def startup_event():
-    ingest_latest_folder()
+    invalidate_responses("startup")  # responses spilled to disk by a previous run
+    try:
+        converter_worker.start()
+    except Exception as e:
+        logger.error("❌ Java converter worker not started, will retry on first upload: %s", e)
+    start_background_ingest()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    job_queue.shutdown()
+    converter_worker.stop()
+    close_analytics()
+    close_connections()
@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Sequence
+
+import pandas as pd
+
+from app.services.config import cached_config
+from app.services.connections import read_connection
+from app.services.database import column_storage_classes, table_version
+from app.utils.logging import logger
+
+try:
+    import duckdb
+except ImportError:  # optional: only needed for the "duckdb" analytics engine
+    duckdb = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: without it batches are copied into DuckDB through pandas
+    pa = None
+
+ENGINES = ("sqlite", "duckdb")
+MB = 1024 * 1024
+
+# Rows copied from SQLite into DuckDB per batch
+LOAD_BATCH_ROWS = 100_000
+
+# Guards _duckdb, _loaded and _table_locks; never held while a table is copied
+_lock = threading.Lock()
+_duckdb = None
+# Tables copied into DuckDB: name -> (table version, bytes), least recently used first
+_loaded: "OrderedDict[str, tuple]" = OrderedDict()
+# One lock per table, so only loads of the same table wait for each other
+_table_locks: dict[str, threading.Lock] = {}
+
+
+def analytics_engine() -> str:
+    """
+    Engine configured for aggregation queries ("sqlite" or "duckdb"), from the cached
+    config (re-read only after the settings are saved).
+    """
+    engine = str(cached_config().get("analyticsEngine", "sqlite")).lower()
+    if engine not in ENGINES:
+        logger.warning("⚠️ Unknown analyticsEngine '%s', using sqlite", engine)
+        return "sqlite"
+    if engine == "duckdb" and duckdb is None:
+        logger.warning("⚠️ analyticsEngine 'duckdb' configured but duckdb is not installed, using sqlite")
+        return "sqlite"
+    return engine
+
+
+def _rows(cursor) -> list[dict]:
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _run_sqlite(query: str, params: Sequence[Any]) -> list[dict]:
+    conn = read_connection()
+    try:
+        return _rows(conn.execute(query, params))
+    finally:
+        conn.close()
+
+
+def _database():
+    global _duckdb
+    with _lock:
+        if _duckdb is None:
+            _duckdb = duckdb.connect(":memory:")
+            # SQLite's NULL ordering, so both engines sort ties the same way
+            _duckdb.execute("SET default_null_order = 'nulls_first_on_asc_last_on_desc'")
+            logger.info("🦆 Opened in-process DuckDB analytics engine")
+        return _duckdb
+
+
+def _memory_budget() -> int:
+    return int(cached_config().get("analyticsMemoryMb", 1024) or 0) * MB
+
+
+# SQLite storage class -> DuckDB type
+_DUCKDB_TYPES = {"integer": "BIGINT", "real": "DOUBLE", "text": "VARCHAR"}
+_ARROW_TYPES = {"BIGINT": "int64", "DOUBLE": "float64", "VARCHAR": "string"}
+_PANDAS_DTYPES = {"BIGINT": "Int64", "DOUBLE": "Float64", "VARCHAR": "string"}
+
+
+def _batch_data(batch: list[tuple], columns: list[str], types: list[str]) -> tuple[Any, int]:
+    """
+    One fetched batch as an Arrow table (a pandas frame without pyarrow) and its size in bytes.
+    """
+    if pa is not None:
+        arrays = [pa.array(values, type=_ARROW_TYPES[t]) for values, t in zip(zip(*batch), types)]
+        table = pa.Table.from_arrays(arrays, names=columns)
+        return table, table.nbytes
+    frame = pd.DataFrame.from_records(batch, columns=columns)
+    frame = frame.astype({c: _PANDAS_DTYPES[t] for c, t in zip(columns, types)})
+    return frame, int(frame.memory_usage(deep=True).sum())
+
+
+def _load_table(conn, db, table_name: str) -> int:
+    """
+    Copy table_name into DuckDB column by column (one Arrow table per batch) under a
+    staging name, then swap it in. Returns the copied size in bytes.
+    """
+    classes = column_storage_classes(conn, table_name)
+    columns = [c for c, _ in classes]
+    types = [_DUCKDB_TYPES[storage] for _, storage in classes]
+    select = ", ".join(f'CAST("{c}" AS TEXT)' if t == "VARCHAR" else f'"{c}"' for c, t in zip(columns, types))
+    definitions = ", ".join(f'"{c}" {t}' for c, t in zip(columns, types))
+    staging = f"{table_name}__load"
+
+    db.execute(f'DROP TABLE IF EXISTS "{staging}"')
+    db.execute(f'CREATE TABLE "{staging}" ({definitions})')
+    cursor = conn.execute(f'SELECT {select} FROM "{table_name}" ORDER BY rowid')
+    total = size = 0
+    while batch := cursor.fetchmany(LOAD_BATCH_ROWS):
+        data, nbytes = _batch_data(batch, columns, types)
+        db.register("_load_batch", data)
+        try:
+            db.execute(f'INSERT INTO "{staging}" SELECT * FROM _load_batch')
+        finally:
+            db.unregister("_load_batch")
+        total += len(batch)
+        size += nbytes
+
+    db.execute("BEGIN")
+    db.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    db.execute(f'ALTER TABLE "{staging}" RENAME TO "{table_name}"')
+    db.execute("COMMIT")
+    logger.info(
+        "🦆 Loaded %s into DuckDB (%d rows, %d columns, %.1f MB)", table_name, total, len(columns), size / MB
+    )
+    return size
+
+
+def _table_lock(table_name: str) -> threading.Lock:
+    with _lock:
+        return _table_locks.setdefault(table_name, threading.Lock())
+
+
+def _evict(db, keep: list[str]) -> None:
+    """
+    Drop the least recently used copies (other than keep) until the rest fit in analyticsMemoryMb.
+    """
+    budget = _memory_budget()
+    with _lock:
+        total = sum(size for _, size in _loaded.values())
+        evicted = []
+        for table_name in list(_loaded):
+            if total <= budget:
+                break
+            if table_name not in keep:
+                total -= _loaded.pop(table_name)[1]
+                evicted.append(table_name)
+
+    for table_name in evicted:
+        with _table_lock(table_name):
+            with _lock:
+                reloaded = table_name in _loaded
+            if not reloaded:
+                db.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                logger.info("🦆 Dropped %s from DuckDB (analyticsMemoryMb)", table_name)
+
+
+def _ensure_loaded(tables: Iterable[str]) -> None:
+    # Table names are case-insensitive in both engines
+    tables = list(dict.fromkeys(t.lower() for t in tables))
+    conn = read_connection()
+    db = _database().cursor()
+    try:
+        # One snapshot for the version checks and the copies
+        conn.execute("BEGIN")
+        for table_name in tables:
+            version = table_version(conn, table_name)
+            with _table_lock(table_name):
+                with _lock:
+                    current = _loaded.get(table_name)
+                    if current and current[0] == version:
+                        _loaded.move_to_end(table_name)
+                        continue
+                size = _load_table(conn, db, table_name)
+                with _lock:
+                    _loaded[table_name] = (version, size)
+                    _loaded.move_to_end(table_name)
+        _evict(db, tables)
+    finally:
+        db.close()
+        conn.close()
+
+
+def _run_duckdb(query: str, tables: Sequence[str], params: Sequence[Any]) -> list[dict]:
+    _ensure_loaded(tables)
+    cursor = _database().cursor()
+    try:
+        return _rows(cursor.execute(query, list(params)))
+    finally:
+        cursor.close()
+
+
+def run_aggregate(query: str, tables: Sequence[str], params: Sequence[Any] = ()) -> list[dict]:
+    """
+    Run a read-only aggregation over the given SQLite tables on the configured engine and
+    return its rows as dicts. With "duckdb" the tables are copied once into an in-process
+    DuckDB (columnar, vectorized, multi-threaded) and re-copied when they are replaced;
+    copies beyond analyticsMemoryMb are dropped, least recently used first.
+    The query text must be portable between the two dialects. DuckDB errors fall back to SQLite.
+    """
+    engine = analytics_engine()
+    started = time.perf_counter()
+    if engine == "duckdb":
+        try:
+            rows = _run_duckdb(query, tables, params)
+        except Exception as e:
+            logger.warning("⚠️ DuckDB query failed, falling back to SQLite: %s", e)
+            engine = "sqlite"
+    if engine == "sqlite":
+        rows = _run_sqlite(query, params)
+    logger.info("⏱️ [%s] %d rows in %.1f ms", engine, len(rows), (time.perf_counter() - started) * 1000)
+    return rows
+
+
+def close_analytics() -> None:
+    """
+    Drop every table copied into DuckDB and close it.
+    """
+    global _duckdb
+    with _lock:
+        if _duckdb is not None:
+            _duckdb.close()
+            _duckdb = None
+        _loaded.clear()
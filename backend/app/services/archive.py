@@ -0,0 +1,193 @@
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from app.services.columnar import PARQUET_COMPRESSION, PARQUET_SUFFIX, ROW_GROUP_ROWS, require_pyarrow
+from app.services.config import load_config
+from app.services.connections import active_folder, delete_folder_database, folder_databases, folder_db_path, write_connection
+from app.services.database import column_storage_classes, is_internal_table
+from app.services.ingest import import_csv_folder
+from app.services.jobs import job_queue
+from app.services.preview import preview_folder
+from app.services.response_cache import invalidate_responses
+from app.utils.paths import ARCHIVE_DIR, FOLDER_ACTIVITY_PATH
+from app.utils.logging import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: archiving is skipped without it
+    pa = None
+    pq = None
+
+DAY_SECONDS = 86_400
+
+_lock = threading.Lock()
+
+
+def _load_activity() -> dict:
+    if not FOLDER_ACTIVITY_PATH.exists():
+        return {}
+    try:
+        with FOLDER_ACTIVITY_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning("⚠️ Ignoring unreadable folder activity file %s: %s", FOLDER_ACTIVITY_PATH, e)
+        return {}
+
+
+def record_activation(folder: str) -> None:
+    """
+    Remember that folder was just activated (it stays hot for archiveAfterDays).
+    """
+    with _lock:
+        activity = _load_activity()
+        activity[folder] = time.time()
+        tmp_path = FOLDER_ACTIVITY_PATH.with_suffix(".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(activity, f, indent=2)
+            shutil.move(str(tmp_path), str(FOLDER_ACTIVITY_PATH))
+        except Exception as e:
+            logger.error("❌ Failed to write folder activity: %s", e)
+
+
+def archive_path(folder: str) -> Path:
+    return ARCHIVE_DIR / folder
+
+
+def is_archived(folder: str) -> bool:
+    # Only plain folder names found in ARCHIVE_DIR (never a path built from user input)
+    return folder in {p.name for p in ARCHIVE_DIR.iterdir() if p.is_dir() and p.suffix != ".tmp"}
+
+
+_ARROW_TYPES = {"integer": "int64", "real": "float64", "text": "string"}
+
+
+def _export_table(conn, table_name: str, out_path: Path) -> int:
+    classes = column_storage_classes(conn, table_name)
+    schema = pa.schema([(c, _ARROW_TYPES[storage]) for c, storage in classes])
+    select = ", ".join(f'CAST("{c}" AS TEXT)' if storage == "text" else f'"{c}"' for c, storage in classes)
+    cursor = conn.execute(f"SELECT {select} FROM '{table_name}' ORDER BY rowid")
+    rows = 0
+    with pq.ParquetWriter(out_path, schema, compression=PARQUET_COMPRESSION) as writer:
+        while batch := cursor.fetchmany(ROW_GROUP_ROWS):
+            columns = list(zip(*batch))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            rows += len(batch)
+    return rows
+
+
+def archive_folder(folder: str) -> list[dict]:
+    """
+    Export every table of an upload to ARCHIVE_DIR/<folder>/<Table>.parquet (zstd) and
+    delete its SQLite database. Rollups, indexes and statistics are rebuilt on rehydration.
+    Returns a list of {"tableName", "rows"}.
+    """
+    require_pyarrow()
+    target = archive_path(folder)
+    staging = target.with_name(f"{folder}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    exported = []
+    try:
+        with write_connection(folder) as conn:  # no import of this upload can start meanwhile
+            names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+            for table_name in names:
+                if is_internal_table(table_name) or not table_name.startswith(f"{folder}_"):
+                    continue
+                stem = table_name[len(folder) + 1:]
+                rows = _export_table(conn, table_name, staging / f"{stem}{PARQUET_SUFFIX}")
+                exported.append({"tableName": table_name, "rows": rows})
+        shutil.rmtree(target, ignore_errors=True)
+        staging.rename(target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    delete_folder_database(folder)
+    invalidate_responses(f"{folder} archived")
+    size_mb = sum(f.stat().st_size for f in target.iterdir()) / (1024 * 1024)
+    logger.info("🧊 Archived %s: %d tables, %.1f MB of Parquet", folder, len(exported), size_mb)
+    return exported
+
+
+def rehydrate_folder(folder: str) -> list[dict]:
+    """
+    Import an archived upload back into its SQLite database (staged, indexed and rolled
+    up like any import) and remove the archive once every table is back. The archive
+    files are not recorded in the ingest manifest since they are deleted right after.
+    Returns import_csv_folder's list of {"tableName", "rows", "peakMemoryMb"}.
+    """
+    source = archive_path(folder)
+    files = sorted(source.glob(f"*{PARQUET_SUFFIX}"))
+    if not files:
+        return []
+    logger.info("🔥 Rehydrating %s from %d archived tables", folder, len(files))
+    imported = import_csv_folder(source, folder, files=files, record=False)
+    if len(imported) == len(files):
+        shutil.rmtree(source, ignore_errors=True)
+    else:
+        logger.warning("⚠️ Rehydrated %d of %d tables of %s, keeping its archive", len(imported), len(files), folder)
+    return imported
+
+
+def ensure_hot(folder: str) -> None:
+    """
+    Rehydrate folder if it was archived.
+    """
+    if is_archived(folder):
+        rehydrate_folder(folder)
+
+
+def _last_activity(folder: str, activity: dict) -> float:
+    if folder in activity:
+        return activity[folder]
+    return folder_db_path(folder).stat().st_mtime
+
+
+def archive_cold_folders() -> list[str]:
+    """
+    Archive every upload that has not been activated for archiveAfterDays days
+    (0, the default, disables archiving). The active, previewed and currently importing uploads are kept.
+    Returns the archived folder names.
+    """
+    days = float(load_config().get("archiveAfterDays", 0) or 0)
+    if days <= 0 or pa is None:
+        return []
+
+    cutoff = time.time() - days * DAY_SECONDS
+    keep = {active_folder(), preview_folder()}
+    keep |= {job.folder_name for job in job_queue.list() if not job.finished_at}
+    with _lock:
+        activity = _load_activity()
+
+    archived = []
+    for folder in folder_databases():
+        if folder in keep:
+            continue
+        try:
+            if _last_activity(folder, activity) >= cutoff:
+                continue
+            archive_folder(folder)
+        except Exception as e:
+            logger.error("❌ Failed to archive %s: %s", folder, e)
+            continue
+        archived.append(folder)
+    return archived
+
+
+def delete_archive(folder: str) -> bool:
+    """
+    Delete an upload's archive. Returns True if it existed.
+    """
+    if not is_archived(folder):
+        return False
+    shutil.rmtree(archive_path(folder), ignore_errors=True)
+    return True
+
@@ -0,0 +1,113 @@
+import threading
+from typing import Optional
+
+from app.services.connections import active_folder, find_table, folder_of_table, read_connection
+from app.services.response_cache import dataset_version
+from app.utils.logging import logger
+
+_lock = threading.Lock()
+_key: Optional[tuple] = None  # (dataset version, active folder) the catalog was loaded for
+# Lower-case table name -> {"name", "schema", "columns", "types", "rows"}, None if it does not exist
+_tables: dict[str, Optional[dict]] = {}
+
+
+def _describe(conn, schema: str, name: str) -> dict:
+    info = conn.execute(f'PRAGMA "{schema}".table_info("{name}")').fetchall()
+    return {
+        "name": name,
+        "schema": schema,
+        "columns": [row[1] for row in info],
+        "types": [row[2] or "" for row in info],
+        "rows": None,  # counted on first use
+    }
+
+
+def _load_folder(folder: Optional[str]) -> dict[str, Optional[dict]]:
+    # Every table of the active upload, from one pass over its sqlite_master
+    tables: dict[str, Optional[dict]] = {}
+    if not folder:
+        return tables
+    conn = read_connection(folder)
+    try:
+        if folder not in [row[1] for row in conn.execute("PRAGMA database_list")]:
+            return tables
+        names = conn.execute(f"SELECT name FROM \"{folder}\".sqlite_master WHERE type = 'table'").fetchall()
+        for (name,) in names:
+            tables[name.lower()] = _describe(conn, folder, name)
+    finally:
+        conn.close()
+    return tables
+
+
+def _lookup(table_name: str) -> Optional[dict]:
+    # A table outside the active upload (or the shared database)
+    folder = folder_of_table(table_name)
+    conn = read_connection(folder) if folder else read_connection()
+    try:
+        found = find_table(conn, table_name)
+        if not found:
+            return None
+        schema, _ = found
+        name = conn.execute(
+            f"SELECT name FROM \"{schema}\".sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE",
+            (table_name,)
+        ).fetchone()[0]
+        return _describe(conn, schema, name)
+    finally:
+        conn.close()
+
+
+def _catalog() -> dict[str, Optional[dict]]:
+    global _key, _tables
+    key = (dataset_version(), active_folder())
+    with _lock:
+        if key == _key:
+            return _tables
+    tables = _load_folder(key[1])
+    with _lock:
+        _key, _tables = key, tables
+    logger.info("📚 Loaded schema catalog of %s (%d tables)", key[1], len(tables))
+    return tables
+
+
+def describe_table(table_name: str) -> Optional[dict]:
+    """
+    {"name", "schema", "columns", "types", "rows"} of a table (case-insensitive), or None.
+    The active upload's tables are loaded together once per dataset version (every ingest,
+    activation and deletion starts a new one, see invalidate_responses); any other table on
+    its first lookup. Later lookups do no I/O at all.
+    """
+    tables = _catalog()
+    key = table_name.lower()
+    if key in tables:
+        return tables[key]
+    info = _lookup(table_name)
+    with _lock:
+        tables[key] = info
+    return info
+
+
+def table_exists(table_name: str) -> bool:
+    return describe_table(table_name) is not None
+
+
+def table_columns(table_name: str) -> list[str]:
+    info = describe_table(table_name)
+    return info["columns"] if info else []
+
+
+def row_count(table_name: str) -> Optional[int]:
+    """
+    Number of rows of a table (None if it does not exist), counted once per dataset version.
+    """
+    info = describe_table(table_name)
+    if info is None:
+        return None
+    if info["rows"] is None:
+        schema = info["schema"]
+        conn = read_connection(schema) if schema != "main" else read_connection()
+        try:
+            info["rows"] = conn.execute(f'SELECT COUNT(*) FROM "{schema}"."{info["name"]}"').fetchone()[0]
+        finally:
+            conn.close()
+    return info["rows"]
@@ -0,0 +1,308 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from app.utils.logging import logger
+from app.services.jmxdata import (
+    LATEST_SAMPLE_COLUMN,
+    NULL_TYPE,
+    BYTE_TYPE,
+    SHORT_TYPE,
+    INTEGER_TYPE,
+    LONG_TYPE,
+    FLOAT_TYPE,
+    DOUBLE_TYPE,
+    BOOLEAN_TYPE,
+    TIMESTAMP_AS_LONG_TYPE,
+    BIG_DECIMAL_TYPE,
+    OBJECT_TYPE,
+    iter_jmxdata_tables,
+)
+from app.services.profile import WINDOW_COLUMN, ConversionProfile
+from app.services.preview import stratified_sample_indexes
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for the "parquet" converter
+    pa = None
+    pc = None
+    pq = None
+
+PARQUET_SUFFIX = ".parquet"
+PARQUET_COMPRESSION = "zstd"
+
+# Rows per Parquet row group (also the unit read back by the chunked importer)
+ROW_GROUP_ROWS = 100_000
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed; it is required for Parquet output")
+
+
+def _arrow_type(type_code: int):
+    if type_code in (BYTE_TYPE, SHORT_TYPE, INTEGER_TYPE, LONG_TYPE, TIMESTAMP_AS_LONG_TYPE):
+        return pa.int64()
+    if type_code in (FLOAT_TYPE, DOUBLE_TYPE, BIG_DECIMAL_TYPE):
+        return pa.float64()
+    if type_code == BOOLEAN_TYPE:
+        return pa.bool_()
+    if type_code == NULL_TYPE:
+        return pa.null()
+    return pa.string()
+
+
+def _column_array(values: list, type_code: int):
+    arrow_type = _arrow_type(type_code)
+    if type_code == OBJECT_TYPE:
+        values = [None if v is None else str(v) for v in values]
+    elif arrow_type == pa.float64():
+        values = [None if v is None else float(v) for v in values]
+    return pa.array(values, type=arrow_type)
+
+
+def sqlite_type_for(arrow_type) -> str:
+    """
+    SQLite column type for an Arrow column type (same affinities as SQLITE_TYPES).
+    """
+    if pa.types.is_integer(arrow_type) or pa.types.is_boolean(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type):
+        return "REAL"
+    if pa.types.is_null(arrow_type):
+        return ""
+    return "TEXT"
+
+
+class _TableWriter:
+    """
+    Writes one table's record batches to Parquet as they are decoded, holding at most one
+    row group. Batches are typed from the columns' types seen so far: a batch whose schema
+    differs from the previous one starts a new spill segment, and finish() streams the
+    segments once more, cast to the table's final schema, into the output file.
+    """
+
+    def __init__(self, out_path: Path):
+        self.out_path = out_path
+        self.segments: list[tuple[Path, "pa.Schema"]] = []
+        self.writer = None
+        self.buffer = []
+        self.buffered_rows = 0
+
+    def write(self, record_batch) -> None:
+        if self.writer is None or record_batch.schema != self.segments[-1][1]:
+            self._close_segment()
+            path = self.out_path.with_name(f"{self.out_path.name}.{len(self.segments)}.tmp")
+            self.writer = pq.ParquetWriter(path, record_batch.schema, compression=PARQUET_COMPRESSION)
+            self.segments.append((path, record_batch.schema))
+        self.buffer.append(record_batch)
+        self.buffered_rows += record_batch.num_rows
+        if self.buffered_rows >= ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.buffer:
+            self.writer.write_table(pa.Table.from_batches(self.buffer), row_group_size=ROW_GROUP_ROWS)
+            self.buffer, self.buffered_rows = [], 0
+
+    def _close_segment(self) -> None:
+        if self.writer is not None:
+            self._flush()
+            self.writer.close()
+            self.writer = None
+
+    def finish(self, schema) -> None:
+        self._close_segment()
+        if len(self.segments) == 1 and self.segments[0][1] == schema:
+            os.replace(self.segments[0][0], self.out_path)
+            return
+        with pq.ParquetWriter(self.out_path, schema, compression=PARQUET_COMPRESSION) as writer:
+            for path, _ in self.segments:
+                for record_batch in pq.ParquetFile(path).iter_batches(batch_size=ROW_GROUP_ROWS):
+                    writer.write_table(pa.Table.from_batches([record_batch.cast(schema)]), row_group_size=ROW_GROUP_ROWS)
+                path.unlink()
+
+    def discard(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        for path, _ in self.segments:
+            path.unlink(missing_ok=True)
+
+
+def convert_jmxdata_to_parquet(
+    input_gz: Path,
+    output_folder: Path,
+    batch_size: int = 5000,
+    on_table: Optional[Callable[[str, int], None]] = None,
+    profile: Optional[ConversionProfile] = None,
+) -> list[dict]:
+    """
+    Decode JMXData.gz natively and write one zstd-compressed <Table>.parquet per table,
+    typed from the value type codes (timestamps as int64, BigDecimal as float64).
+    With a profile, only its tables, columns and LE_TIMESTAMP window are written.
+    Batches are written as they are decoded (see _TableWriter), so memory stays bounded
+    by one row group whatever the table size; only tables with a column whose type widens
+    mid-table are streamed a second time to cast them to their final types.
+    Returns the per-table summary [{"tableName": ..., "rows": ...}].
+    """
+    require_pyarrow()
+    output_folder.mkdir(parents=True, exist_ok=True)
+    summary = []
+
+    for table in iter_jmxdata_tables(input_gz):
+        if profile and not profile.wants_table(table.name):
+            logger.info("⏭️ Skipped table %s (not in profile)", table.name)
+            continue
+
+        columns = table.columns + [LATEST_SAMPLE_COLUMN]
+        keep, select = profile.batch_selector(table.name, columns) if profile else (list(range(len(columns))), None)
+        columns = [columns[i] for i in keep]
+        out_path = output_folder / f"{table.name}{PARQUET_SUFFIX}"
+        table_writer = _TableWriter(out_path)
+        row_count = 0
+
+        try:
+            for batch in table.batches(batch_size):
+                if select:
+                    batch = select(batch)
+                if not batch:
+                    continue
+                all_codes = table.type_codes + [INTEGER_TYPE]
+                codes = [all_codes[i] for i in keep]
+                values = list(zip(*batch))
+                arrays = [_column_array(list(values[i]), codes[i]) for i in range(len(columns))]
+                table_writer.write(pa.RecordBatch.from_arrays(arrays, names=columns))
+                row_count += len(batch)
+
+            all_codes = table.type_codes + [INTEGER_TYPE]
+            codes = [all_codes[i] for i in keep]
+            schema = pa.schema([(name, _arrow_type(code)) for name, code in zip(columns, codes)])
+            if row_count:
+                table_writer.finish(schema)
+            else:
+                pq.ParquetWriter(out_path, schema, compression=PARQUET_COMPRESSION).close()
+        except Exception:
+            table_writer.discard()
+            raise
+
+        logger.info("📄 Wrote %s (%d rows)", out_path.name, row_count)
+        summary.append({"tableName": table.name, "rows": row_count})
+        if on_table:
+            on_table(table.name, row_count)
+
+    return summary
+
+
+def convert_many_to_parquet(
+    jobs: list[tuple[Path, Path]],
+    on_table: Optional[Callable[[int, str, int], None]] = None,
+    max_workers: int | None = None,
+    profile: Optional[ConversionProfile] = None,
+) -> list[list[dict]]:
+    """
+    Run convert_jmxdata_to_parquet for several (input_gz, output_folder) jobs in a process pool.
+    on_table(job_index, table_name, rows) is called once a job has finished.
+    Returns the per-job table summaries, in job order.
+    """
+    require_pyarrow()
+    n_workers = max(1, min(len(jobs), max_workers or os.cpu_count() or 1))
+    results = [None] * len(jobs)
+
+    logger.info("⚙️ Converting %d JMXData files to Parquet with %d workers", len(jobs), n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {
+            pool.submit(convert_jmxdata_to_parquet, input_gz, output_folder, profile=profile): index
+            for index, (input_gz, output_folder) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if on_table:
+                for table in results[index]:
+                    on_table(index, table["tableName"], table["rows"])
+
+    return results
+
+
+def _profile_columns(path: Path, names: list[str], profile: Optional[ConversionProfile]) -> Optional[list[str]]:
+    if profile is None:
+        return None
+    return [name for name in names if profile.wants_column(path.stem, name)]
+
+
+def _profile_mask(record_batch, profile: Optional[ConversionProfile]):
+    """
+    Boolean mask of the rows inside the profile's LE_TIMESTAMP window, or None to keep every row.
+    """
+    if profile is None or (profile.start_ms is None and profile.end_ms is None):
+        return None
+    if WINDOW_COLUMN not in record_batch.schema.names:
+        return None
+    timestamps = record_batch.column(WINDOW_COLUMN)
+    mask = pc.is_valid(timestamps)
+    if profile.start_ms is not None:
+        mask = pc.and_(mask, pc.greater_equal(timestamps, profile.start_ms))
+    if profile.end_ms is not None:
+        mask = pc.and_(mask, pc.less_equal(timestamps, profile.end_ms))
+    return pc.fill_null(mask, False)
+
+
+def read_parquet_sample(
+    path: Path,
+    limit: int,
+    stratified: bool,
+    profile: Optional[ConversionProfile] = None,
+) -> tuple[list[str], list[str], list[tuple]]:
+    """
+    At most limit rows of a Parquet file: the first ones, or one per equal LE_TIMESTAMP
+    interval when stratified (tables without LE_TIMESTAMP fall back to the first rows).
+    Returns (columns, sqlite_types, rows).
+    """
+    require_pyarrow()
+    names = pq.read_schema(path).names
+    arrow_table = pq.read_table(path, columns=_profile_columns(path, names, profile))
+    if profile is not None and profile.last_ms is not None and WINDOW_COLUMN in arrow_table.column_names:
+        profile = profile.resolved(pc.max(arrow_table.column(WINDOW_COLUMN)).as_py())
+    mask = _profile_mask(arrow_table, profile)
+    if mask is not None:
+        arrow_table = arrow_table.filter(mask)
+
+    if stratified and WINDOW_COLUMN in arrow_table.column_names and arrow_table.num_rows > limit:
+        timestamps = arrow_table.column(WINDOW_COLUMN).to_pandas()
+        arrow_table = arrow_table.take(pa.array(stratified_sample_indexes(timestamps, limit)))
+    else:
+        arrow_table = arrow_table.slice(0, limit)
+
+    columns = arrow_table.column_names
+    types = [sqlite_type_for(field.type) for field in arrow_table.schema]
+    rows = list(zip(*(col.to_pylist() for col in arrow_table.columns)))
+    return columns, types, rows
+
+
+def iter_parquet_batches(
+    path: Path,
+    batch_rows: int,
+    profile: Optional[ConversionProfile] = None,
+) -> tuple[list[str], list[str], Iterator[tuple[list[tuple], int]]]:
+    """
+    Stream a Parquet file in batches of at most batch_rows rows (only the profile's columns and window, if given).
+    Returns (columns, sqlite_types, batches) where each batch is (row tuples, arrow_bytes).
+    """
+    require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    selected = _profile_columns(path, schema.names, profile)
+    fields = [schema.field(name) for name in (selected if selected is not None else schema.names)]
+    columns = [field.name for field in fields]
+    types = [sqlite_type_for(field.type) for field in fields]
+
+    def batches():
+        for record_batch in parquet_file.iter_batches(batch_size=batch_rows, columns=selected):
+            mask = _profile_mask(record_batch, profile)
+            if mask is not None:
+                record_batch = record_batch.filter(mask)
+            yield list(zip(*(col.to_pylist() for col in record_batch.columns))), record_batch.nbytes
+
+    return columns, types, batches()
@@ -2,9 +2,15 @@ import json
 import datetime
 import shutil
 from pathlib import Path
-from app.utils.paths import CONFIG_PATH, UPLOAD_DIR, OUTPUT_DIR, LOG_DIR, DB_PATH
+from typing import Optional
+from app.utils.paths import CONFIG_PATH, UPLOAD_DIR, OUTPUT_DIR, LOG_DIR
+from app.services.connections import active_folder, deactivate_folder, delete_database, delete_folder_database
+from app.services.preview import preview_folder
 from app.utils.logging import logger
 
+# load_config() as of the last read, for hot paths (dropped by save_config)
+_cached_config: Optional[dict] = None
+
 
 def load_config() -> dict:
     """
@@ -16,6 +22,18 @@ def load_config() -> dict:
         "days": 7,
         "autoDelete": False,
         "language": "en",
+        "converter": "java",
+        "chunkedImportThresholdMb": 256,
+        "importMemoryLimitMb": 512,
+        "maxConcurrentIngests": 2,
+        "progressiveIngest": False,
+        "previewRows": 5000,
+        "previewSampling": "stratified",
+        "analyticsEngine": "sqlite",
+        "analyticsMemoryMb": 1024,
+        "archiveAfterDays": 0,
+        "responseCacheMb": 256,
+        "responseCacheDiskMb": 0,
     }
 
     try:
@@ -40,14 +58,26 @@ def load_config() -> dict:
         return defaults.copy()
 
 
+def cached_config() -> dict:
+    """
+    load_config() read once and kept until save_config writes a new config, for code
+    running per request or per query that must not re-read config.json every time.
+    """
+    global _cached_config
+    if _cached_config is None:
+        _cached_config = load_config()
+    return _cached_config
+
 
 def save_config(config: dict) -> None:
     """
     Save configuration to config.json.
     """
+    global _cached_config
     try:
         with open(CONFIG_PATH, "w", encoding="utf-8") as f:
             json.dump(config, f, indent=2)
+        _cached_config = None
         logger.info("💾 Saved config: %s", config)
     except Exception as e:
         logger.error("❌ Failed to save config: %s", e)
@@ -55,8 +85,12 @@ def save_config(config: dict) -> None:
 
 def auto_delete_data() -> None:
     """
-    Delete old uploads, outputs, logs, and optionally DB based on config.
+    Delete old uploads (with their databases and Parquet archives), outputs, logs, and
+    optionally DB based on config. The active and previewed uploads are kept.
     """
+    # archive imports this module
+    from app.services.archive import delete_archive
+
     config = load_config()
     if not config.get("autoDelete"):
         logger.info("ℹ️ Auto‑delete disabled, preserving data")
@@ -66,11 +100,14 @@ def auto_delete_data() -> None:
     cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
 
     # Delete old uploads
+    keep = {active_folder(), preview_folder()}
     for folder in UPLOAD_DIR.glob("*"):
-        if folder.is_dir():
+        if folder.is_dir() and folder.name not in keep:
             mtime = datetime.datetime.fromtimestamp(folder.stat().st_mtime)
             if mtime < cutoff:
                 shutil.rmtree(folder, ignore_errors=True)
+                delete_folder_database(folder.name)
+                delete_archive(folder.name)
                 logger.info("🗑️ Deleted upload folder %s (older than %d days)", folder, days)
 
     # Delete old output CSVs
@@ -90,6 +127,6 @@ def auto_delete_data() -> None:
 
     # Optionally reset DB
     if config.get("database", False):
-        if DB_PATH.exists():
-            DB_PATH.unlink()
+        deactivate_folder(active_folder())
+        if delete_database():
             logger.info("🗑️ Deleted database file older than %d days", days)
@@ -0,0 +1,328 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.utils.paths import ACTIVE_TABLES_PATH, DB_PATH, FOLDER_DB_DIR
+from app.utils.logging import logger
+
+# Per-connection page cache (PRAGMA cache_size takes KiB when negative)
+READ_CACHE_KIB = 16 * 1024
+WRITE_CACHE_KIB = 64 * 1024
+
+# Memory-mapped I/O window shared with the OS page cache
+MMAP_BYTES = 256 * 1024 * 1024
+
+BUSY_TIMEOUT_MS = 30_000
+
+# Upload databases attached to one read connection at a time (SQLite allows 10 by default)
+MAX_ATTACHED = 8
+
+DB_SUFFIX = ".db"
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection owned by the pool. close() only ends an open transaction and resets the
+    row factory, so call sites that close their connection hand it back instead.
+    """
+
+    def close(self) -> None:
+        if self.in_transaction:
+            self.rollback()
+        self.row_factory = None
+
+    def release(self) -> None:
+        super().close()
+
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_connections: list[PooledConnection] = []
+_generation = 0
+
+# Writers by upload folder (None: the shared database), each behind its own lock
+_writer_lock = threading.RLock()
+_folder_locks: dict[str, threading.RLock] = {}
+_writers: dict[Optional[str], tuple[tuple, PooledConnection]] = {}
+
+# Bumped when an upload database is deleted, so readers detach their stale copy
+_folder_generations: dict[str, int] = {}
+
+# Contents of active_tables.json, loaded on first use
+_active_lock = threading.Lock()
+_active_dataset: Optional[dict] = None
+
+
+def folder_db_path(folder: str) -> Path:
+    """
+    Database file holding the tables of one upload folder.
+    """
+    return FOLDER_DB_DIR / f"{folder}{DB_SUFFIX}"
+
+
+def folder_databases() -> list[str]:
+    """
+    Upload folders that have a database file.
+    """
+    return sorted(path.stem for path in FOLDER_DB_DIR.glob(f"*{DB_SUFFIX}"))
+
+
+def folder_of_table(table_name: str) -> Optional[str]:
+    """
+    Upload folder whose database holds table_name (<folder>_<Table>), if any.
+    """
+    matches = [folder for folder in folder_databases() if table_name.startswith(f"{folder}_")]
+    return max(matches, key=len) if matches else None
+
+
+def _db_path(folder: Optional[str]) -> Path:
+    return DB_PATH if folder is None else folder_db_path(folder)
+
+
+def _pool_key(folder: Optional[str] = None) -> tuple:
+    return _generation, _folder_generations.get(folder, 0), str(_db_path(folder))
+
+
+def _open(path: Path, cache_kib: int, read_only: bool) -> PooledConnection:
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        factory=PooledConnection,
+    )
+    conn.execute(f"PRAGMA cache_size = -{cache_kib}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        # WAL is persistent in the file: readers keep their snapshot while the writer commits
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+    with _registry_lock:
+        _connections.append(conn)
+    return conn
+
+
+def _lock_for(folder: Optional[str]) -> threading.RLock:
+    if folder is None:
+        return _writer_lock
+    with _registry_lock:
+        return _folder_locks.setdefault(folder, threading.RLock())
+
+
+def _writer_connection(folder: Optional[str] = None) -> PooledConnection:
+    with _lock_for(folder):
+        key, conn = _writers.get(folder, (None, None))
+        if conn is None or key != _pool_key(folder):
+            conn = _open(_db_path(folder), WRITE_CACHE_KIB, read_only=False)
+            _writers[folder] = (_pool_key(folder), conn)
+            logger.info("🗄️ Opened SQLite writer connection to %s (WAL)", _db_path(folder))
+        return conn
+
+
+def active_dataset() -> dict:
+    """
+    {"folder", "tables"} of the active dataset. active_tables.json is read once; later
+    activations go through set_active_dataset, so requests resolve it without any I/O.
+    """
+    global _active_dataset
+    with _active_lock:
+        if _active_dataset is None:
+            data = {}
+            try:
+                with open(ACTIVE_TABLES_PATH, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.error("❌ Failed to read %s: %s", ACTIVE_TABLES_PATH, e)
+            _active_dataset = {"folder": data.get("folder"), "tables": data.get("tables", [])}
+        return _active_dataset
+
+
+def set_active_dataset(folder: str, tables: list[str]) -> None:
+    """
+    Write active_tables.json (atomically) and make folder the active dataset.
+    """
+    global _active_dataset
+    data = {"folder": folder, "tables": tables}
+    with _active_lock:
+        tmp_path = ACTIVE_TABLES_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, ACTIVE_TABLES_PATH)
+        _active_dataset = data
+
+
+def active_folder() -> Optional[str]:
+    return active_dataset()["folder"]
+
+
+def deactivate_folder(folder: Optional[str]) -> bool:
+    """
+    Clear the active dataset if it is folder's (once its database is deleted), so nothing
+    keeps resolving tables of a database that is gone. Returns True if it was active.
+    """
+    if folder is None or active_folder() != folder:
+        return False
+    set_active_dataset(None, [])
+    logger.info("🗑️ Upload %s is no longer the active dataset", folder)
+    return True
+
+
+def _attach(conn: PooledConnection, attached: "OrderedDict[str, int]", folders: tuple) -> None:
+    if conn.in_transaction:  # ATTACH/DETACH are not allowed inside a transaction
+        return
+    for folder, generation in list(attached.items()):
+        if _folder_generations.get(folder, 0) != generation:
+            conn.execute("DETACH DATABASE ?", (folder,))
+            del attached[folder]
+
+    for folder in folders:
+        if not folder:
+            continue
+        if folder in attached:
+            attached.move_to_end(folder)
+            continue
+        path = folder_db_path(folder)
+        if not path.exists():
+            continue
+        if len(attached) >= MAX_ATTACHED:
+            evicted, _ = attached.popitem(last=False)
+            conn.execute("DETACH DATABASE ?", (evicted,))
+        conn.execute("ATTACH DATABASE ? AS ?", (str(path), folder))
+        conn.execute(f'PRAGMA "{folder}".cache_size = -{READ_CACHE_KIB}')
+        conn.execute(f'PRAGMA "{folder}".mmap_size = {MMAP_BYTES}')
+        attached[folder] = _folder_generations.get(folder, 0)
+
+
+def read_connection(*folders: str) -> sqlite3.Connection:
+    """
+    This thread's read-only connection, opened on first use and reused by every
+    later request served by the same worker thread.
+    The database of each given upload folder (default: the active folder) is attached
+    on demand, so unqualified <folder>_<Table> names resolve in their upload's file.
+    """
+    key = _pool_key()
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.key != key:
+        _writer_connection()  # make sure the file is in WAL mode before readers attach
+        conn = _open(DB_PATH, READ_CACHE_KIB, read_only=True)
+        _local.conn, _local.key, _local.attached = conn, key, OrderedDict()
+    _attach(conn, _local.attached, folders or (active_folder(),))
+    return conn
+
+
+def find_table(conn: sqlite3.Connection, table_name: str) -> Optional[tuple[str, str]]:
+    """
+    (schema, file) of the database an unqualified table_name resolves to on conn, if any.
+    """
+    for _, schema, path in conn.execute("PRAGMA database_list"):
+        if schema == "temp":
+            continue
+        found = conn.execute(
+            f"SELECT 1 FROM \"{schema}\".sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE",
+            (table_name,)
+        ).fetchone()
+        if found:
+            return schema, path
+    return None
+
+
+@contextmanager
+def write_connection(folder: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """
+    The writer connection of an upload folder's database (default: the shared
+    database), held exclusively for the with block. SQLite allows a single writer
+    per file: imports of the same upload queue here, different uploads run in parallel.
+    """
+    with _lock_for(folder):
+        conn = _writer_connection(folder)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def _all_locks() -> list[threading.RLock]:
+    with _registry_lock:
+        folder_locks = [_folder_locks[f] for f in sorted(_folder_locks)]
+    return folder_locks + [_writer_lock]
+
+
+def close_connections() -> None:
+    """
+    Close every pooled connection; threads reopen theirs on next use.
+    """
+    global _generation
+    locks = _all_locks()
+    for lock in locks:
+        lock.acquire()
+    try:
+        with _registry_lock:
+            _generation += 1
+            for conn in _connections:
+                try:
+                    conn.release()
+                except Exception as e:
+                    logger.warning("⚠️ Failed to close SQLite connection: %s", e)
+            _connections.clear()
+            _writers.clear()
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+def _unlink_database(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def delete_folder_database(folder: str) -> bool:
+    """
+    Delete one upload's database file. Its writer is closed and readers detach it on
+    their next use. Returns True if the file existed.
+    """
+    if folder not in folder_databases():  # also rejects names that are not a plain folder
+        return False
+    with _lock_for(folder):
+        _, conn = _writers.pop(folder, (None, None))
+        if conn is not None:
+            with _registry_lock:
+                if conn in _connections:
+                    _connections.remove(conn)
+            conn.release()
+        _folder_generations[folder] = _folder_generations.get(folder, 0) + 1
+        path = folder_db_path(folder)
+        existed = path.exists()
+        _unlink_database(path)
+    if existed:
+        logger.info("🗑️ Deleted database of upload %s", folder)
+    return existed
+
+
+def delete_database() -> bool:
+    """
+    Close the pool and delete the shared database and every upload database with
+    their WAL and shared-memory files.
+    Returns True if any database existed.
+    """
+    locks = _all_locks()
+    for lock in locks:
+        lock.acquire()
+    try:
+        close_connections()
+        existed = DB_PATH.exists() or bool(folder_databases())
+        _unlink_database(DB_PATH)
+        for folder in folder_databases():
+            _unlink_database(folder_db_path(folder))
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+    return existed
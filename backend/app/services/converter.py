@@ -1,18 +1,43 @@
+import hashlib
+import os
+import queue
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Optional
 from app.utils.paths import JAVA_DIR
 from app.utils.logging import logger
 
+CONVERTER_SOURCE = JAVA_DIR / "ConvertPerfToCsv.java"
+CONVERTER_CLASS = JAVA_DIR / "ConvertPerfToCsv.class"
+CONVERTER_HASH = JAVA_DIR / "ConvertPerfToCsv.sha256"
 
-def compile_converter() -> bool:
+
+def _source_hash() -> str:
+    return hashlib.sha256(CONVERTER_SOURCE.read_bytes()).hexdigest()
+
+
+def compile_converter(force: bool = False) -> bool:
     """
-    Compile the Java converter (ConvertPerfToCsv.java).
-    Returns True if compilation succeeds, False otherwise.
+    Compile the Java converter (ConvertPerfToCsv.java) if its source changed
+    since the last successful build (tracked by a sha256 next to the .class).
+    Returns True if the compiled class is up to date, False otherwise.
     """
+    source_hash = _source_hash()
+    if (
+        not force
+        and CONVERTER_CLASS.exists()
+        and CONVERTER_HASH.exists()
+        and CONVERTER_HASH.read_text(encoding="utf-8").strip() == source_hash
+    ):
+        logger.info("✅ Java converter is up to date, skipping compilation")
+        return True
+
     try:
         logger.info("⚙️ Compiling Java converter...")
         result = subprocess.run(
-            ["javac", "--release", "8", f"{JAVA_DIR}/ConvertPerfToCsv.java"],
+            ["javac", "--release", "8", str(CONVERTER_SOURCE)],
             capture_output=True,
             text=True,
             check=True
@@ -21,33 +46,169 @@ def compile_converter() -> bool:
             logger.debug("javac stdout: %s", result.stdout)
         if result.stderr:
             logger.warning("javac stderr: %s", result.stderr)
+        CONVERTER_HASH.write_text(source_hash, encoding="utf-8")
         logger.info("✅ Java converter compiled successfully")
         return True
-    except subprocess.CalledProcessError as e:
-        logger.error("❌ Java converter compilation failed: %s", e.stderr)
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.error("❌ Java converter compilation failed: %s", getattr(e, "stderr", e))
         return False
 
 
-def run_converter(input_file: Path, output_folder: Path) -> bool:
+class ConverterWorker:
+    """
+    Long-lived JVM running ConvertPerfToCsv in --worker mode.
+    Jobs are sent as "<input.gz>\\t<outputDir>[\\t<profile>]" lines on stdin; the worker answers
+    with "TABLE\\t<name>\\t<rows>" progress lines and a final "DONE" or "ERROR\\t<msg>".
+    Jobs are serialized: one conversion runs at a time per worker.
+    """
+
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._is_running():
+            return
+        if not compile_converter():
+            raise RuntimeError("Java converter compilation failed")
+
+        logger.info("🚀 Starting Java converter worker")
+        self._process = subprocess.Popen(
+            ["java", "-cp", str(JAVA_DIR), "ConvertPerfToCsv", "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        ready = self._process.stdout.readline().strip()
+        if ready != "READY":
+            self._stop_locked()
+            raise RuntimeError(f"Java converter worker failed to start: {ready!r}")
+        logger.info("✅ Java converter worker ready (pid=%d)", self._process.pid)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_locked()
+
+    def _stop_locked(self) -> None:
+        if self._process is None:
+            return
+        logger.info("🛑 Stopping Java converter worker")
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=10)
+        except Exception:
+            self._process.kill()
+        self._process = None
+
+    def convert(
+        self,
+        input_file: Path,
+        output_folder: Path,
+        on_table: Optional[Callable[[str, int], None]] = None,
+        profile_spec: str = "",
+    ) -> list[dict]:
+        """
+        Run one conversion job. Calls on_table(table_name, rows) as each table is written.
+        profile_spec ("tables=...;columns=...;from=...;to=...") limits what is written.
+        Returns the per-table summary [{"tableName": ..., "rows": ...}].
+        """
+        with self._lock:
+            self._start_locked()
+            process = self._process
+            tables = []
+
+            try:
+                job = f"{input_file}\t{output_folder}" + (f"\t{profile_spec}" if profile_spec else "")
+                process.stdin.write(job + "\n")
+                process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self._stop_locked()
+                raise RuntimeError(f"Java converter worker is not accepting jobs: {e}")
+
+            while True:
+                line = process.stdout.readline()
+                if not line:
+                    self._stop_locked()
+                    raise RuntimeError("Java converter worker exited during conversion")
+
+                kind, _, payload = line.rstrip("\n").partition("\t")
+                if kind == "TABLE":
+                    table_name, _, rows = payload.rpartition("\t")
+                    tables.append({"tableName": table_name, "rows": int(rows)})
+                    logger.info("📄 Converted table %s (%s rows)", table_name, rows)
+                    if on_table:
+                        on_table(table_name, int(rows))
+                elif kind == "DONE":
+                    return tables
+                elif kind == "ERROR":
+                    raise RuntimeError(payload)
+
+
+converter_worker = ConverterWorker()
+
+
+def convert_many(
+    jobs: list[tuple[Path, Path]],
+    on_table: Optional[Callable[[int, str, int], None]] = None,
+    max_workers: int | None = None,
+    profile_spec: str = "",
+) -> list[list[dict]]:
     """
-    Run the Java converter on a given input file.
+    Run several (input_file, output_folder) conversions at once, bounded by cores.
+    The shared worker takes one job at a time; extra JVMs are started for the
+    batch and stopped when it is done. on_table(job_index, table_name, rows) is
+    called as tables are written. Returns the per-job table summaries, in job order.
+    """
+    n_workers = max(1, min(len(jobs), max_workers or os.cpu_count() or 1))
+    extra_workers = [ConverterWorker() for _ in range(n_workers - 1)]
+    idle = queue.Queue()
+    for worker in [converter_worker] + extra_workers:
+        idle.put(worker)
+
+    def run(index: int) -> list[dict]:
+        input_file, output_folder = jobs[index]
+        worker = idle.get()
+        try:
+            output_folder.mkdir(parents=True, exist_ok=True)
+            callback = (lambda table_name, rows: on_table(index, table_name, rows)) if on_table else None
+            return worker.convert(input_file, output_folder, callback, profile_spec)
+        finally:
+            idle.put(worker)
+
+    logger.info("⚙️ Converting %d JMXData files with %d Java workers", len(jobs), n_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="converter") as pool:
+            return list(pool.map(run, range(len(jobs))))
+    finally:
+        for worker in extra_workers:
+            worker.stop()
+
+
+def run_converter(
+    input_file: Path,
+    output_folder: Path,
+    on_table: Optional[Callable[[str, int], None]] = None,
+) -> bool:
+    """
+    Run the Java converter on a given input file through the shared worker.
     Produces CSVs in the specified output folder.
     Returns True if execution succeeds, False otherwise.
     """
     try:
         logger.info("⚙️ Running Java converter for %s", input_file)
-        result = subprocess.run(
-            ["java", "-cp", str(JAVA_DIR), "ConvertPerfToCsv", str(input_file), str(output_folder)],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        if result.stdout:
-            logger.debug("java stdout: %s", result.stdout)
-        if result.stderr:
-            logger.warning("java stderr: %s", result.stderr)
+        output_folder.mkdir(parents=True, exist_ok=True)
+        converter_worker.convert(input_file, output_folder, on_table)
         logger.info("✅ Java converter finished successfully")
         return True
-    except subprocess.CalledProcessError as e:
-        logger.error("❌ Java converter execution failed: %s", e.stderr)
+    except Exception as e:
+        logger.error("❌ Java converter execution failed: %s", e)
         return False
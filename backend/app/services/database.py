@@ -1,54 +1,341 @@
+import os
 import sqlite3
 import pandas as pd
 from pathlib import Path
-from app.utils.paths import DB_PATH
+from typing import Callable, Optional
+from app.services.connections import (
+    delete_folder_database,
+    find_table,
+    folder_databases,
+    folder_of_table,
+    read_connection,
+    write_connection,
+)
+from app.services.indexes import build_indexes
+from app.services.response_cache import invalidate_responses
+from app.services.log_cube import LOG_CUBE_MARKER, build_log_cube, drop_log_cube, log_cube_name_for
+from app.services.rollups import GRAINS, ROLLUP_MARKER, build_rollups, drop_rollups, rollup_name_for
 from app.utils.logging import logger
+from app.utils.paths import OUTPUT_DIR, UPLOAD_DIR
+from app.services.jmxdata import iter_jmxdata_tables, LATEST_SAMPLE_COLUMN
+from app.services.schema import load_table_schema
+from app.services.profile import WINDOW_COLUMN, ConversionProfile
 
-def import_csv_to_sqlite(csv_path: Path, folder_name: str):
-    """
-    Import a CSV into SQLite, replacing any existing table for this file.
-    Normalize timestamp columns to INTEGER (ms since epoch).
-    """
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_csv(csv_path)
+# Imports build tables under this prefix; swap_staged_tables renames them into place
+STAGING_PREFIX = "_staging_"
 
-    table_name = f"{folder_name}_{csv_path.stem}".replace("-", "_")
+# Known timestamp columns, normalized to INTEGER (ms since epoch)
+TIMESTAMP_COLUMNS = [
+    "JVM_STARTTIME",
+    "LE_TIMESTAMP",
+    "CLIENTTIMESTAMP",
+    "STARTTIME",
+    "[LE_MDC_SAMPLESTARTTIME](guide://action?prefill=Tell%20me%20more%20about%3A%20LE_MDC_SAMPLESTARTTIME)"
+]
 
-    # Drop existing table if any
-    conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
 
-    # 🔹 Normalize all known timestamp columns
-    timestamp_cols = [
-        "JVM_STARTTIME",
-        "LE_TIMESTAMP",
-        "CLIENTTIMESTAMP",
-        "STARTTIME",
-        "[LE_MDC_SAMPLESTARTTIME](guide://action?prefill=Tell%20me%20more%20about%3A%20LE_MDC_SAMPLESTARTTIME)"
-    ]
+def normalize_timestamp_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize all known timestamp columns to INTEGER (ms since epoch).
+    """
+    timestamp_cols = {c.upper() for c in TIMESTAMP_COLUMNS}
     for col in df.columns:
-        if col.upper() in [c.upper() for c in timestamp_cols]:
+        if col.upper() in timestamp_cols:
             df[col] = df[col].apply(
                 lambda x: int(float(x)) if pd.notnull(x) else None
             )
+    return df
+
+
+def table_name_for(csv_path: Path, folder_name: str) -> str:
+    return f"{folder_name}_{csv_path.stem}".replace("-", "_")
+
+
+def staging_name_for(table_name: str) -> str:
+    return f"{STAGING_PREFIX}{table_name}"
+
+
+def swap_staged_tables(conn: sqlite3.Connection, table_names: list[str]) -> None:
+    """
+    Replace each live table with its staged copy (staging_name_for) in one transaction,
+    so readers see either the previous tables or the new ones, never a mix or a gap.
+    The staged tables are indexed, analyzed and rolled up first, so they go live ready
+    to query; their rollup and log event cube tables are swapped in with them.
+    """
+    if not table_names:
+        return
+    rollups = {}
+    for table_name in table_names:
+        build_indexes(conn, staging_name_for(table_name), table_name)
+        rollups[table_name] = build_rollups(conn, staging_name_for(table_name), table_name, STAGING_PREFIX)
+        cube_name = build_log_cube(conn, staging_name_for(table_name), table_name, STAGING_PREFIX)
+        if cube_name:
+            rollups[table_name].append(cube_name)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table_name in table_names:
+            conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
+            conn.execute(f"ALTER TABLE '{staging_name_for(table_name)}' RENAME TO '{table_name}'")
+            # ANALYZE statistics are keyed by table name and do not follow the rename
+            conn.execute("DELETE FROM sqlite_stat1 WHERE tbl = ?", (table_name,))
+            conn.execute("UPDATE sqlite_stat1 SET tbl = ? WHERE tbl = ?", (table_name, staging_name_for(table_name)))
+            for grain in GRAINS:
+                conn.execute(f"DROP TABLE IF EXISTS '{rollup_name_for(table_name, grain)}'")
+            conn.execute(f"DROP TABLE IF EXISTS '{log_cube_name_for(table_name)}'")
+            for rollup_name in rollups[table_name]:
+                conn.execute(f"ALTER TABLE '{staging_name_for(rollup_name)}' RENAME TO '{rollup_name}'")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info("🔁 Swapped %d staged tables into place", len(table_names))
+    invalidate_responses(f"{len(table_names)} tables imported")
 
-    # Import CSV into SQLite
-    df.to_sql(table_name, conn, index=False)
 
+def discard_staged_tables(conn: sqlite3.Connection, table_names: list[str]) -> None:
+    """
+    Drop the staged copies of table_names (after a failed import).
+    """
+    for table_name in table_names:
+        conn.execute(f"DROP TABLE IF EXISTS '{staging_name_for(table_name)}'")
+        for grain in GRAINS:
+            conn.execute(f"DROP TABLE IF EXISTS '{staging_name_for(rollup_name_for(table_name, grain))}'")
+        conn.execute(f"DROP TABLE IF EXISTS '{staging_name_for(log_cube_name_for(table_name))}'")
     conn.commit()
-    conn.close()
+
+
+def trim_to_last_window(conn: sqlite3.Connection, table_name: str, profile: Optional[ConversionProfile]) -> Optional[int]:
+    """
+    Apply a profile's relative window (last_ms) to a complete table: delete the rows older
+    than its newest LE_TIMESTAMP minus last_ms, and those without a timestamp.
+    Returns the number of rows left, or None when the table is not trimmed.
+    """
+    if profile is None or profile.last_ms is None:
+        return None
+    if WINDOW_COLUMN not in [row[1] for row in conn.execute(f"PRAGMA table_info('{table_name}')")]:
+        return None
+    conn.execute("BEGIN")
+    try:
+        newest = conn.execute(f"SELECT MAX(\"{WINDOW_COLUMN}\") FROM '{table_name}'").fetchone()[0]
+        conn.execute(
+            f"DELETE FROM '{table_name}' WHERE \"{WINDOW_COLUMN}\" IS NULL OR \"{WINDOW_COLUMN}\" < ?",
+            (newest - profile.last_ms if newest is not None else None,)
+        )
+        rows = conn.execute(f"SELECT COUNT(*) FROM '{table_name}'").fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info("✂️ Kept the last %.1f h of %s (%d rows)", profile.last_ms / 3_600_000, table_name, rows)
+    return rows
+
+
+def import_csv_to_sqlite(csv_path: Path, folder_name: str):
+    """
+    Import a CSV into SQLite, replacing any existing table for this file.
+    With a converter schema file the table is created with exact column types and
+    values are parsed typed; otherwise normalize timestamp columns to INTEGER (ms since epoch).
+    The table is built under its staging name and swapped in once complete.
+    """
+    with write_connection(folder_name) as conn:
+        schema = load_table_schema(csv_path)
+
+        table_name = table_name_for(csv_path, folder_name)
+        staging_name = staging_name_for(table_name)
+
+        # Drop a leftover staged copy if any
+        conn.execute(f"DROP TABLE IF EXISTS '{staging_name}'")
+
+        if schema is not None:
+            try:
+                df = pd.read_csv(csv_path, dtype=schema.pandas_dtypes(), float_precision="round_trip")
+            except (ValueError, TypeError) as e:
+                logger.warning("⚠️ %s does not match its schema (%s), falling back to type inference", csv_path.name, e)
+                schema = None
+
+        if schema is not None:
+            create_table(conn, staging_name, schema.column_names, schema.sqlite_types())
+            df.to_sql(staging_name, conn, index=False, if_exists="append")
+        else:
+            df = pd.read_csv(csv_path)
+
+            # 🔹 Normalize all known timestamp columns
+            df = normalize_timestamp_columns(df)
+
+            # Import CSV into SQLite
+            df.to_sql(staging_name, conn, index=False)
+
+        conn.commit()
+        swap_staged_tables(conn, [table_name])
 
     logger.info("✅ Imported %s into SQLite table %s", csv_path.name, table_name)
     return table_name, len(df)
 
 
+def import_jmxdata_to_sqlite(
+    input_gz: Path,
+    folder_name: str,
+    batch_size: int = 5000,
+    on_table: Optional[Callable[[str, int], None]] = None,
+    profile: Optional[ConversionProfile] = None,
+    on_staged: Optional[Callable[[sqlite3.Connection, str, str], None]] = None,
+):
+    """
+    Decode JMXData.gz natively and insert every table straight into SQLite,
+    without the Java converter or the intermediate CSV files.
+    With a profile, only its tables, columns and LE_TIMESTAMP window are inserted
+    (a relative window is applied once each table is complete).
+    Tables are built under their staging names and swapped in together at the end.
+    on_staged(conn, table_name, staging_name) is called on the writer connection once a
+    table is staged (e.g. to write its preview), then on_table(table_name, rows).
+    Returns a list of (table_name, row_count).
+    """
+    imported = []
+    swapped = False
+
+    with write_connection(folder_name) as conn:
+        try:
+            for table in iter_jmxdata_tables(input_gz):
+                if profile and not profile.wants_table(table.name):
+                    logger.info("⏭️ Skipped table %s (not in profile)", table.name)
+                    continue
+
+                table_name = f"{folder_name}_{table.name}".replace("-", "_")
+                staging_name = staging_name_for(table_name)
+                columns = table.columns + [LATEST_SAMPLE_COLUMN]
+                keep, select = profile.batch_selector(table.name, columns) if profile else (None, None)
+                if keep is not None:
+                    columns = [columns[i] for i in keep]
+                insert_sql = (
+                    f"INSERT INTO '{staging_name}' VALUES ({', '.join('?' * len(columns))})"
+                )
+
+                conn.execute(f"DROP TABLE IF EXISTS '{staging_name}'")
+                declared = None
+                row_count = 0
+
+                for batch in table.batches(batch_size):
+                    if select:
+                        batch = select(batch)
+                    # Types seen so far, including this batch's: a column that widened is
+                    # redeclared before its new values go in, so affinity matches the whole table
+                    types = _kept(table.column_types(), keep)
+                    if declared is None:
+                        create_table(conn, staging_name, columns, types)
+                    elif types != declared:
+                        retype_table(conn, staging_name, columns, types)
+                    declared = types
+                    conn.executemany(insert_sql, batch)
+                    row_count += len(batch)
+
+                if declared is None:
+                    create_table(conn, staging_name, columns, _kept(table.column_types(), keep))
+
+                conn.commit()
+                trimmed = trim_to_last_window(conn, staging_name, profile)
+                if trimmed is not None:
+                    row_count = trimmed
+                logger.info("✅ Imported %s (%d rows) into SQLite table %s", table.name, row_count, table_name)
+                imported.append((table_name, row_count))
+                if on_staged:
+                    on_staged(conn, table_name, staging_name)
+                if on_table:
+                    on_table(table_name, row_count)
+
+            swap_staged_tables(conn, [t for t, _ in imported])
+            swapped = True
+        finally:
+            if not swapped:
+                discard_staged_tables(conn, [t for t, _ in imported])
+
+    return imported
+
+
+def _kept(values: list, keep: Optional[list[int]]) -> list:
+    return values if keep is None else [values[i] for i in keep]
+
+
+def create_table(conn: sqlite3.Connection, table_name: str, columns: list[str], types: list[str]):
+    column_defs = ", ".join(f'"{c}" {t}'.rstrip() for c, t in zip(columns, types))
+    conn.execute(f"CREATE TABLE '{table_name}' ({column_defs})")
+
+
+def retype_table(conn: sqlite3.Connection, table_name: str, columns: list[str], types: list[str]) -> None:
+    """
+    Redeclare the column types of table_name, copying its rows under the new affinities
+    (the same values they get when inserted into a table declared that way).
+    """
+    retyped = f"{table_name}__retype"
+    conn.execute(f"DROP TABLE IF EXISTS '{retyped}'")
+    create_table(conn, retyped, columns, types)
+    conn.execute(f"INSERT INTO '{retyped}' SELECT * FROM '{table_name}'")
+    conn.execute(f"DROP TABLE '{table_name}'")
+    conn.execute(f"ALTER TABLE '{retyped}' RENAME TO '{table_name}'")
+    logger.info("🔁 Widened column types of %s", table_name)
+
+
+def column_storage_classes(conn: sqlite3.Connection, table_name: str) -> list[tuple[str, str]]:
+    """
+    (column, class) for each column from the values it actually holds (one scan):
+    "integer" if only integers, "real" if only numbers, "text" otherwise. NULLs are ignored.
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info('{table_name}')")]
+    probes = ", ".join(
+        f"""SUM(typeof("{c}") NOT IN ('integer', 'null')), SUM(typeof("{c}") NOT IN ('integer', 'real', 'null'))"""
+        for c in columns
+    )
+    counts = conn.execute(f"SELECT {probes} FROM '{table_name}'").fetchone()
+    classes = []
+    for i, column in enumerate(columns):
+        non_integer, non_numeric = counts[2 * i] or 0, counts[2 * i + 1] or 0
+        classes.append((column, "integer" if not non_integer else "real" if not non_numeric else "text"))
+    return classes
+
+
+def table_version(conn: sqlite3.Connection, table_name: str) -> tuple:
+    """
+    Token that changes whenever the live table_name is replaced: live tables only change
+    by DDL (staged swap, preview rewrite, drop), which moves their root page or row count;
+    the inode changes when a database file is deleted.
+    """
+    found = find_table(conn, table_name)
+    if found is None:
+        raise ValueError(f"Table not found: {table_name}")
+    schema, db_file = found
+    rootpage = conn.execute(
+        f"SELECT rootpage FROM \"{schema}\".sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE",
+        (table_name,)
+    ).fetchone()[0]
+    max_rowid = conn.execute(f'SELECT MAX(rowid) FROM "{schema}"."{table_name}"').fetchone()[0]
+    return os.stat(db_file).st_ino, rootpage, max_rowid
+
+
+def is_internal_table(table_name: str) -> bool:
+    """
+    SQLite's own tables, staged tables of running imports and tables derived at ingest
+    (rollups, log event cubes).
+    """
+    return table_name.startswith((STAGING_PREFIX, "sqlite_")) or ROLLUP_MARKER in table_name or LOG_CUBE_MARKER in table_name
+
+
 def list_tables():
     """
-    List all tables currently in SQLite.
+    List all imported tables currently in SQLite: the shared database and every upload's
+    database (see is_internal_table for what is left out).
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
+    conn = read_connection()
+    tables = [row[0] for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type='table'")]
     conn.close()
+    for folder in folder_databases():
+        conn = read_connection(folder)
+        try:
+            tables += [row[0] for row in conn.execute(f"SELECT name FROM \"{folder}\".sqlite_master WHERE type='table'")]
+        except sqlite3.OperationalError as e:  # deleted or not attachable
+            logger.warning("⚠️ Skipped database of upload %s: %s", folder, e)
+        finally:
+            conn.close()
+    tables = [t for t in tables if not is_internal_table(t)]
     logger.info("📋 Listed %d tables from SQLite", len(tables))
     return tables
 
@@ -58,12 +345,12 @@ def get_table(table_name: str, limit: int = 100):
     Fetch rows from a given table.
     Returns dict with rows (list of dicts).
     """
-    conn = sqlite3.connect(DB_PATH)
+    folder = folder_of_table(table_name)
+    conn = read_connection(folder) if folder else read_connection()
     cursor = conn.cursor()
 
     # Check if table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-    exists = cursor.fetchone()
+    exists = find_table(conn, table_name)
     if not exists:
         logger.warning("⚠️ Table %s not found in DB", table_name)
         conn.close()
@@ -81,34 +368,105 @@ def get_table(table_name: str, limit: int = 100):
 
 def drop_table(table_name: str) -> bool:
     """
-    Drop a specific table if it exists.
+    Drop a specific table if it exists (from its upload's database, or the shared one).
     Returns True if dropped, False otherwise.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-    exists = cursor.fetchone()
+    with write_connection(folder_of_table(table_name)) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+        exists = cursor.fetchone()
+        if exists:
+            conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
+            conn.commit()
+            drop_rollups(conn, table_name)
+            drop_log_cube(conn, table_name)
     if exists:
-        conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
-        conn.commit()
-        conn.close()
         logger.info("🗑️ Dropped table %s", table_name)
+        invalidate_responses(f"table {table_name} dropped")
         return True
-    conn.close()
     logger.warning("⚠️ Tried to drop non-existent table %s", table_name)
     return False
 
 
+def migrate_legacy_tables() -> int:
+    """
+    Move the tables of each upload folder still kept in the shared database (imports from
+    before per-upload database files) into the folder's own file, with fresh indexes,
+    rollups and log event cubes. Tables of unknown folders stay in the shared database.
+    Returns the number of tables moved.
+    """
+    conn = read_connection()
+    try:
+        shared_path = conn.execute("PRAGMA database_list").fetchone()[2]
+        legacy = [
+            (name, sql) for name, sql in conn.execute("SELECT name, sql FROM main.sqlite_master WHERE type='table'")
+            if not is_internal_table(name)
+        ]
+    finally:
+        conn.close()
+    if not legacy:
+        return 0
+
+    folders = {d.name for base in (UPLOAD_DIR, OUTPUT_DIR) for d in base.iterdir() if d.is_dir()}
+    by_folder: dict[str, list[tuple[str, str]]] = {}
+    for name, sql in legacy:
+        matches = [f for f in folders if name.startswith(f"{f}_")]
+        if matches:
+            by_folder.setdefault(max(matches, key=len), []).append((name, sql))
+
+    moved = 0
+    for folder, tables in sorted(by_folder.items()):
+        with write_connection(folder) as conn:
+            conn.execute("ATTACH DATABASE ? AS legacy", (shared_path,))
+            try:
+                for table_name, sql in tables:
+                    if conn.execute(
+                        "SELECT 1 FROM main.sqlite_master WHERE type='table' AND name=?", (table_name,)
+                    ).fetchone() is None:
+                        conn.execute("BEGIN")
+                        try:
+                            conn.execute(sql)
+                            conn.execute(f"INSERT INTO main.'{table_name}' SELECT * FROM legacy.'{table_name}'")
+                            conn.commit()
+                        except Exception:
+                            conn.rollback()
+                            raise
+                    build_indexes(conn, table_name)
+                    build_rollups(conn, table_name, table_name)
+                    build_log_cube(conn, table_name, table_name)
+                    moved += 1
+            finally:
+                conn.execute("DETACH DATABASE legacy")
+
+        with write_connection() as conn:
+            for table_name, _ in tables:
+                conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
+                for grain in GRAINS:
+                    conn.execute(f"DROP TABLE IF EXISTS '{rollup_name_for(table_name, grain)}'")
+                drop_log_cube(conn, table_name)
+            conn.commit()
+        logger.info("📦 Moved %d tables of %s into its own database", len(tables), folder)
+
+    if moved:
+        with write_connection() as conn:
+            # Give the space of the moved tables back
+            conn.execute("VACUUM")
+    return moved
+
+
 def clear_database():
     """
-    Delete all tables in the SQLite DB.
+    Delete all tables in the SQLite DB: upload databases are unlinked, tables left in
+    the shared database are dropped.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
-    for t in tables:
-        conn.execute(f"DROP TABLE IF EXISTS '{t}'")
-        logger.info("🗑️ Dropped table %s", t)
-    conn.commit()
-    conn.close()
+    for folder in folder_databases():
+        delete_folder_database(folder)
+    with write_connection() as conn:
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        for t in tables:
+            conn.execute(f"DROP TABLE IF EXISTS '{t}'")
+            logger.info("🗑️ Dropped table %s", t)
+        conn.commit()
     logger.info("✅ Cleared all tables from database")
+    invalidate_responses("database cleared")
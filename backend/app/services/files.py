@@ -28,7 +28,7 @@ def save_uploaded_file(upload_file, dest_path: Path):
 
 def zip_output_folder(folder_name: str):
     """
-    Create a zip archive of all CSVs in the given output folder.
+    Create a zip archive of all CSV and Parquet files in the given output folder.
     Returns a StreamingResponse for FastAPI.
     """
     output_folder = OUTPUT_DIR / folder_name
@@ -38,7 +38,7 @@ def zip_output_folder(folder_name: str):
 
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w") as zipf:
-        for csv_file in output_folder.glob("*.csv"):
+        for csv_file in sorted(output_folder.glob("*.csv")) + sorted(output_folder.glob("*.parquet")):
             zipf.write(csv_file, arcname=csv_file.name)
     zip_buffer.seek(0)
 
@@ -0,0 +1,89 @@
+import sqlite3
+import uuid
+
+from app.utils.logging import logger
+
+# Indexes on every table that has the columns: time-range filters/sorts and per-JVM series
+COMMON_INDEXES = [
+    ("LE_TIMESTAMP",),
+    ("JVM_ID", "LE_TIMESTAMP"),
+]
+
+# Extra indexes per table family (table name suffix)
+FAMILY_INDEXES = {
+    "MiscLogEvents": [("LE_LEVEL", "LE_LOGGERNAME")],
+    "JmxNotifications": [("LE_LEVEL", "LE_LOGGERNAME")],
+    "TopSQLStats": [("MaxSeconds", "StartTime"), ("StartTime", "LE_Timestamp")],
+}
+
+# Rows sampled per index by ANALYZE (keeps it fast on large tables)
+ANALYSIS_LIMIT = 1000
+
+
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> dict[str, str]:
+    # SQLite column names are case-insensitive: map upper-case -> declared name
+    return {row[1].upper(): row[1] for row in conn.execute(f"PRAGMA table_info('{table_name}')")}
+
+
+def _existing_indexes(conn: sqlite3.Connection, table_name: str) -> set[tuple[str, ...]]:
+    existing = set()
+    for row in conn.execute(f"PRAGMA index_list('{table_name}')"):
+        columns = [info[2] for info in conn.execute(f"PRAGMA index_info('{row[1]}')")]
+        existing.add(tuple(str(c).upper() for c in columns))
+    return existing
+
+
+def indexes_for(table_name: str) -> list[tuple[str, ...]]:
+    """
+    Column lists to index for a <folder>_<Table> table (before checking they exist).
+    """
+    specs = list(COMMON_INDEXES)
+    for family, family_specs in FAMILY_INDEXES.items():
+        if table_name.endswith(f"_{family}"):
+            specs.extend(family_specs)
+    return specs
+
+
+def _has_statistics(conn: sqlite3.Connection, table_name: str) -> bool:
+    try:
+        return conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table_name,)).fetchone() is not None
+    except sqlite3.OperationalError:  # no ANALYZE has run on this database yet
+        return False
+
+
+def build_indexes(conn: sqlite3.Connection, table_name: str, family_name: str | None = None) -> list[str]:
+    """
+    Create the access-path indexes of table_name (family taken from family_name, e.g. the
+    live name of a staged table) and ANALYZE it, in one transaction on the writer.
+    Indexes whose columns are missing or already indexed are skipped; a table that is
+    fully indexed and analyzed is left untouched.
+    Returns the names of the indexes created.
+    """
+    columns = _table_columns(conn, table_name)
+    existing = _existing_indexes(conn, table_name)
+    missing = [
+        spec for spec in indexes_for(family_name or table_name)
+        if all(c.upper() in columns for c in spec) and tuple(c.upper() for c in spec) not in existing
+    ]
+    if not missing and _has_statistics(conn, table_name):
+        return []
+
+    created = []
+    conn.execute("BEGIN")
+    try:
+        for spec in missing:
+            # Unique suffix: a staged table's indexes keep their names after it is renamed into place
+            index_name = f"ix_{family_name or table_name}_{'_'.join(spec)}_{uuid.uuid4().hex[:8]}"
+            column_list = ", ".join(f'"{columns[c.upper()]}"' for c in spec)
+            conn.execute(f"CREATE INDEX '{index_name}' ON '{table_name}' ({column_list})")
+            created.append(index_name)
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        conn.execute(f'ANALYZE "{table_name}"')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if created:
+        logger.info("🗂️ Built %d indexes on %s", len(created), family_name or table_name)
+    return created
@@ -0,0 +1,604 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from app.utils.logging import logger
+from app.services.config import load_config
+from app.services.connections import write_connection
+from app.services.database import (
+    create_table,
+    discard_staged_tables,
+    normalize_timestamp_columns,
+    staging_name_for,
+    swap_staged_tables,
+    table_name_for,
+    trim_to_last_window,
+)
+from app.services.schema import TableSchema, load_table_schema
+from app.services.columnar import PARQUET_SUFFIX, iter_parquet_batches, read_parquet_sample
+from app.services.ingest_manifest import file_fingerprint, record_ingested
+from app.services.profile import WINDOW_COLUMN, ConversionProfile
+from app.services.preview import stratified_sample_indexes
+from app.services.log_cube import drop_log_cube
+from app.services.response_cache import invalidate_responses
+from app.services.rollups import drop_rollups
+
+# Rows per executemany() call on the writer connection
+INSERT_BATCH_ROWS = 50_000
+
+# Rows read to estimate the in-memory size of one row before chunking
+SAMPLE_ROWS = 1_000
+
+# A parsed chunk is held roughly this many times over while it is converted and inserted
+# (DataFrame, object copy, row tuples)
+CHUNK_MEMORY_FACTOR = 4
+
+MB = 1024 * 1024
+
+# Column added to tables merged from several JMXData sources (one per server/node)
+SOURCE_COLUMN = "SOURCE"
+
+# pandas inferred dtype -> SQLite column type (same mapping DataFrame.to_sql uses)
+_SQLITE_TYPES = {
+    "integer": "INTEGER",
+    "boolean": "INTEGER",
+    "floating": "REAL",
+    "mixed-integer-float": "REAL",
+    "decimal": "REAL",
+}
+
+
+def _sqlite_types(df: pd.DataFrame) -> list[str]:
+    return [
+        _SQLITE_TYPES.get(pd.api.types.infer_dtype(df[c], skipna=True), "TEXT")
+        for c in df.columns
+    ]
+
+
+def _frame_to_rows(df: pd.DataFrame) -> list[tuple]:
+    """
+    Convert every value to a plain Python type (NaN -> None) for sqlite3 executemany().
+    """
+    values = df.astype(object).where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def _frame_memory(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def _read_csv(csv_path: Path, schema: TableSchema | None, profile: ConversionProfile | None = None, **kwargs):
+    """
+    Read a CSV typed from its converter schema (vectorized parsing, timestamps already
+    integers) or, without a schema, with pandas inference plus timestamp normalization.
+    With a profile, only its columns are parsed and rows outside its window are dropped.
+    With chunksize= in kwargs this returns an iterator of normalized chunks.
+    """
+    if profile is not None:
+        kwargs["usecols"] = lambda c: profile.wants_column(csv_path.stem, c)
+
+    if schema is not None:
+        frames = pd.read_csv(csv_path, dtype=schema.pandas_dtypes(), float_precision="round_trip", **kwargs)
+    elif "chunksize" in kwargs:
+        frames = (normalize_timestamp_columns(chunk) for chunk in pd.read_csv(csv_path, **kwargs))
+    else:
+        frames = normalize_timestamp_columns(pd.read_csv(csv_path, **kwargs))
+
+    if profile is None:
+        return frames
+    if "chunksize" in kwargs:
+        return (profile.filter_frame(csv_path.stem, chunk) for chunk in frames)
+    return profile.filter_frame(csv_path.stem, frames)
+
+
+def _load_schema(csv_path: Path, profile: ConversionProfile | None) -> TableSchema | None:
+    schema = load_table_schema(csv_path)
+    if schema is not None and profile is not None:
+        schema = schema.subset(lambda name: profile.wants_column(csv_path.stem, name))
+    return schema
+
+
+def _column_types(df: pd.DataFrame, schema: TableSchema | None) -> list[str]:
+    if schema is not None and schema.column_names == [str(c) for c in df.columns]:
+        return schema.sqlite_types()
+    return _sqlite_types(df)
+
+
+def _parse_csv(csv_path: Path, profile: ConversionProfile | None = None) -> tuple[list[str], list[str], list[tuple], int]:
+    """
+    Runs in a worker process: parse one CSV (typed from its schema file when present)
+    and convert every value to a plain Python type ready for sqlite3 executemany().
+    Returns (columns, sqlite_types, rows, dataframe_bytes).
+    """
+    schema = _load_schema(csv_path, profile)
+    try:
+        df = _read_csv(csv_path, schema, profile)
+    except (ValueError, TypeError) as e:
+        if schema is None:
+            raise
+        logger.warning("⚠️ %s does not match its schema (%s), falling back to type inference", csv_path.name, e)
+        schema = None
+        df = _read_csv(csv_path, schema, profile)
+
+    columns = [str(c) for c in df.columns]
+    return columns, _column_types(df, schema), _frame_to_rows(df), _frame_memory(df)
+
+
+def _parse_table_file(
+    path: Path,
+    profile: ConversionProfile | None = None,
+) -> tuple[tuple[list[str], list[str], list[tuple], int], dict]:
+    """
+    Runs in a worker process: parse one CSV and fingerprint it for the ingest manifest.
+    """
+    return _parse_csv(path, profile), file_fingerprint(path)
+
+
+def _insert_rows(conn: sqlite3.Connection, insert_sql: str, rows: list[tuple]) -> None:
+    for start in range(0, len(rows), INSERT_BATCH_ROWS):
+        conn.executemany(insert_sql, rows[start:start + INSERT_BATCH_ROWS])
+
+
+def _insert_sql(table_name: str, columns: list[str]) -> str:
+    return f"INSERT INTO '{table_name}' VALUES ({', '.join('?' * len(columns))})"
+
+
+def _write_table(conn: sqlite3.Connection, table_name: str, columns: list[str], types: list[str], rows: list[tuple]) -> None:
+    """
+    Replace one table in a single transaction on the writer connection.
+    """
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
+        create_table(conn, table_name, columns, types)
+        _insert_rows(conn, _insert_sql(table_name, columns), rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def chunk_rows_for(csv_path: Path, memory_limit_bytes: int, profile: ConversionProfile | None = None) -> int:
+    """
+    Number of CSV rows per chunk that keeps one chunk's working set under memory_limit_bytes.
+    """
+    usecols = (lambda c: profile.wants_column(csv_path.stem, c)) if profile else None
+    sample = pd.read_csv(csv_path, nrows=SAMPLE_ROWS, usecols=usecols)
+    if sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = max(1, _frame_memory(sample) // len(sample))
+    return max(SAMPLE_ROWS, memory_limit_bytes // (bytes_per_row * CHUNK_MEMORY_FACTOR))
+
+
+def import_csv_chunked(
+    conn: sqlite3.Connection,
+    csv_path: Path,
+    folder_name: str,
+    memory_limit_bytes: int,
+    schema: TableSchema | None = None,
+    profile: ConversionProfile | None = None,
+) -> dict:
+    """
+    Streaming import for very large CSVs: read fixed-size chunks sized from memory_limit_bytes,
+    convert each chunk (typed from schema, or normalized timestamps without one) and append
+    everything inside a single transaction. A profile limits the columns and rows imported.
+    Without a schema, column types are taken from the first chunk (as DataFrame.to_sql does when appending).
+    Rows go into the table's staging copy; swap_staged_tables makes it live.
+    Returns {"tableName", "rows", "peakMemoryMb"} where peak memory is the largest chunk held.
+    """
+    table_name = table_name_for(csv_path, folder_name)
+    staging_name = staging_name_for(table_name)
+    chunk_rows = chunk_rows_for(csv_path, memory_limit_bytes, profile)
+    logger.info("📦 Chunked import of %s (%d rows per chunk)", csv_path.name, chunk_rows)
+
+    total_rows, peak_bytes = 0, 0
+    insert_sql = None
+
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS '{staging_name}'")
+
+        for chunk in _read_csv(csv_path, schema, profile, chunksize=chunk_rows):
+            if insert_sql is None:
+                columns = [str(c) for c in chunk.columns]
+                create_table(conn, staging_name, columns, _column_types(chunk, schema))
+                insert_sql = _insert_sql(staging_name, columns)
+
+            peak_bytes = max(peak_bytes, _frame_memory(chunk))
+            _insert_rows(conn, insert_sql, _frame_to_rows(chunk))
+            total_rows += len(chunk)
+
+        if insert_sql is None:
+            # Header-only CSV: read_csv yields no chunks
+            header = _read_csv(csv_path, schema, profile, nrows=0)
+            create_table(conn, staging_name, [str(c) for c in header.columns], _column_types(header, schema))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {"tableName": table_name, "rows": total_rows, "peakMemoryMb": round(peak_bytes / MB, 1)}
+
+
+def import_parquet_chunked(
+    conn: sqlite3.Connection,
+    parquet_path: Path,
+    folder_name: str,
+    batch_rows: int,
+    profile: ConversionProfile | None = None,
+) -> dict:
+    """
+    Streaming import for very large Parquet files: append batch_rows rows at a time
+    inside a single transaction. Column types come from the Parquet schema.
+    Rows go into the table's staging copy; swap_staged_tables makes it live.
+    """
+    table_name = table_name_for(parquet_path, folder_name)
+    staging_name = staging_name_for(table_name)
+    columns, types, batches = iter_parquet_batches(parquet_path, batch_rows, profile)
+    insert_sql = _insert_sql(staging_name, columns)
+    total_rows, peak_bytes = 0, 0
+
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS '{staging_name}'")
+        create_table(conn, staging_name, columns, types)
+        for rows, batch_bytes in batches:
+            peak_bytes = max(peak_bytes, batch_bytes)
+            _insert_rows(conn, insert_sql, rows)
+            total_rows += len(rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {"tableName": table_name, "rows": total_rows, "peakMemoryMb": round(peak_bytes / MB, 1)}
+
+
+def _import_large_file(
+    conn: sqlite3.Connection,
+    path: Path,
+    folder_name: str,
+    memory_limit_bytes: int,
+    profile: ConversionProfile | None = None,
+) -> dict:
+    if path.suffix == PARQUET_SUFFIX:
+        return import_parquet_chunked(conn, path, folder_name, INSERT_BATCH_ROWS, profile)
+    return _import_csv_chunked_typed(conn, path, folder_name, memory_limit_bytes, profile)
+
+
+def _import_csv_chunked_typed(
+    conn: sqlite3.Connection,
+    csv_path: Path,
+    folder_name: str,
+    memory_limit_bytes: int,
+    profile: ConversionProfile | None = None,
+) -> dict:
+    schema = _load_schema(csv_path, profile)
+    try:
+        return import_csv_chunked(conn, csv_path, folder_name, memory_limit_bytes, schema, profile)
+    except (ValueError, TypeError) as e:
+        if schema is None:
+            raise
+        logger.warning("⚠️ %s does not match its schema (%s), falling back to type inference", csv_path.name, e)
+        return import_csv_chunked(conn, csv_path, folder_name, memory_limit_bytes, profile=profile)
+
+
+def import_csv_folder(
+    csv_folder: Path,
+    folder_name: str,
+    max_workers: int | None = None,
+    on_table: Optional[Callable[[str, int], None]] = None,
+    files: Optional[list[Path]] = None,
+    profile: Optional[ConversionProfile] = None,
+    swap: bool = True,
+    database: Optional[str] = None,
+    record: bool = True,
+) -> list[dict]:
+    """
+    Import every CSV (typed from the converter's <Table>.schema.json files when
+    present) and every Parquet file in csv_folder into SQLite.
+    CSVs are parsed and type-converted in a process pool; the shared writer
+    connection inserts each finished table in one transaction.
+    CSVs above chunkedImportThresholdMb are streamed in chunks by the writer
+    instead, bounded by importMemoryLimitMb. Parquet files are always streamed
+    by the writer one record batch at a time (Arrow already decodes them
+    column-wise, so they skip the pool and its copy of every row).
+    Every table is built under its staging name and all of them are swapped in
+    together once the folder is done, so readers never see a half-imported dataset
+    (swap=False leaves them staged for the caller).
+    Tables that fail are logged and skipped. on_table(table_name, rows) is
+    called as each table is staged. Swapped-in files are recorded in the ingest manifest
+    unless record=False.
+    files restricts the import to a subset of the folder; a profile restricts it
+    to the profile's tables, columns and LE_TIMESTAMP window (a relative "lastHours"
+    window ends at each table's newest LE_TIMESTAMP, see trim_to_last_window).
+    Tables go into the database file of upload folder database (default folder_name).
+    Returns a list of {"tableName", "rows", "peakMemoryMb"}.
+    """
+    if files is None:
+        files = sorted(csv_folder.glob("*.csv")) + sorted(csv_folder.glob(f"*{PARQUET_SUFFIX}"))
+    csv_files = [f for f in files if profile is None or profile.wants_table(f.stem)]
+    if not csv_files:
+        return []
+
+    config = load_config()
+    threshold_bytes = int(config.get("chunkedImportThresholdMb", 256)) * MB
+    memory_limit_bytes = int(config.get("importMemoryLimitMb", 512)) * MB
+
+    large_files = [f for f in csv_files if f.suffix == PARQUET_SUFFIX or f.stat().st_size > threshold_bytes]
+    small_files = [f for f in csv_files if f not in large_files]
+
+    workers = max(1, min(len(small_files) or 1, max_workers or os.cpu_count() or 1))
+    logger.info(
+        "📊 Importing %d table files from %s with %d workers (%d chunked)",
+        len(csv_files), csv_folder, workers, len(large_files)
+    )
+
+    imported, manifest_entries = [], []
+    swapped = False
+    with write_connection(database or folder_name) as conn:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_parse_table_file, csv_file, profile): csv_file for csv_file in small_files}
+
+                # Large files stream through the writer while the pool parses the rest
+                for csv_file in large_files:
+                    try:
+                        fingerprint = file_fingerprint(csv_file)
+                        info = _import_large_file(conn, csv_file, folder_name, memory_limit_bytes, profile)
+                        trimmed = trim_to_last_window(conn, staging_name_for(info["tableName"]), profile)
+                        if trimmed is not None:
+                            info["rows"] = trimmed
+                    except Exception as e:
+                        logger.error("❌ Failed to import %s: %s", csv_file, e)
+                        continue
+                    logger.info(
+                        "✅ Imported %s (%d rows, peak %.1f MB) into SQLite table %s",
+                        csv_file.name, info["rows"], info["peakMemoryMb"], info["tableName"]
+                    )
+                    imported.append(info)
+                    manifest_entries.append((csv_file, fingerprint, info["tableName"], info["rows"]))
+                    if on_table:
+                        on_table(info["tableName"], info["rows"])
+
+                for future in as_completed(futures):
+                    csv_file = futures[future]
+                    table_name = table_name_for(csv_file, folder_name)
+                    try:
+                        (columns, types, rows, frame_bytes), fingerprint = future.result()
+                        _write_table(conn, staging_name_for(table_name), columns, types, rows)
+                        trimmed = trim_to_last_window(conn, staging_name_for(table_name), profile)
+                    except Exception as e:
+                        logger.error("❌ Failed to import %s: %s", csv_file, e)
+                        continue
+
+                    row_count = trimmed if trimmed is not None else len(rows)
+                    info = {"tableName": table_name, "rows": row_count, "peakMemoryMb": round(frame_bytes / MB, 1)}
+                    logger.info(
+                        "✅ Imported %s (%d rows, peak %.1f MB) into SQLite table %s",
+                        csv_file.name, info["rows"], info["peakMemoryMb"], table_name
+                    )
+                    imported.append(info)
+                    manifest_entries.append((csv_file, fingerprint, table_name, info["rows"]))
+                    if on_table:
+                        on_table(info["tableName"], info["rows"])
+
+            if swap:
+                swap_staged_tables(conn, [info["tableName"] for info in imported])
+                if record:
+                    record_ingested(manifest_entries)
+            swapped = True
+        finally:
+            if not swapped:
+                discard_staged_tables(conn, [info["tableName"] for info in imported])
+
+    return imported
+
+
+def _sample_csv(
+    csv_path: Path,
+    limit: int,
+    stratified: bool,
+    profile: ConversionProfile | None = None,
+) -> tuple[list[str], list[str], list[tuple]]:
+    """
+    At most limit rows of a CSV: the first ones, or one per equal LE_TIMESTAMP interval
+    when stratified (only the timestamp column is read to pick them).
+    Returns (columns, sqlite_types, rows).
+    """
+    schema = _load_schema(csv_path, profile)
+    kwargs = {"nrows": limit}
+
+    relative = profile is not None and profile.last_ms is not None
+    if stratified or relative:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        if WINDOW_COLUMN in header:
+            timestamps = pd.read_csv(csv_path, usecols=[WINDOW_COLUMN])[WINDOW_COLUMN]
+            if relative:
+                newest = pd.to_numeric(timestamps, errors="coerce").max()
+                profile = profile.resolved(None if pd.isna(newest) else newest)
+            if profile is not None:
+                timestamps = timestamps[profile.filter_frame(csv_path.stem, timestamps.to_frame()).index]
+            if stratified and len(timestamps) > limit:
+                # skiprows counts file lines: line 0 is the header, data row i is line i + 1
+                keep = {0} | {i + 1 for i in stratified_sample_indexes(timestamps, limit)}
+                kwargs = {"skiprows": lambda line: line not in keep}
+
+    df = _read_csv(csv_path, schema, profile, **kwargs)
+    if profile is not None and "nrows" in kwargs:
+        df = df.head(limit)
+    return [str(c) for c in df.columns], _column_types(df, schema), _frame_to_rows(df)
+
+
+def import_file_preview(
+    path: Path,
+    folder_name: str,
+    limit: int,
+    stratified: bool = True,
+    profile: Optional[ConversionProfile] = None,
+) -> Optional[dict]:
+    """
+    Write a sample of at most limit rows of one converted CSV or Parquet file to its
+    final SQLite table. Failures are logged and return None.
+    Returns {"tableName", "rows", "preview": True}.
+    """
+    table_name = table_name_for(path, folder_name)
+    try:
+        if path.suffix == PARQUET_SUFFIX:
+            columns, types, rows = read_parquet_sample(path, limit, stratified, profile)
+        else:
+            columns, types, rows = _sample_csv(path, limit, stratified, profile)
+        with write_connection(folder_name) as conn:
+            _write_table(conn, table_name, columns, types, rows)
+            drop_rollups(conn, table_name)
+            drop_log_cube(conn, table_name)
+    except Exception as e:
+        logger.error("❌ Failed to import preview of %s: %s", path, e)
+        return None
+    invalidate_responses(f"preview of {table_name} imported")
+    return {"tableName": table_name, "rows": len(rows), "preview": True}
+
+
+def import_staged_preview(
+    conn: sqlite3.Connection,
+    table_name: str,
+    staging_name: str,
+    limit: int,
+    stratified: bool = True,
+) -> dict:
+    """
+    Write a sample of at most limit rows of a finished staged table (the native decoder's
+    direct import) to table_name, on the importer's writer connection; the final swap
+    replaces it with the full table. Same sampling as _sample_csv.
+    Returns {"tableName", "rows", "preview": True}.
+    """
+    info = list(conn.execute(f"PRAGMA table_info('{staging_name}')"))
+    columns, types = [row[1] for row in info], [row[2] for row in info]
+
+    where, params = "", []
+    if stratified and WINDOW_COLUMN in columns:
+        frame = pd.read_sql_query(f'SELECT rowid, "{WINDOW_COLUMN}" FROM \'{staging_name}\' ORDER BY rowid', conn)
+        if len(frame) > limit:
+            rowids = frame["rowid"].iloc[stratified_sample_indexes(frame[WINDOW_COLUMN], limit)]
+            where, params = "WHERE rowid IN (SELECT value FROM json_each(?))", [json.dumps(rowids.tolist())]
+
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS '{table_name}'")
+        create_table(conn, table_name, columns, types)
+        rows = conn.execute(
+            f"INSERT INTO '{table_name}' SELECT {column_list} FROM '{staging_name}' {where} ORDER BY rowid LIMIT ?",
+            params + [limit],
+        ).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    drop_rollups(conn, table_name)
+    drop_log_cube(conn, table_name)
+    invalidate_responses(f"preview of {table_name} imported")
+    return {"tableName": table_name, "rows": rows, "preview": True}
+
+
+def _merged_type(current: str, other: str) -> str:
+    if not current or current == other:
+        return other or current
+    if not other:
+        return current
+    if {current, other} == {"INTEGER", "REAL"}:
+        return "REAL"
+    return "TEXT"
+
+
+def merge_source_tables(conn: sqlite3.Connection, table_name: str, parts: list[tuple[str, str]]) -> int:
+    """
+    Combine per-source tables into table_name's staging copy with a SOURCE column,
+    in one transaction. Columns are the union of all parts (missing ones are NULL);
+    the part tables are dropped. Returns the merged row count.
+    """
+    staging_name = staging_name_for(table_name)
+    columns, types, part_columns = [], {}, {}
+    for _, part_table in parts:
+        part_columns[part_table] = []
+        for _, name, declared_type, *_ in conn.execute(f"PRAGMA table_info('{part_table}')"):
+            part_columns[part_table].append(name)
+            if name not in types:
+                columns.append(name)
+                types[name] = declared_type
+            else:
+                types[name] = _merged_type(types[name], declared_type)
+
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS '{staging_name}'")
+        create_table(conn, staging_name, columns + [SOURCE_COLUMN], [types[c] for c in columns] + ["TEXT"])
+        for source, part_table in parts:
+            column_list = ", ".join(f'"{c}"' for c in part_columns[part_table] + [SOURCE_COLUMN])
+            select_list = ", ".join(f'"{c}"' for c in part_columns[part_table])
+            conn.execute(
+                f"INSERT INTO '{staging_name}' ({column_list}) SELECT {select_list}, ? FROM '{part_table}'",
+                (source,)
+            )
+            conn.execute(f"DROP TABLE '{part_table}'")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return conn.execute(f"SELECT COUNT(*) FROM '{staging_name}'").fetchone()[0]
+
+
+def import_source_folders(
+    source_folders: list[tuple[str, Path]],
+    folder_name: str,
+    on_table: Optional[Callable[[str, int], None]] = None,
+    profile: Optional[ConversionProfile] = None,
+) -> list[dict]:
+    """
+    Import the converter output of several JMXData sources (e.g. one per method server)
+    and merge each table across sources into <folder_name>_<Table> with a SOURCE column.
+    Each source folder is imported with import_csv_folder into staged part tables first;
+    the merged tables are swapped in together at the end.
+    Returns a list of {"tableName", "rows"}.
+    """
+    parts: dict[str, list[tuple[str, str]]] = {}
+    for source, source_folder in source_folders:
+        prefix = table_name_for(Path(f"_{source}"), folder_name) + "_"  # <folder>__<source>_
+        for info in import_csv_folder(source_folder, prefix[:-1], profile=profile, swap=False, database=folder_name):
+            stem = info["tableName"][len(prefix):]
+            parts.setdefault(stem, []).append((source, staging_name_for(info["tableName"])))
+
+    merged = []
+    swapped = False
+    with write_connection(folder_name) as conn:
+        try:
+            for stem, table_parts in sorted(parts.items()):
+                table_name = table_name_for(Path(stem), folder_name)
+                try:
+                    rows = merge_source_tables(conn, table_name, table_parts)
+                except Exception as e:
+                    logger.error("❌ Failed to merge %d sources into %s: %s", len(table_parts), table_name, e)
+                    continue
+                logger.info("🔗 Merged %d sources into %s (%d rows)", len(table_parts), table_name, rows)
+                merged.append({"tableName": table_name, "rows": rows})
+                if on_table:
+                    on_table(table_name, rows)
+
+            swap_staged_tables(conn, [info["tableName"] for info in merged])
+            swapped = True
+        finally:
+            if not swapped:
+                discard_staged_tables(conn, [info["tableName"] for info in merged])
+            for table_parts in parts.values():
+                for _, part_table in table_parts:
+                    conn.execute(f"DROP TABLE IF EXISTS '{part_table}'")
+            conn.commit()
+
+    return merged
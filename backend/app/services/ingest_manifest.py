@@ -0,0 +1,93 @@
+import hashlib
+import json
+import shutil
+import threading
+from pathlib import Path
+from app.services.database import list_tables, table_name_for
+from app.utils.paths import INGEST_MANIFEST_PATH
+from app.utils.logging import logger
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def file_fingerprint(path: Path) -> dict:
+    """
+    {"size", "mtime", "sha256"} of a converter output file.
+    """
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest.hexdigest()}
+
+
+def _manifest_key(path: Path) -> str:
+    return str(path.resolve())
+
+
+def _load_manifest() -> dict:
+    if not INGEST_MANIFEST_PATH.exists():
+        return {}
+    try:
+        with INGEST_MANIFEST_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning("⚠️ Ignoring unreadable ingest manifest %s: %s", INGEST_MANIFEST_PATH, e)
+        return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    tmp_path = INGEST_MANIFEST_PATH.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.move(str(tmp_path), str(INGEST_MANIFEST_PATH))
+
+
+def record_ingested(entries: list[tuple[Path, dict, str, int]]) -> None:
+    """
+    Record (file, fingerprint, table_name, rows) for files that were just imported.
+    """
+    if not entries:
+        return
+    with _lock:
+        manifest = _load_manifest()
+        for path, fingerprint, table_name, rows in entries:
+            manifest[_manifest_key(path)] = {**fingerprint, "tableName": table_name, "rows": rows}
+        try:
+            _save_manifest(manifest)
+        except Exception as e:
+            logger.error("❌ Failed to write ingest manifest: %s", e)
+
+
+def stale_files(files: list[Path], folder_name: str) -> list[Path]:
+    """
+    Files whose table is missing from SQLite or whose content changed since it was imported.
+    A file with a new mtime but the same size and sha256 is still current (its mtime is refreshed).
+    """
+    existing = set(list_tables())
+    stale, refreshed = [], []
+
+    with _lock:
+        manifest = _load_manifest()
+
+    for path in files:
+        entry = manifest.get(_manifest_key(path))
+        if not entry or entry.get("tableName") != table_name_for(path, folder_name) or entry["tableName"] not in existing:
+            stale.append(path)
+            continue
+
+        stat = path.stat()
+        if stat.st_size != entry.get("size"):
+            stale.append(path)
+        elif stat.st_mtime != entry.get("mtime"):
+            fingerprint = file_fingerprint(path)
+            if fingerprint["sha256"] == entry.get("sha256"):
+                refreshed.append((path, fingerprint, entry["tableName"], entry.get("rows", 0)))
+            else:
+                stale.append(path)
+
+    record_ingested(refreshed)
+    return stale
@@ -0,0 +1,512 @@
+import gzip
+import struct
+from pathlib import Path
+from typing import Iterator
+from app.utils.logging import logger
+
+# Value type codes (same as ConvertPerfToCsv.java)
+NULL_TYPE = 0
+BYTE_TYPE = 1
+SHORT_TYPE = 2
+INTEGER_TYPE = 3
+LONG_TYPE = 4
+FLOAT_TYPE = 5
+DOUBLE_TYPE = 6
+BOOLEAN_TYPE = 7
+TIMESTAMP_AS_LONG_TYPE = 8
+BIG_DECIMAL_TYPE = 9
+OBJECT_TYPE = 10
+
+# SQLite column affinity for each value type code
+SQLITE_TYPES = {
+    BYTE_TYPE: "INTEGER",
+    SHORT_TYPE: "INTEGER",
+    INTEGER_TYPE: "INTEGER",
+    LONG_TYPE: "INTEGER",
+    FLOAT_TYPE: "REAL",
+    DOUBLE_TYPE: "REAL",
+    BOOLEAN_TYPE: "INTEGER",
+    TIMESTAMP_AS_LONG_TYPE: "INTEGER",
+    BIG_DECIMAL_TYPE: "REAL",
+    OBJECT_TYPE: "TEXT",
+}
+
+# Extra column appended to every table by the converter
+LATEST_SAMPLE_COLUMN = "latestSample"
+
+_INTEGRAL_TYPES = {BYTE_TYPE, SHORT_TYPE, INTEGER_TYPE, LONG_TYPE, TIMESTAMP_AS_LONG_TYPE}
+_NUMERIC_TYPES = _INTEGRAL_TYPES | {FLOAT_TYPE, DOUBLE_TYPE, BIG_DECIMAL_TYPE}
+
+# java.io.ObjectStreamConstants
+_STREAM_MAGIC = 0xACED
+_STREAM_VERSION = 5
+_TC_NULL = 0x70
+_TC_REFERENCE = 0x71
+_TC_CLASSDESC = 0x72
+_TC_OBJECT = 0x73
+_TC_STRING = 0x74
+_TC_ARRAY = 0x75
+_TC_CLASS = 0x76
+_TC_BLOCKDATA = 0x77
+_TC_ENDBLOCKDATA = 0x78
+_TC_RESET = 0x79
+_TC_BLOCKDATALONG = 0x7A
+_TC_LONGSTRING = 0x7C
+_TC_PROXYCLASSDESC = 0x7D
+_TC_ENUM = 0x7E
+_BASE_WIRE_HANDLE = 0x7E0000
+_SC_WRITE_METHOD = 0x01
+_SC_SERIALIZABLE = 0x02
+_SC_EXTERNALIZABLE = 0x04
+
+_PRIMITIVE_SIZES = {"B": 1, "C": 2, "D": 8, "F": 4, "I": 4, "J": 8, "S": 2, "Z": 1}
+_PRIMITIVE_FORMATS = {"B": ">b", "C": ">H", "D": ">d", "F": ">f", "I": ">i", "J": ">q", "S": ">h", "Z": ">?"}
+_BOXED_CLASSES = {
+    "java.lang.Byte", "java.lang.Short", "java.lang.Integer", "java.lang.Long",
+    "java.lang.Float", "java.lang.Double", "java.lang.Boolean",
+}
+
+_unpack_byte = struct.Struct(">b").unpack
+_unpack_short = struct.Struct(">h").unpack
+_unpack_int = struct.Struct(">i").unpack
+_unpack_long = struct.Struct(">q").unpack
+_unpack_float = struct.Struct(">f").unpack
+_unpack_double = struct.Struct(">d").unpack
+_unpack_u2 = struct.Struct(">H").unpack
+_unpack_u4 = struct.Struct(">I").unpack
+
+
+def widen_type(current: int, type_code: int) -> int:
+    """
+    Column type once a value of type_code has been seen (same rules as ConvertPerfToCsv.widen):
+    mixed integer codes -> LONG, mixed numeric codes -> DOUBLE, anything else mixed -> OBJECT.
+    """
+    if type_code == NULL_TYPE or type_code == current:
+        return current
+    if current == NULL_TYPE:
+        return type_code if type_code in SQLITE_TYPES else OBJECT_TYPE
+    if current in _INTEGRAL_TYPES and type_code in _INTEGRAL_TYPES:
+        return LONG_TYPE
+    if current in _NUMERIC_TYPES and type_code in _NUMERIC_TYPES:
+        return DOUBLE_TYPE
+    return OBJECT_TYPE
+
+
+class _ClassDesc:
+    __slots__ = ("name", "flags", "fields", "super_desc")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.flags = 0
+        self.fields = []
+        self.super_desc = None
+
+    def hierarchy(self) -> list:
+        """
+        Class descriptors from the top-most superclass down to this class,
+        which is the order the serial data is written in.
+        """
+        chain, desc = [], self
+        while desc is not None:
+            chain.append(desc)
+            desc = desc.super_desc
+        return list(reversed(chain))
+
+
+class _JavaObject:
+    __slots__ = ("class_name", "fields", "annotations")
+
+    def __init__(self, class_name: str):
+        self.class_name = class_name
+        self.fields = {}
+        self.annotations = []
+
+    def __str__(self) -> str:
+        return self.class_name
+
+
+def _decode_modified_utf8(data: bytes) -> str:
+    """
+    Decode Java's modified UTF-8 (encoded NUL and CESU-8 surrogate pairs).
+    """
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+        return text.encode("utf-16", "surrogatepass").decode("utf-16")
+
+
+def _float32(value: float, raw: bytes) -> float:
+    """
+    Shortest decimal for a Java float, matching what Float.toString() wrote to CSV.
+    """
+    for precision in range(6, 10):
+        candidate = float(f"{value:.{precision}g}")
+        if struct.pack(">f", candidate) == raw:
+            return candidate
+    return value
+
+
+class _ObjectStreamReader:
+    """
+    Minimal java.io.ObjectInputStream: primitive reads in block-data mode plus
+    readObject() for the strings, BigDecimals and boxed values found in JMXData.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._handles = []
+        self._block = b""
+        self._pos = 0
+        self._block_mode = True
+
+        magic, version = struct.unpack(">HH", self._read_raw(4))
+        if magic != _STREAM_MAGIC or version != _STREAM_VERSION:
+            raise ValueError(f"Not a Java object stream (magic={magic:#x}, version={version})")
+
+    # -- raw and block-data byte access --------------------------------------
+
+    def _read_raw(self, n: int) -> bytes:
+        data = self._stream.read(n)
+        if len(data) != n:
+            raise EOFError("Unexpected end of JMXData stream")
+        return data
+
+    def _next_block(self) -> None:
+        while True:
+            tc = self._read_raw(1)[0]
+            if tc == _TC_BLOCKDATA:
+                size = self._read_raw(1)[0]
+            elif tc == _TC_BLOCKDATALONG:
+                size = _unpack_u4(self._read_raw(4))[0]
+            elif tc == _TC_RESET:
+                self._handles.clear()
+                continue
+            else:
+                raise ValueError(f"Expected block data, found type code {tc:#x}")
+            self._block = self._read_raw(size)
+            self._pos = 0
+            return
+
+    def _read(self, n: int) -> bytes:
+        if not self._block_mode:
+            return self._read_raw(n)
+
+        end = self._pos + n
+        if end <= len(self._block):
+            data = self._block[self._pos:end]
+            self._pos = end
+            return data
+
+        # Primitive value split across block-data records
+        parts = []
+        while n:
+            if self._pos >= len(self._block):
+                self._next_block()
+            chunk = self._block[self._pos:self._pos + n]
+            self._pos += len(chunk)
+            n -= len(chunk)
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def read_boolean(self) -> bool:
+        return self._read(1) != b"\x00"
+
+    def read_byte(self) -> int:
+        return _unpack_byte(self._read(1))[0]
+
+    def read_short(self) -> int:
+        return _unpack_short(self._read(2))[0]
+
+    def read_int(self) -> int:
+        return _unpack_int(self._read(4))[0]
+
+    def read_long(self) -> int:
+        return _unpack_long(self._read(8))[0]
+
+    def read_float(self) -> float:
+        raw = self._read(4)
+        return _float32(_unpack_float(raw)[0], raw)
+
+    def read_double(self) -> float:
+        return _unpack_double(self._read(8))[0]
+
+    # -- object graph --------------------------------------------------------
+
+    def _read_utf(self) -> str:
+        return _decode_modified_utf8(self._read_raw(_unpack_u2(self._read_raw(2))[0]))
+
+    def _assign_handle(self, obj) -> int:
+        self._handles.append(obj)
+        return len(self._handles) - 1
+
+    def read_object(self):
+        """
+        Read the next object. In block-data mode any unread block data is an error,
+        exactly like ObjectInputStream's OptionalDataException.
+        """
+        if self._block_mode and self._pos < len(self._block):
+            raise ValueError("Unread primitive data before object")
+
+        previous_mode = self._block_mode
+        self._block_mode = False
+        try:
+            return self._read_content(self._read_raw(1)[0])
+        finally:
+            self._block_mode = previous_mode
+
+    def _read_content(self, tc: int):
+        while tc == _TC_RESET:
+            self._handles.clear()
+            tc = self._read_raw(1)[0]
+
+        if tc == _TC_NULL:
+            return None
+        if tc == _TC_REFERENCE:
+            return self._handles[_unpack_u4(self._read_raw(4))[0] - _BASE_WIRE_HANDLE]
+        if tc == _TC_STRING:
+            value = self._read_utf()
+            self._assign_handle(value)
+            return value
+        if tc == _TC_LONGSTRING:
+            value = _decode_modified_utf8(self._read_raw(_unpack_long(self._read_raw(8))[0]))
+            self._assign_handle(value)
+            return value
+        if tc in (_TC_CLASSDESC, _TC_PROXYCLASSDESC):
+            return self._read_class_desc_body(tc)
+        if tc == _TC_CLASS:
+            desc = self._read_next()
+            self._assign_handle(desc)
+            return desc
+        if tc == _TC_OBJECT:
+            return self._read_ordinary_object()
+        if tc == _TC_ARRAY:
+            return self._read_array()
+        if tc == _TC_ENUM:
+            self._read_next()
+            handle = self._assign_handle(None)
+            name = self._read_content(self._read_raw(1)[0])
+            self._handles[handle] = name
+            return name
+        raise ValueError(f"Unsupported object stream type code {tc:#x}")
+
+    def _read_next(self):
+        return self._read_content(self._read_raw(1)[0])
+
+    def _read_class_desc_body(self, tc: int) -> _ClassDesc:
+        if tc == _TC_PROXYCLASSDESC:
+            desc = _ClassDesc("$Proxy")
+            self._assign_handle(desc)
+            for _ in range(_unpack_int(self._read_raw(4))[0]):
+                self._read_utf()
+        else:
+            desc = _ClassDesc(self._read_utf())
+            self._read_raw(8)  # serialVersionUID
+            self._assign_handle(desc)
+            desc.flags = self._read_raw(1)[0]
+            for _ in range(_unpack_short(self._read_raw(2))[0]):
+                type_code = chr(self._read_raw(1)[0])
+                field_name = self._read_utf()
+                if type_code in ("L", "["):
+                    self._read_next()  # field class name string
+                desc.fields.append((type_code, field_name))
+
+        self._read_annotation()
+        desc.super_desc = self._read_next()
+        return desc
+
+    def _read_annotation(self) -> list:
+        """
+        Read block data and objects up to TC_ENDBLOCKDATA (class/object annotations).
+        """
+        contents = []
+        previous_mode = self._block_mode
+        self._block_mode = False
+        try:
+            while True:
+                tc = self._read_raw(1)[0]
+                if tc == _TC_ENDBLOCKDATA:
+                    return contents
+                if tc == _TC_BLOCKDATA:
+                    contents.append(self._read_raw(self._read_raw(1)[0]))
+                elif tc == _TC_BLOCKDATALONG:
+                    contents.append(self._read_raw(_unpack_u4(self._read_raw(4))[0]))
+                else:
+                    contents.append(self._read_content(tc))
+        finally:
+            self._block_mode = previous_mode
+
+    def _read_field_values(self, desc: _ClassDesc, obj: _JavaObject) -> None:
+        for type_code, field_name in desc.fields:
+            if type_code in _PRIMITIVE_SIZES:
+                raw = self._read_raw(_PRIMITIVE_SIZES[type_code])
+                obj.fields[field_name] = struct.unpack(_PRIMITIVE_FORMATS[type_code], raw)[0]
+            else:
+                obj.fields[field_name] = self._read_next()
+
+    def _read_ordinary_object(self):
+        desc = self._read_next()
+        obj = _JavaObject(desc.name)
+        handle = self._assign_handle(obj)
+
+        if desc.flags & _SC_EXTERNALIZABLE:
+            obj.annotations.extend(self._read_annotation())
+        else:
+            for cls in desc.hierarchy():
+                if cls.flags & _SC_SERIALIZABLE:
+                    self._read_field_values(cls, obj)
+                if cls.flags & _SC_WRITE_METHOD:
+                    obj.annotations.extend(self._read_annotation())
+
+        value = _resolve_object(obj)
+        self._handles[handle] = value
+        return value
+
+    def _read_array(self):
+        desc = self._read_next()
+        handle = self._assign_handle(None)
+        size = _unpack_int(self._read_raw(4))[0]
+        element = desc.name[1:2]
+
+        if element == "B":
+            value = self._read_raw(size)
+        elif element in _PRIMITIVE_SIZES:
+            fmt = ">" + _PRIMITIVE_FORMATS[element][1] * size
+            value = list(struct.unpack(fmt, self._read_raw(_PRIMITIVE_SIZES[element] * size)))
+        else:
+            value = [self._read_next() for _ in range(size)]
+
+        self._handles[handle] = value
+        return value
+
+
+def _resolve_object(obj: _JavaObject):
+    """
+    Turn the Java value types that appear in JMXData into Python values.
+    """
+    if obj.class_name == "java.math.BigInteger":
+        magnitude = obj.fields.get("magnitude") or b""
+        return obj.fields.get("signum", 0) * int.from_bytes(magnitude, "big")
+    if obj.class_name == "java.math.BigDecimal":
+        unscaled = obj.fields.get("intVal") or 0
+        scale = obj.fields.get("scale", 0)
+        if scale <= 0:
+            return unscaled * 10 ** -scale
+        return float(f"{unscaled}e-{scale}")
+    if obj.class_name in _BOXED_CLASSES:
+        return obj.fields.get("value")
+    if obj.class_name in ("java.util.Date", "java.sql.Timestamp") and obj.annotations:
+        # Date writes the epoch millis; a Timestamp's are whole seconds, the fraction is in nanos
+        return _unpack_long(obj.annotations[0][:8])[0] + obj.fields.get("nanos", 0) // 1_000_000
+    return obj
+
+
+class JmxTable:
+    """
+    One table section of a JMXData stream. Rows must be consumed (or skipped)
+    through batches() before the next table can be read.
+    """
+
+    def __init__(self, reader: _ObjectStreamReader, name: str, columns: list[str]):
+        self._reader = reader
+        self.name = name
+        self.columns = columns
+        self.type_codes = [NULL_TYPE] * len(columns)
+        self.row_count = 0
+        self._exhausted = False
+
+    def _read_value(self, type_code: int):
+        reader = self._reader
+        if type_code == NULL_TYPE:
+            return None
+        if type_code in (LONG_TYPE, TIMESTAMP_AS_LONG_TYPE):
+            return reader.read_long()
+        if type_code == INTEGER_TYPE:
+            return reader.read_int()
+        if type_code == DOUBLE_TYPE:
+            return reader.read_double()
+        if type_code == BOOLEAN_TYPE:
+            return reader.read_boolean()
+        if type_code == SHORT_TYPE:
+            return reader.read_short()
+        if type_code == BYTE_TYPE:
+            return reader.read_byte()
+        if type_code == FLOAT_TYPE:
+            return reader.read_float()
+
+        value = reader.read_object()
+        if type_code == BIG_DECIMAL_TYPE or value is None:
+            return value
+        if isinstance(value, (str, int, float, bool)):
+            return value
+        return str(value)
+
+    def batches(self, batch_size: int = 5000) -> Iterator[list[tuple]]:
+        """
+        Yield rows as lists of tuples (one value per column plus latestSample=0).
+        """
+        if self._exhausted:
+            return
+        reader = self._reader
+        type_codes = self.type_codes
+        n_columns = len(self.columns)
+        batch = []
+
+        while reader.read_boolean():
+            row = [None] * (n_columns + 1)
+            for i in range(n_columns):
+                type_code = reader.read_byte()
+                row[i] = self._read_value(type_code)
+                if type_code != type_codes[i] and type_code != NULL_TYPE:
+                    type_codes[i] = widen_type(type_codes[i], type_code)
+            row[n_columns] = 0
+            batch.append(tuple(row))
+            if len(batch) >= batch_size:
+                self.row_count += len(batch)
+                yield batch
+                batch = []
+
+        self._exhausted = True
+        if batch:
+            self.row_count += len(batch)
+            yield batch
+
+    def skip(self) -> None:
+        for _ in self.batches():
+            pass
+
+    def column_types(self) -> list[str]:
+        """
+        SQLite column types from the type codes seen so far in each column.
+        """
+        types = [SQLITE_TYPES.get(code, "") for code in self.type_codes]
+        return types + ["INTEGER"]
+
+
+def iter_jmxdata_tables(input_gz: Path) -> Iterator[JmxTable]:
+    """
+    Stream the tables of a JMXData.gz file, the same way ConvertPerfToCsv.convertAllMembers does.
+    """
+    with gzip.open(input_gz, "rb") as gz:
+        reader = _ObjectStreamReader(gz)
+
+        version = [reader.read_int() for _ in range(4)]
+        qualifier = reader.read_object()
+        logger.info("📄 JMXData version: %s %s", version, qualifier)
+
+        while True:
+            try:
+                table_name = reader.read_object()
+            except EOFError:
+                logger.info("Reached EOF, no more tables")
+                break
+            if table_name is None:
+                logger.info("Null table name, stopping")
+                break
+
+            n_columns = reader.read_int()
+            columns = [reader.read_object() for _ in range(n_columns)]
+
+            table = JmxTable(reader, table_name, columns)
+            yield table
+            table.skip()
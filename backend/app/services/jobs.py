@@ -0,0 +1,154 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from app.services.config import load_config
+from app.utils.logging import logger
+
+# Finished jobs kept for status queries (oldest dropped first)
+MAX_FINISHED_JOBS = 100
+
+
+class IngestJob:
+    """
+    Progress of one upload through the ingest pipeline.
+    Stages: queued -> saving -> extracting -> converting -> importing -> activating -> completed | failed
+    """
+
+    def __init__(self, folder_name: str, filename: str):
+        self.id = uuid.uuid4().hex
+        self.folder_name = folder_name
+        self.filename = filename
+        self.status = "queued"
+        self.stage = "queued"
+        self.current_table = None
+        self.tables = []
+        self.rows_done = 0
+        self.rows_total = 0
+        self.created_at = time.time()
+        self.stage_started_at = self.created_at
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage: str) -> None:
+        with self._lock:
+            self.stage = stage
+            self.stage_started_at = time.time()
+            self.current_table = None
+            if stage == "importing" and self.rows_total:
+                # Converter reported the expected rows; count them again as they land in SQLite
+                self.rows_done = 0
+        logger.info("🔄 [JOB %s] Stage: %s", self.id[:8], stage)
+
+    def add_expected_rows(self, rows: int) -> None:
+        with self._lock:
+            self.rows_total += rows
+
+    def table_done(self, table_name: str, rows: int, source: Optional[str] = None) -> None:
+        with self._lock:
+            entry = {"tableName": table_name, "rows": rows, "stage": self.stage}
+            if source:
+                entry["source"] = source
+            self.tables.append(entry)
+            self.current_table = table_name
+            self.rows_done += rows
+
+    def finish(self, result: dict) -> None:
+        with self._lock:
+            self.result = result
+            self.error = result.get("error")
+            self.status = "failed" if self.error else "completed"
+            self.stage = self.status
+            self.finished_at = time.time()
+
+    def fail(self, error: str) -> None:
+        self.finish({"message": "Upload processing failed", "error": error})
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            now = self.finished_at or time.time()
+            stage_elapsed = max(now - self.stage_started_at, 1e-6)
+            rows_per_sec = self.rows_done / stage_elapsed if self.rows_done else 0.0
+
+            eta = None
+            if self.stage == "importing" and rows_per_sec and self.rows_total >= self.rows_done:
+                eta = round((self.rows_total - self.rows_done) / rows_per_sec, 1)
+
+            return {
+                "job_id": self.id,
+                "folder": self.folder_name,
+                "filename": self.filename,
+                "status": self.status,
+                "stage": self.stage,
+                "current_table": self.current_table,
+                "tables": list(self.tables),
+                "rows_done": self.rows_done,
+                "rows_total": self.rows_total or None,
+                "rows_per_sec": round(rows_per_sec, 1),
+                "eta_seconds": eta,
+                "elapsed_seconds": round(now - self.created_at, 1),
+                "result": self.result,
+            }
+
+
+class JobQueue:
+    """
+    Background ingest queue. At most maxConcurrentIngests uploads are processed at once;
+    the rest wait in the executor's queue.
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                workers = max(1, int(load_config().get("maxConcurrentIngests", 2)))
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+                logger.info("🧵 Ingest queue started with %d workers", workers)
+            return self._executor
+
+    def create(self, folder_name: str, filename: str) -> IngestJob:
+        job = IngestJob(folder_name, filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j for j in self._jobs.values() if j.finished_at]
+            for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                self._jobs.pop(old.id, None)
+        return job
+
+    def submit(self, job: IngestJob, fn: Callable[[IngestJob], dict]) -> None:
+        def run():
+            job.status = "running"
+            try:
+                job.finish(fn(job))
+            except Exception as e:
+                logger.error("❌ [JOB %s] Failed: %s", job.id[:8], e)
+                job.fail(str(e))
+            logger.info("🏁 [JOB %s] %s in %.1fs", job.id[:8], job.status, job.finished_at - job.created_at)
+
+        job.set_stage("queued")
+        self._get_executor().submit(run)
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[IngestJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+job_queue = JobQueue()
@@ -0,0 +1,120 @@
+import sqlite3
+import uuid
+from typing import Any, Optional
+
+from app.utils.logging import logger
+
+HOUR_MS = 3_600_000
+
+# Table families whose events are counted into a cube at ingest
+LOG_EVENT_FAMILIES = ["MiscLogEvents", "JmxNotifications", "MethodContexts", "ServletRequests"]
+
+# Cube tables are named <table>__logcube
+LOG_CUBE_MARKER = "__logcube"
+
+
+def log_cube_name_for(table_name: str) -> str:
+    return f"{table_name}{LOG_CUBE_MARKER}"
+
+
+def build_log_cube(conn: sqlite3.Connection, source_table: str, table_name: str, target_prefix: str = "") -> Optional[str]:
+    """
+    Materialize the event counts of source_table by (LE_LOGGERNAME, LE_LEVEL, JVM_ID, hour)
+    into <target_prefix><table_name>__logcube. Only log-event tables with LE_LEVEL get one.
+    Returns the cube table name (without target_prefix), or None.
+    """
+    if not any(table_name.lower().endswith(f"_{family.lower()}") for family in LOG_EVENT_FAMILIES):
+        return None
+    columns = {row[1].upper() for row in conn.execute(f"PRAGMA table_info('{source_table}')")}
+    if "LE_LEVEL" not in columns:
+        return None
+
+    def column_or_null(column: str) -> str:
+        return column if column in columns else "NULL"
+
+    cube_name = log_cube_name_for(table_name)
+    target = f"{target_prefix}{cube_name}"
+    bucket = f"CAST(LE_TIMESTAMP AS INTEGER) / {HOUR_MS} * {HOUR_MS}" if "LE_TIMESTAMP" in columns else "NULL"
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS '{target}'")
+        conn.execute(f"""
+            CREATE TABLE '{target}' AS
+            SELECT {column_or_null("LE_LOGGERNAME")} AS LE_LOGGERNAME, LE_LEVEL,
+                   {column_or_null("JVM_ID")} AS JVM_ID, {bucket} AS bucket_ts, COUNT(*) AS "COUNT"
+            FROM '{source_table}'
+            GROUP BY 1, 2, 3, 4
+        """)
+        conn.execute(f"CREATE INDEX 'ix_{cube_name}_{uuid.uuid4().hex[:8]}' ON '{target}' (LE_LEVEL, bucket_ts)")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    cells = conn.execute(f"SELECT COUNT(*) FROM '{target}'").fetchone()[0]
+    logger.info("🧊 Built log event cube of %s (%d cells)", table_name, cells)
+    return cube_name
+
+
+def drop_log_cube(conn: sqlite3.Connection, table_name: str) -> None:
+    conn.execute(f"DROP TABLE IF EXISTS '{log_cube_name_for(table_name)}'")
+    conn.commit()
+
+
+def log_event_counts(
+    table_name: str,
+    cube_name: Optional[str],
+    group_columns: str,
+    filters: list[str],
+    params: list[Any],
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+) -> tuple[str, list[Any], list[str]]:
+    """
+    (sql, params, tables) of a query returning group_columns and n, the number of events of
+    table_name per group, with filters (on LE_LEVEL/JVM_ID) and LE_TIMESTAMP in
+    [start_ms, end_ms] applied; sum n per group for the total. Whole hours are read from
+    cube_name, only the partial hours at the range edges from the table itself.
+    Without a cube (None) the table is scanned.
+    """
+    def raw(lower: Optional[int], upper: Optional[int]) -> tuple[str, list[Any]]:
+        where, where_params = list(filters), list(params)
+        if lower is not None:
+            where.append("LE_TIMESTAMP >= ?")
+            where_params.append(lower)
+        if upper is not None:
+            where.append("LE_TIMESTAMP <= ?")
+            where_params.append(upper)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        return f"""SELECT {group_columns}, COUNT(*) AS n FROM "{table_name}" {where_sql} GROUP BY {group_columns}""", where_params
+
+    # Whole hours inside [start_ms, end_ms]: bucket_ts in [cube_start, cube_end)
+    cube_start = -(-start_ms // HOUR_MS) * HOUR_MS if start_ms is not None else None
+    cube_end = (end_ms + 1) // HOUR_MS * HOUR_MS if end_ms is not None else None
+    if cube_name is None or (cube_start is not None and cube_end is not None and cube_start >= cube_end):
+        sql, sql_params = raw(start_ms, end_ms)
+        return sql, sql_params, [table_name]
+
+    where, cube_params = list(filters), list(params)
+    if cube_start is not None:
+        where.append("bucket_ts >= ?")
+        cube_params.append(cube_start)
+    if cube_end is not None:
+        where.append("bucket_ts < ?")
+        cube_params.append(cube_end)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    parts = [f"""SELECT {group_columns}, SUM("COUNT") AS n FROM "{cube_name}" {where_sql} GROUP BY {group_columns}"""]
+    tables = [cube_name]
+
+    edges = []
+    if start_ms is not None and start_ms < cube_start:
+        edges.append((start_ms, cube_start - 1))
+    if end_ms is not None and cube_end <= end_ms:
+        edges.append((cube_end, end_ms))
+    for lower, upper in edges:
+        sql, edge_params = raw(lower, upper)
+        parts.append(sql)
+        cube_params.extend(edge_params)
+    if edges:
+        tables.append(table_name)
+    return " UNION ALL ".join(parts), cube_params, tables
@@ -0,0 +1,54 @@
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from app.utils.logging import logger
+
+# Folder whose tables currently hold preview samples while the full import runs
+_preview_folder: Optional[str] = None
+_lock = threading.Lock()
+
+
+def set_preview_folder(folder_name: Optional[str]) -> None:
+    """
+    Mark folder_name as the active dataset in preview mode (None clears it).
+    """
+    global _preview_folder
+    with _lock:
+        _preview_folder = folder_name
+    if folder_name:
+        logger.info("👀 Dataset %s is active in preview mode", folder_name)
+
+
+def preview_folder() -> Optional[str]:
+    with _lock:
+        return _preview_folder
+
+
+def finish_preview(folder_name: str) -> bool:
+    """
+    Leave preview mode for folder_name. Returns True if it was still the active preview
+    (False when another dataset was activated in the meantime).
+    """
+    global _preview_folder
+    with _lock:
+        if _preview_folder != folder_name:
+            return False
+        _preview_folder = None
+    logger.info("✅ Dataset %s fully imported, preview mode off", folder_name)
+    return True
+
+
+def stratified_sample_indexes(timestamps: pd.Series, limit: int) -> list[int]:
+    """
+    Positions of the first row in each of limit equal time intervals between the
+    smallest and largest timestamp (rows without a timestamp are never picked).
+    """
+    valid = pd.to_numeric(timestamps, errors="coerce").dropna()
+    if valid.empty:
+        return list(range(min(limit, len(timestamps))))
+    low, high = float(valid.min()), float(valid.max())
+    span = max(high - low, 1.0)
+    buckets = ((valid - low) * (limit - 1) // span).astype("int64")
+    return sorted(int(i) for i in buckets.index[~buckets.duplicated(keep="first")])
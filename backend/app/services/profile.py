@@ -0,0 +1,193 @@
+from typing import Callable, Optional
+
+import pandas as pd
+
+from app.services.jmxdata import LATEST_SAMPLE_COLUMN
+
+# Column the time window is applied to (ms since epoch)
+WINDOW_COLUMN = "LE_TIMESTAMP"
+
+HOUR_MS = 3600 * 1000
+
+
+class ConversionProfile:
+    """
+    Subset of a JMXData bundle to convert and import: which tables, which columns
+    and which LE_TIMESTAMP window [start_ms, end_ms]. None means "everything".
+    columns holds names kept in every table; table_columns holds names kept per table.
+    last_ms is a window relative to the capture: the last last_ms of each table, ending at
+    its newest LE_TIMESTAMP. It is only known once a table is read in full, so converters
+    keep every row and the importer trims the table (trim_to_last_window).
+    LE_TIMESTAMP and latestSample are always kept; tables without LE_TIMESTAMP are not
+    filtered by the window.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[list[str]] = None,
+        columns: Optional[list[str]] = None,
+        table_columns: Optional[dict[str, list[str]]] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        last_ms: Optional[int] = None,
+    ):
+        self.tables = set(tables) if tables else None
+        self.columns = set(columns) if columns else None
+        self.table_columns = {t: set(c) for t, c in (table_columns or {}).items()}
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.last_ms = last_ms
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConversionProfile":
+        """
+        Build a profile from the upload's JSON, e.g.
+          {"tables": ["TopSQLStats", "ServletRequests"], "columns": {"TopSQLStats": ["SQL", "ELAPSED"]},
+           "lastHours": 6}
+        "columns" is either a list (kept in every table) or a {table: [columns]} map;
+        the window is "from"/"to" (ms since epoch) or "lastHours" (the hours before each
+        table's newest LE_TIMESTAMP: bundles are analysed long after they were captured).
+        """
+        if not isinstance(data, dict):
+            raise ValueError("profile must be a JSON object")
+
+        columns = data.get("columns")
+        global_columns, table_columns = None, None
+        if isinstance(columns, dict):
+            table_columns = {str(t): [str(c) for c in cols] for t, cols in columns.items()}
+        elif columns:
+            global_columns = [str(c) for c in columns]
+
+        last_ms = None
+        if data.get("lastHours") is not None:
+            last_ms = int(float(data["lastHours"]) * HOUR_MS)
+            if last_ms < 0:
+                raise ValueError("lastHours must not be negative")
+
+        return cls(
+            tables=[str(t) for t in data.get("tables") or []],
+            columns=global_columns,
+            table_columns=table_columns,
+            start_ms=int(data["from"]) if data.get("from") is not None else None,
+            end_ms=int(data["to"]) if data.get("to") is not None else None,
+            last_ms=last_ms,
+        )
+
+    def is_empty(self) -> bool:
+        return (
+            self.tables is None and self.columns is None and not self.table_columns
+            and self.start_ms is None and self.end_ms is None and self.last_ms is None
+        )
+
+    def to_spec(self, converter: bool = False) -> str:
+        """
+        Profile as "tables=A,B;columns=X,Table.Y;from=ms;to=ms;last=ms", a stable key for
+        telling uploads of one bundle with different profiles apart.
+        converter=True gives the converter's job format, without last (applied on import).
+        """
+        parts = []
+        if self.tables:
+            parts.append("tables=" + ",".join(sorted(self.tables)))
+        column_entries = sorted(self.columns or []) + sorted(
+            f"{t}.{c}" for t, cols in self.table_columns.items() for c in cols
+        )
+        if column_entries:
+            parts.append("columns=" + ",".join(column_entries))
+        if self.start_ms is not None:
+            parts.append(f"from={self.start_ms}")
+        if self.end_ms is not None:
+            parts.append(f"to={self.end_ms}")
+        if self.last_ms is not None and not converter:
+            parts.append(f"last={self.last_ms}")
+        return ";".join(parts)
+
+    def wants_table(self, table: str) -> bool:
+        return self.tables is None or table in self.tables
+
+    def wants_column(self, table: str, column: str) -> bool:
+        if column in (WINDOW_COLUMN, LATEST_SAMPLE_COLUMN):
+            return True
+        if self.columns is None and table not in self.table_columns:
+            return True
+        return column in (self.columns or set()) or column in self.table_columns.get(table, set())
+
+    def column_indexes(self, table: str, columns: list[str]) -> list[int]:
+        return [i for i, c in enumerate(columns) if self.wants_column(table, c)]
+
+    def resolved(self, newest_ms) -> "ConversionProfile":
+        """
+        This profile with last_ms turned into an absolute window ending at newest_ms
+        (the table's newest LE_TIMESTAMP; None when it has none).
+        """
+        if self.last_ms is None or newest_ms is None:
+            return self
+        newest_ms = int(newest_ms)
+        start_ms = newest_ms - self.last_ms
+        return ConversionProfile(
+            tables=list(self.tables or []),
+            columns=list(self.columns or []),
+            table_columns={t: list(c) for t, c in self.table_columns.items()},
+            start_ms=max(start_ms, self.start_ms) if self.start_ms is not None else start_ms,
+            end_ms=min(newest_ms, self.end_ms) if self.end_ms is not None else newest_ms,
+        )
+
+    def in_window(self, timestamp) -> bool:
+        if timestamp is None:
+            return False
+        if self.start_ms is not None and timestamp < self.start_ms:
+            return False
+        if self.end_ms is not None and timestamp > self.end_ms:
+            return False
+        return True
+
+    def row_filter(self, columns: list[str]) -> Optional[Callable[[tuple], bool]]:
+        """
+        Predicate on full rows of a table with these columns, or None when every row is kept.
+        """
+        if (self.start_ms is None and self.end_ms is None) or WINDOW_COLUMN not in columns:
+            return None
+        index = columns.index(WINDOW_COLUMN)
+        return lambda row: self.in_window(row[index])
+
+    def batch_selector(self, table: str, columns: list[str]) -> tuple[list[int], Callable[[list[tuple]], list[tuple]]]:
+        """
+        (kept column indexes, function filtering a batch of full rows down to the profile).
+        """
+        keep = self.column_indexes(table, columns)
+        row_filter = self.row_filter(columns)
+        all_columns = len(keep) == len(columns)
+
+        def select(batch: list[tuple]) -> list[tuple]:
+            if row_filter:
+                batch = [row for row in batch if row_filter(row)]
+            if not all_columns:
+                batch = [tuple(row[i] for i in keep) for row in batch]
+            return batch
+
+        return keep, select
+
+    def filter_frame(self, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply the window and column selection to a DataFrame read from a converter output file.
+        """
+        columns = [str(c) for c in df.columns]
+        if (self.start_ms is not None or self.end_ms is not None) and WINDOW_COLUMN in columns:
+            timestamps = pd.to_numeric(df[WINDOW_COLUMN], errors="coerce")
+            mask = timestamps.notna()
+            if self.start_ms is not None:
+                mask &= timestamps >= self.start_ms
+            if self.end_ms is not None:
+                mask &= timestamps <= self.end_ms
+            df = df[mask.fillna(False).astype(bool)]
+        keep = [c for c in columns if self.wants_column(table, c)]
+        return df[keep] if len(keep) != len(columns) else df
+
+
+def parse_profile(data: Optional[dict]) -> Optional[ConversionProfile]:
+    """
+    ConversionProfile from the upload's JSON, or None when it selects everything.
+    """
+    if not data:
+        return None
+    profile = ConversionProfile.from_dict(data)
+    return None if profile.is_empty() else profile
@@ -0,0 +1,150 @@
+import functools
+import hashlib
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+from app.services.config import cached_config
+from app.services.connections import active_folder
+from app.services.preview import preview_folder
+from app.utils.paths import RESPONSE_CACHE_DIR
+from app.utils.logging import logger
+
+MB = 1024 * 1024
+
+_lock = threading.Lock()
+_version = 0  # dataset version, bumped by invalidate_responses
+_memory: "OrderedDict[tuple, tuple[Any, int]]" = OrderedDict()
+_memory_bytes = 0
+_disk: "OrderedDict[tuple, tuple[Path, int]]" = OrderedDict()
+_disk_bytes = 0
+
+_MISS = object()
+
+
+def _budgets() -> tuple[int, int]:
+    config = cached_config()
+    return int(config.get("responseCacheMb", 256) or 0) * MB, int(config.get("responseCacheDiskMb", 0) or 0) * MB
+
+
+def _normalized(args: tuple, kwargs: dict) -> tuple:
+    return tuple(repr(a) for a in args) + tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+
+
+def _disk_path(key: tuple) -> Path:
+    return RESPONSE_CACHE_DIR / f"{hashlib.sha256(repr(key).encode('utf-8')).hexdigest()}.pkl"
+
+
+def _spill(key: tuple, payload: bytes, disk_budget: int) -> None:
+    # Caller holds _lock
+    global _disk_bytes
+    if len(payload) > disk_budget:
+        return
+    path = _disk_path(key)
+    try:
+        RESPONSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(payload)
+    except OSError as e:
+        logger.warning("⚠️ Failed to spill cached response to %s: %s", path, e)
+        return
+    _disk[key] = (path, len(payload))
+    _disk_bytes += len(payload)
+    while _disk_bytes > disk_budget:
+        _, (evicted_path, size) = _disk.popitem(last=False)
+        _disk_bytes -= size
+        evicted_path.unlink(missing_ok=True)
+
+
+def _get(key: tuple) -> Any:
+    global _disk_bytes
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key][0]
+        if key not in _disk:
+            return _MISS
+        path, size = _disk.pop(key)
+        _disk_bytes -= size
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        logger.warning("⚠️ Dropping unreadable cached response %s: %s", path, e)
+        return _MISS
+    finally:
+        path.unlink(missing_ok=True)
+    _put(key, value)  # back into memory
+    return value
+
+
+def _put(key: tuple, value: Any) -> None:
+    global _memory_bytes
+    memory_budget, disk_budget = _budgets()
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    size = len(payload)
+    with _lock:
+        if key[1] != _version:  # invalidated while it was computed
+            return
+        if size > memory_budget:
+            if disk_budget:
+                _spill(key, payload, disk_budget)
+            return
+        if key in _memory:
+            _memory_bytes -= _memory.pop(key)[1]
+        _memory[key] = (value, size)
+        _memory_bytes += size
+        while _memory_bytes > memory_budget:
+            evicted_key, (evicted, evicted_size) = _memory.popitem(last=False)
+            _memory_bytes -= evicted_size
+            if disk_budget:
+                _spill(evicted_key, pickle.dumps(evicted, protocol=pickle.HIGHEST_PROTOCOL), disk_budget)
+
+
+def dataset_version() -> int:
+    """
+    Bumped by invalidate_responses whenever tables or the active dataset change.
+    """
+    return _version
+
+
+def cached_response(func: Callable) -> Callable:
+    """
+    Cache a GET endpoint's result per (active folder, dataset version, endpoint, params).
+    Uploads never change after ingest, so entries stay valid until invalidate_responses.
+    Memory is bounded by responseCacheMb (LRU); evicted entries spill to disk up to
+    responseCacheDiskMb (0: no spill). Preview samples and error results are not cached.
+    """
+    endpoint = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if preview_folder():
+            return func(*args, **kwargs)
+        key = (active_folder(), _version, endpoint, _normalized(args, kwargs))
+        cached = _get(key)
+        if cached is not _MISS:
+            return cached
+        result = func(*args, **kwargs)
+        if not (isinstance(result, dict) and "error" in result):
+            _put(key, result)
+        return result
+
+    return wrapper
+
+
+def invalidate_responses(reason: str) -> None:
+    """
+    Start a new dataset version: every cached response is dropped (memory and disk).
+    """
+    global _version, _memory_bytes, _disk_bytes
+    with _lock:
+        _version += 1
+        _memory.clear()
+        _memory_bytes = 0
+        _disk.clear()
+        _disk_bytes = 0
+        shutil.rmtree(RESPONSE_CACHE_DIR, ignore_errors=True)
+    logger.info("🧹 Response cache invalidated (%s)", reason)
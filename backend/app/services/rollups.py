@@ -0,0 +1,214 @@
+import sqlite3
+import uuid
+from typing import Optional
+
+import pandas as pd
+
+from app.services.catalog import table_columns
+from app.services.jmxdata import LATEST_SAMPLE_COLUMN
+from app.services.profile import WINDOW_COLUMN
+from app.utils.logging import logger
+
+# Rollup grains, finest first: bucket width (ms) and bucket label (same formats as the chart queries)
+GRAINS = {
+    "minute": (60_000, "strftime('%Y-%m-%d %H:%M:00', bucket_ts / 1000, 'unixepoch')"),
+    "hour": (3_600_000, "strftime('%Y-%m-%d %H:00:00', bucket_ts / 1000, 'unixepoch')"),
+    "day": (86_400_000, "date(bucket_ts / 1000, 'unixepoch')"),
+}
+
+# Chart granularity -> grain
+GRANULARITY_GRAINS = {"hourly": "hour", "daily": "day"}
+
+# Gauges rolled up in every table that has them
+GAUGE_COLUMNS = ["ACTIVECONTEXTSMAX", "TOTALACTIVEUSERCOUNT", "ACTIVESESSIONSMAX"]
+
+# Table families whose numeric columns are all rolled up
+ALL_NUMERIC_FAMILIES = ["MSHealthStats"]
+
+# Rollup tables are named <table>__rollup_<grain>
+ROLLUP_MARKER = "__rollup_"
+
+
+def rollup_name_for(table_name: str, grain: str) -> str:
+    return f"{table_name}{ROLLUP_MARKER}{grain}"
+
+
+def _gauges(conn: sqlite3.Connection, source_table: str, table_name: str) -> tuple[list[str], bool]:
+    """
+    (gauge columns of source_table, whether it has JVM_ID). Empty without LE_TIMESTAMP.
+    """
+    info = [(row[1], (row[2] or "").upper()) for row in conn.execute(f"PRAGMA table_info('{source_table}')")]
+    names = {name.upper() for name, _ in info}
+    if WINDOW_COLUMN.upper() not in names:
+        return [], False
+
+    all_numeric = any(table_name.endswith(f"_{family}") for family in ALL_NUMERIC_FAMILIES)
+    gauges = []
+    for name, declared in info:
+        upper = name.upper()
+        if upper in (WINDOW_COLUMN.upper(), LATEST_SAMPLE_COLUMN.upper()) or upper.endswith(("TIME", "TIMESTAMP")):
+            continue
+        if upper in GAUGE_COLUMNS or (all_numeric and declared in ("INTEGER", "REAL")):
+            gauges.append(name)
+    return gauges, "JVM_ID" in names
+
+
+def _rollup_sql(source_table: str, target: str, grain: str, gauges: list[str], has_jvm: bool) -> str:
+    width, label = GRAINS[grain]
+    jvm, partition = ("JVM_ID", "JVM_ID, ") if has_jvm else ("NULL AS JVM_ID", "")
+    lasts = ", ".join(f'LAST_VALUE("{g}") OVER w AS "{g}__last"' for g in gauges)
+    stats = ", ".join(
+        f'MIN("{g}") AS "{g}_min", MAX("{g}") AS "{g}_max", AVG("{g}") AS "{g}_avg", '
+        f'COUNT("{g}") AS "{g}_count", MAX("{g}__last") AS "{g}_last"'
+        for g in gauges
+    )
+    return f"""
+        CREATE TABLE '{target}' AS
+        WITH samples AS (
+            SELECT {jvm}, CAST(LE_TIMESTAMP AS INTEGER) / {width} * {width} AS bucket_ts,
+                   LE_TIMESTAMP, {", ".join(f'"{g}"' for g in gauges)}, {lasts}
+            FROM '{source_table}'
+            WHERE LE_TIMESTAMP IS NOT NULL
+            WINDOW w AS (
+                PARTITION BY {partition}CAST(LE_TIMESTAMP AS INTEGER) / {width}
+                ORDER BY LE_TIMESTAMP
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            )
+        )
+        SELECT JVM_ID, bucket_ts, {label} AS bucket, COUNT(*) AS samples, MAX(LE_TIMESTAMP) AS last_ts, {stats}
+        FROM samples
+        GROUP BY JVM_ID, bucket_ts
+    """
+
+
+def build_rollups(conn: sqlite3.Connection, source_table: str, table_name: str, target_prefix: str = "") -> list[str]:
+    """
+    Materialize minute/hour/day rollups (min/max/avg/count/last per JVM) of the gauges of
+    source_table into <target_prefix><table_name>__rollup_<grain>, one transaction per grain.
+    Tables without LE_TIMESTAMP or gauges get none.
+    Returns the rollup table names (without target_prefix).
+    """
+    gauges, has_jvm = _gauges(conn, source_table, table_name)
+    if not gauges:
+        return []
+
+    built = []
+    for grain in GRAINS:
+        rollup_name = rollup_name_for(table_name, grain)
+        target = f"{target_prefix}{rollup_name}"
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS '{target}'")
+            conn.execute(_rollup_sql(source_table, target, grain, gauges, has_jvm))
+            conn.execute(
+                f"CREATE INDEX 'ix_{rollup_name}_{uuid.uuid4().hex[:8]}' ON '{target}' (bucket_ts, JVM_ID)"
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        built.append(rollup_name)
+
+    logger.info("🧮 Built %s rollups of %d gauges for %s", "/".join(GRAINS), len(gauges), table_name)
+    return built
+
+
+def drop_rollups(conn: sqlite3.Connection, table_name: str) -> None:
+    for grain in GRAINS:
+        conn.execute(f"DROP TABLE IF EXISTS '{rollup_name_for(table_name, grain)}'")
+    conn.commit()
+
+
+def _to_ms(conn: sqlite3.Connection, date: Optional[str]) -> Optional[int]:
+    # Same conversion as the chart WHERE clauses: strftime('%s', date) * 1000
+    value = conn.execute("SELECT strftime('%s', ?) * 1000", (date,)).fetchone()[0]
+    return int(value) if value is not None else None
+
+
+def _has_rollup_column(rollup_name: str, column: str) -> bool:
+    return f"{column}_max" in table_columns(rollup_name)
+
+
+def rollup_query(
+    conn: sqlite3.Connection,
+    table_name: str,
+    column: str,
+    alias: str,
+    granularity: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 200,
+    by_jvm: bool = True,
+    jvm: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Answer an hourly/daily MAX(column) chart query ("bucket", ["JVM_ID",] alias, "last_ts")
+    from the coarsest rollup whose buckets the date range does not split: a daily view of
+    whole days reads the day rollup, one starting mid-day the hour rollup.
+    Samples exactly at the inclusive end bound come from the raw table, and so do samples
+    without LE_TIMESTAMP when there is no date range (the raw query's NULL bucket).
+    Returns None when no rollup applies (raw granularity, missing rollup, unaligned range);
+    the caller then runs its raw query.
+    """
+    grain = GRANULARITY_GRAINS.get(granularity)
+    if grain is None:
+        return None
+
+    start_ms = _to_ms(conn, start_date) if start_date else None
+    end_ms = _to_ms(conn, end_date) if end_date else None
+    if (start_date and start_ms is None) or (end_date and end_ms is None):
+        return None
+
+    # Coarsest grain no wider than the requested one whose buckets the range does not split
+    requested_width, label = GRAINS[grain]
+    source = None
+    for candidate, (width, _) in reversed(GRAINS.items()):
+        if width > requested_width:
+            continue
+        if any(bound is not None and bound % width for bound in (start_ms, end_ms)):
+            continue
+        rollup_name = rollup_name_for(table_name, candidate)
+        if _has_rollup_column(rollup_name, column):
+            source = rollup_name
+            break
+    if source is None:
+        return None
+
+    rollup_where, jvm_where, params = [], [], []
+    if start_ms is not None:
+        rollup_where.append("bucket_ts >= ?")
+        params.append(start_ms)
+    if end_ms is not None:
+        rollup_where.append("bucket_ts < ?")
+        params.append(end_ms)
+    if jvm is not None:
+        rollup_where.append("JVM_ID = ?")
+        jvm_where.append("JVM_ID = ?")
+        params.append(jvm)
+
+    parts = [
+        f"""SELECT bucket_ts, JVM_ID, "{column}_max" AS value, last_ts FROM '{source}'
+            {"WHERE " + " AND ".join(rollup_where) if rollup_where else ""}"""
+    ]
+    raw_bound = None
+    if end_ms is not None:
+        raw_bound, raw_params = "LE_TIMESTAMP = ?", [end_ms]
+    elif start_ms is None:
+        raw_bound, raw_params = "LE_TIMESTAMP IS NULL", []
+    if raw_bound:
+        parts.append(
+            f"""SELECT LE_TIMESTAMP AS bucket_ts, JVM_ID, "{column}" AS value, LE_TIMESTAMP AS last_ts
+                FROM '{table_name}' WHERE {" AND ".join([raw_bound] + jvm_where)}"""
+        )
+        params.extend(raw_params + ([jvm] if jvm is not None else []))
+
+    group = "bucket, JVM_ID" if by_jvm else "bucket"
+    query = f"""
+        SELECT {label} AS bucket, {"JVM_ID, " if by_jvm else ""}MAX(value) AS {alias}, MAX(last_ts) AS last_ts
+        FROM ({" UNION ALL ".join(parts)})
+        GROUP BY {group}
+        ORDER BY bucket
+        LIMIT ?
+    """
+    params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
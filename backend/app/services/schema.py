@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+from typing import Callable, Optional
+from app.utils.logging import logger
+from app.services.jmxdata import (
+    SQLITE_TYPES,
+    BYTE_TYPE,
+    SHORT_TYPE,
+    INTEGER_TYPE,
+    LONG_TYPE,
+    FLOAT_TYPE,
+    DOUBLE_TYPE,
+    BOOLEAN_TYPE,
+    TIMESTAMP_AS_LONG_TYPE,
+    BIG_DECIMAL_TYPE,
+    OBJECT_TYPE,
+)
+
+# Written by ConvertPerfToCsv next to each <Table>.csv
+SCHEMA_SUFFIX = ".schema.json"
+
+# Value type code -> pandas dtype used by read_csv (parsed in C, no per-cell conversion)
+PANDAS_DTYPES = {
+    BYTE_TYPE: "Int64",
+    SHORT_TYPE: "Int64",
+    INTEGER_TYPE: "Int64",
+    LONG_TYPE: "Int64",
+    TIMESTAMP_AS_LONG_TYPE: "Int64",
+    FLOAT_TYPE: "float64",
+    DOUBLE_TYPE: "float64",
+    BIG_DECIMAL_TYPE: "float64",
+    BOOLEAN_TYPE: "boolean",
+    OBJECT_TYPE: "string",
+}
+
+
+class TableSchema:
+    """
+    Column names and converter type codes for one table (from <Table>.schema.json).
+    A type code of 0 (NULL_TYPE) means the column only ever held nulls.
+    """
+
+    def __init__(self, table_name: str, columns: list[tuple[str, int]]):
+        self.table_name = table_name
+        self.columns = columns
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+    def sqlite_types(self) -> list[str]:
+        return [SQLITE_TYPES.get(code, "") for _, code in self.columns]
+
+    def pandas_dtypes(self) -> dict[str, str]:
+        return {name: PANDAS_DTYPES[code] for name, code in self.columns if code in PANDAS_DTYPES}
+
+    def subset(self, keep: Callable[[str], bool]) -> "TableSchema":
+        return TableSchema(self.table_name, [(name, code) for name, code in self.columns if keep(name)])
+
+
+def schema_path_for(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.stem + SCHEMA_SUFFIX)
+
+
+def load_table_schema(csv_path: Path) -> Optional[TableSchema]:
+    """
+    Load the schema file written by the converter for this CSV.
+    Returns None when there is none (older output folders) or it is unreadable,
+    in which case the importer falls back to pandas type inference.
+    """
+    path = schema_path_for(csv_path)
+    if not path.exists():
+        return None
+
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        columns = [(str(c["name"]), int(c.get("code", 0))) for c in data.get("columns", [])]
+        return TableSchema(str(data.get("tableName", csv_path.stem)), columns)
+    except Exception as e:
+        logger.warning("⚠️ Ignoring unreadable schema file %s: %s", path, e)
+        return None
@@ -1,8 +1,15 @@
+import base64
+import json
 import logging
 import sqlite3
-from typing import Optional, List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, List, Dict, Any
 
-from app.utils.paths import DB_PATH
+from app.services.analytics import run_aggregate
+from app.services.catalog import row_count
+from app.services.connections import read_connection
+from app.services.database import table_version
 from app.api.endpoints.tables import get_current_active_folder
 
 logger = logging.getLogger(__name__)
@@ -16,8 +23,7 @@ if not logger.handlers:
 
 
 def get_connection() -> sqlite3.Connection:
-    logger.info("Opening SQLite connection to %s", DB_PATH)
-    conn = sqlite3.connect(DB_PATH)
+    conn = read_connection()
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -37,6 +43,202 @@ def get_top_sql_stats_table_name() -> Optional[str]:
     return table_name
 
 
+# Sort keys of each ordering; rowid breaks ties so every row has a unique position
+SORT_KEYS = {
+    True: [("MaxSeconds", "DESC"), ("StartTime", "ASC"), ("LE_Timestamp", "ASC"), ("rowid", "ASC")],
+    False: [("StartTime", "ASC"), ("LE_Timestamp", "ASC"), ("rowid", "ASC")],
+}
+
+ROWID_ALIAS = "__rowid"
+
+# Cached totals, page anchors and anchor indexes, keyed by table version (least recently used are dropped)
+MAX_CACHED_TOTALS = 256
+MAX_CACHED_QUERIES = 128
+MAX_ANCHORS_PER_QUERY = 10_000
+MAX_CACHED_INDEXES = 32
+
+# Rows between two entries of the anchor index a deep page jump starts from
+ANCHOR_STRIDE = 1000
+
+_lock = threading.Lock()
+_totals: "OrderedDict[tuple, int]" = OrderedDict()
+_anchors: "OrderedDict[tuple, Dict[int, list]]" = OrderedDict()
+_indexes: "OrderedDict[tuple, list]" = OrderedDict()
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, keys: list) -> list:
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("cursor does not match the sort order")
+    return values
+
+
+def _q(column: str) -> str:
+    return column if column == "rowid" else f'"{column}"'
+
+
+def _after(keys: list, values: list) -> tuple[str, list]:
+    # Rows strictly after values in ORDER BY keys (NULLs sort first ascending, last descending)
+    (column, direction), value = keys[0], values[0]
+    col = _q(column)
+    if len(keys) == 1:  # rowid: unique and never NULL
+        return f"{col} > ?", [value]
+    rest_sql, rest_params = _after(keys[1:], values[1:])
+    if value is None:
+        tie = f"({col} IS NULL AND {rest_sql})"
+        return (f"({col} IS NOT NULL OR {tie})" if direction == "ASC" else tie), rest_params
+    beyond = f"{col} > ?" if direction == "ASC" else f"({col} < ? OR {col} IS NULL)"
+    return f"({beyond} OR ({col} = ? AND {rest_sql}))", [value, value] + rest_params
+
+
+def _segments(keys: list, values: list) -> list[tuple[str, list]]:
+    """
+    Predicates selecting the rows after values, in sort order. Each one bounds the leading
+    sort key by a range its index can seek to; NULLs of the leading key get their own.
+    """
+    (column, direction), value = keys[0], values[0]
+    col = _q(column)
+    if len(keys) == 1:
+        return [(f"{col} > ?", [value])]
+    rest_sql, rest_params = _after(keys[1:], values[1:])
+    if value is None:
+        segments = [(f"{col} IS NULL AND {rest_sql}", rest_params)]
+        if direction == "ASC":
+            segments.append((f"{col} IS NOT NULL", []))
+        return segments
+    bound, beyond = (">=", ">") if direction == "ASC" else ("<=", "<")
+    segments = [(
+        f"{col} {bound} ? AND ({col} {beyond} ? OR ({col} = ? AND {rest_sql}))",
+        [value, value, value] + rest_params,
+    )]
+    if direction == "DESC":
+        segments.append((f"{col} IS NULL", []))
+    return segments
+
+
+def _fetch_rows(
+    conn: sqlite3.Connection,
+    table_quoted: str,
+    where_clauses: List[str],
+    params: List[Any],
+    keys: list,
+    after: Optional[list],
+    offset: int,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    order_sql = "ORDER BY " + ", ".join(f"{_q(c)} {d}" for c, d in keys)
+    segments = _segments(keys, after) if after is not None else [(None, [])]
+    rows: List[Dict[str, Any]] = []
+    for segment_sql, segment_params in segments:
+        clauses = where_clauses + ([segment_sql] if segment_sql else [])
+        where_sql = "WHERE " + " AND ".join(clauses) if clauses else ""
+        query = f"""
+            SELECT *, rowid AS {ROWID_ALIAS}
+            FROM {table_quoted}
+            {where_sql}
+            {order_sql}
+            LIMIT ? OFFSET ?
+        """
+        logger.info("Executing SQL: %s", query)
+        cursor = conn.execute(query, params + segment_params + [limit - len(rows), offset])
+        columns = [d[0] for d in cursor.description]
+        batch = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if offset and not batch:
+            # The whole segment was skipped: the rest of the offset applies to the next one
+            skipped = conn.execute(f"SELECT COUNT(*) FROM {table_quoted} {where_sql}", params + segment_params).fetchone()[0]
+            offset -= skipped
+        else:
+            offset = 0
+        rows.extend(batch)
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _cursor_values(row: Dict[str, Any], keys: list) -> list:
+    # SQLite column names are case-insensitive
+    by_name = {name.lower(): value for name, value in row.items()}
+    return [by_name[column.lower()] for column, _ in keys[:-1]] + [row[ROWID_ALIAS]]
+
+
+def _nearest_anchor(query_key: tuple, page: int) -> tuple[int, Optional[list]]:
+    # (p, cursor after page p) for the last page p before page that was served (0: none)
+    with _lock:
+        anchors = _anchors.get(query_key)
+        if anchors is None:
+            return 0, None
+        _anchors.move_to_end(query_key)
+        before = [p for p in anchors if p < page]
+        if not before:
+            return 0, None
+        p = max(before)
+        return p, anchors[p]
+
+
+def _store_anchor(query_key: tuple, page: int, values: list) -> None:
+    with _lock:
+        anchors = _anchors.setdefault(query_key, {})
+        _anchors.move_to_end(query_key)
+        if len(anchors) < MAX_ANCHORS_PER_QUERY:
+            anchors[page] = values
+        while len(_anchors) > MAX_CACHED_QUERIES:
+            _anchors.popitem(last=False)
+
+
+def _anchor_index(
+    conn: sqlite3.Connection,
+    table_quoted: str,
+    where_clauses: List[str],
+    params: List[Any],
+    keys: list,
+    index_key: tuple,
+) -> list:
+    """
+    Cursor values of every ANCHOR_STRIDE-th row in sort order (entry i ends row
+    (i + 1) * ANCHOR_STRIDE), from one scan of the sort keys per filters and table version.
+    """
+    with _lock:
+        if index_key in _indexes:
+            _indexes.move_to_end(index_key)
+            return _indexes[index_key]
+    columns = ", ".join(f"{_q(c)}" for c, _ in keys[:-1])
+    order_sql = ", ".join(f"{_q(c)} {d}" for c, d in keys)
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    query = f"""
+        SELECT * FROM (
+            SELECT {columns}, rowid AS {ROWID_ALIAS}, ROW_NUMBER() OVER (ORDER BY {order_sql}) AS n
+            FROM {table_quoted}
+            {where_sql}
+        )
+        WHERE n % ? = 0
+        ORDER BY n
+    """
+    logger.info("Building anchor index: %s", query)
+    index = [list(row[:-1]) for row in conn.execute(query, params + [ANCHOR_STRIDE])]
+    with _lock:
+        _indexes[index_key] = index
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _cached_total(count_key: tuple, count: Callable[[], int]) -> int:
+    with _lock:
+        if count_key in _totals:
+            _totals.move_to_end(count_key)
+            return _totals[count_key]
+    total = count()
+    with _lock:
+        _totals[count_key] = total
+        while len(_totals) > MAX_CACHED_TOTALS:
+            _totals.popitem(last=False)
+    return total
+
+
 def fetch_top_sql_stats(
     start_time: Optional[str],
     end_time: Optional[str],
@@ -45,8 +247,17 @@ def fetch_top_sql_stats(
     min_secs: Optional[float],
     sort_by_elapsed_time: bool,
     page: int,
-    page_size: int
+    page_size: int,
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
+    """
+    One page of TopSQLStats rows and the total matching the filters.
+    Pages are read by keyset (rows after the previous page's last sort key): pass the
+    returned next_cursor, or a page number. A page number starts from the nearest earlier
+    page served; a deeper jump starts from the anchor index (see _anchor_index), so it
+    never skips more than ANCHOR_STRIDE rows by OFFSET.
+    Totals are cached per filters until the table is replaced.
+    """
 
     table = get_top_sql_stats_table_name()
     if not table:
@@ -81,38 +292,59 @@ def fetch_top_sql_stats(
     if where_clauses:
         where_sql = "WHERE " + " AND ".join(where_clauses)
 
-    order_sql = (
-        "ORDER BY MaxSeconds DESC, StartTime, LE_Timestamp"
-        if sort_by_elapsed_time
-        else "ORDER BY StartTime, LE_Timestamp"
-    )
-
-    offset = (page - 1) * page_size
-
-    query = f"""
-        SELECT *
-        FROM {table_quoted}
-        {where_sql}
-        {order_sql}
-        LIMIT ? OFFSET ?
-    """
-
-    params.extend([page_size, offset])
+    keys = SORT_KEYS[sort_by_elapsed_time]
+    try:
+        after = decode_cursor(cursor, keys) if cursor else None
+    except (ValueError, TypeError) as e:
+        logger.warning("Invalid cursor %s: %s", cursor, e)
+        return {"results": [], "total": 0, "error": "Invalid cursor"}
 
-    logger.info("Executing SQL: %s", query)
     logger.info("Params: %s", params)
 
-    conn = get_connection()
+    conn = read_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(query, params)
-        rows = [dict(row) for row in cur.fetchall()]
+        # Rows and table version from one snapshot
+        conn.execute("BEGIN")
+        version = (table.lower(), table_version(conn, table))
+        query_key = (version, where_sql, tuple(params), sort_by_elapsed_time, page_size)
 
-        # Count total rows for pagination
-        count_query = f"SELECT COUNT(*) FROM {table_quoted } {where_sql}"
-        cur.execute(count_query, params[:-2])
-        total = cur.fetchone()[0]
+        offset = 0
+        if after is None and page > 1:
+            anchor_page, after = _nearest_anchor(query_key, page)
+            offset = (page - 1 - anchor_page) * page_size
+            if offset > ANCHOR_STRIDE:
+                index_key = (version, where_sql, tuple(params), sort_by_elapsed_time)
+                index = _anchor_index(conn, table_quoted, where_clauses, params, keys, index_key)
+                skip = (page - 1) * page_size
+                entry = min(skip // ANCHOR_STRIDE, len(index))
+                if entry * ANCHOR_STRIDE > anchor_page * page_size:
+                    after, offset = index[entry - 1], skip - entry * ANCHOR_STRIDE
 
-        return {"results": rows, "total": total}
+        # One extra row tells whether there is a next page
+        rows = _fetch_rows(conn, table_quoted, where_clauses, params, keys, after, offset, page_size + 1)
     finally:
         conn.close()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    next_values = _cursor_values(rows[-1], keys) if has_next else None
+    if next_values is not None and cursor is None:
+        _store_anchor(query_key, page, next_values)
+    for row in rows:
+        del row[ROWID_ALIAS]
+
+    # Without filters the total is the catalog's row count; otherwise it runs on the
+    # configured analytics engine, once per filters and table version
+    count_query = f"SELECT COUNT(*) AS total FROM {table_quoted} {where_sql}"
+    total = row_count(table) if not where_clauses else None
+    if total is None:
+        total = _cached_total(
+            (version, where_sql, tuple(params)),
+            lambda: run_aggregate(count_query, [table], params)[0]["total"],
+        )
+
+    return {
+        "results": rows,
+        "total": total,
+        "next_cursor": encode_cursor(next_values) if next_values is not None else None,
+    }
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional
+from app.services.archive import is_archived
+from app.services.database import list_tables
+from app.utils.paths import UPLOAD_MANIFEST_PATH
+from app.utils.logging import logger
+
+# Read size while hashing and writing an upload
+COPY_CHUNK_BYTES = 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def copy_and_hash(src: BinaryIO, dest_path: Path) -> str:
+    """
+    Stream src to dest_path, hashing the bytes as they are written.
+    Returns the sha256 hex digest of the content.
+    """
+    digest = hashlib.sha256()
+    with dest_path.open("wb") as out:
+        while True:
+            chunk = src.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest() -> dict:
+    if not UPLOAD_MANIFEST_PATH.exists():
+        return {}
+    try:
+        with UPLOAD_MANIFEST_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning("⚠️ Ignoring unreadable upload manifest %s: %s", UPLOAD_MANIFEST_PATH, e)
+        return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    tmp_path = UPLOAD_MANIFEST_PATH.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.move(str(tmp_path), str(UPLOAD_MANIFEST_PATH))
+
+
+def find_upload(content_hash: str) -> Optional[dict]:
+    """
+    Return the manifest entry {"folder", "tables", "filename", "uploaded_at"} of an earlier
+    upload with the same content, or None.
+    Entries whose tables are no longer in SQLite (e.g. database deleted) or archived are dropped.
+    """
+    with _lock:
+        manifest = _load_manifest()
+        entry = manifest.get(content_hash)
+        if not entry:
+            return None
+
+        if entry.get("folder") and is_archived(entry["folder"]):
+            return entry
+
+        existing = set(list_tables())
+        if entry.get("tables") and all(t["tableName"] in existing for t in entry["tables"]):
+            return entry
+
+        logger.info("🧹 Upload manifest entry for %s is stale, dropping it", entry.get("folder"))
+        manifest.pop(content_hash, None)
+        _save_manifest(manifest)
+        return None
+
+
+def record_upload(content_hash: str, folder_name: str, filename: str, tables_info: list[dict]) -> None:
+    """
+    Remember that content_hash was ingested into folder_name with these tables.
+    """
+    with _lock:
+        manifest = _load_manifest()
+        manifest[content_hash] = {
+            "folder": folder_name,
+            "filename": filename,
+            "tables": [{"tableName": t["tableName"], "rows": t.get("rows")} for t in tables_info],
+            "uploaded_at": time.time(),
+        }
+        try:
+            _save_manifest(manifest)
+            logger.info("🧾 Recorded upload %s -> %s in manifest", content_hash[:12], folder_name)
+        except Exception as e:
+            logger.error("❌ Failed to write upload manifest: %s", e)
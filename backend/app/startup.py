@@ -1,23 +1,97 @@
 from app.utils.paths import OUTPUT_DIR
-from app.services.database import import_csv_to_sqlite
+from app.services.connections import write_connection
+from app.services.archive import archive_cold_folders, is_archived
+from app.services.database import list_tables, migrate_legacy_tables
+from app.services.indexes import build_indexes
+from app.services.log_cube import build_log_cube, log_cube_name_for
+from app.services.rollups import build_rollups, rollup_name_for
+from app.services.ingest import import_csv_folder
+from app.services.ingest_manifest import stale_files
+from app.services.columnar import PARQUET_SUFFIX
+from app.services.jobs import IngestJob, job_queue
+from app.services.response_cache import invalidate_responses
 from app.utils.logging import logger
 
-def ingest_latest_folder():
+def ingest_latest_folder(job: IngestJob | None = None) -> dict:
     """
-    On app startup, ingest all CSVs from the latest output_csv folder into SQLite.
+    On app startup, ingest the latest output_csv folder into SQLite.
+    Only files that are new or changed since their last import (per the ingest manifest) are re-imported;
+    the folder's current tables get any missing indexes, rollups and log event cubes.
+    Tables still in the shared database are first moved into their upload's database.
+    An archived folder is left archived (it is rehydrated when activated).
     """
+    if migrate_legacy_tables():
+        invalidate_responses("legacy tables migrated")
+
     folders = [f for f in OUTPUT_DIR.iterdir() if f.is_dir()]
     if not folders:
         logger.info("No output_csv folders found to ingest.")
-        return
+        return {"message": "No output_csv folders found"}
 
     latest = max(folders, key=lambda f: f.stat().st_mtime)
     logger.info("Latest folder detected: %s", latest.name)
 
-    csv_files = list(latest.glob("*.csv"))
+    if is_archived(latest.name):
+        logger.info("Latest folder %s is archived, skipping ingestion.", latest.name)
+        return {"message": f"{latest.name} is archived"}
+
+    csv_files = sorted(latest.glob("*.csv")) + sorted(latest.glob(f"*{PARQUET_SUFFIX}"))
     if not csv_files:
         logger.info("No CSV files found in latest folder %s, skipping ingestion.", latest.name)
-        return
+        return {"message": f"No CSV files in {latest.name}"}
+
+    changed = stale_files(csv_files, latest.name)
+    logger.info(
+        "Startup ingest of %s: %d files current, %d to import",
+        latest.name, len(csv_files) - len(changed), len(changed)
+    )
+    if job:
+        job.folder_name = latest.name
+        job.set_stage("importing")
+
+    imported = import_csv_folder(
+        latest, latest.name,
+        on_table=job.table_done if job else None,
+        files=changed,
+    )
+
+    # Tables imported before indexes, rollups and cubes were built at ingest get them now
+    tables = [t for t in list_tables() if t.startswith(f"{latest.name}_")]
+    backfilled = False
+    with write_connection(latest.name) as conn:
+        def missing(name: str) -> bool:
+            return not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+            ).fetchone()
+
+        for table_name in tables:
+            build_indexes(conn, table_name)
+            if missing(rollup_name_for(table_name, "day")) and build_rollups(conn, table_name, table_name):
+                backfilled = True
+            if missing(log_cube_name_for(table_name)) and build_log_cube(conn, table_name, table_name):
+                backfilled = True
+    if backfilled:  # cached responses and the schema catalog predate the new tables
+        invalidate_responses(f"{latest.name} backfilled")
+    return {
+        "message": f"Startup ingest of {latest.name} completed",
+        "folder": latest.name,
+        "skipped": len(csv_files) - len(changed),
+        "tables": imported,
+    }
 
-    for csv_file in csv_files:
-        import_csv_to_sqlite(csv_file, latest.name)
+
+def _startup_maintenance(job: IngestJob) -> dict:
+    result = ingest_latest_folder(job)
+    result["archived"] = archive_cold_folders()
+    return result
+
+
+def start_background_ingest() -> IngestJob:
+    """
+    Run ingest_latest_folder on the ingest queue so the API starts serving immediately,
+    then archive uploads that have gone cold (archive_cold_folders).
+    Progress is available from /upload/jobs/{job_id}.
+    """
+    job = job_queue.create("", "startup")
+    job_queue.submit(job, _startup_maintenance)
+    return job
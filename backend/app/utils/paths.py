@@ -6,11 +6,17 @@ OUTPUT_DIR = BASE_DIR / "output_csv"
 LOG_DIR = BASE_DIR / "logs"
 DB_DIR = BASE_DIR / "db"
 DB_PATH = DB_DIR / "perfdata.db"
+FOLDER_DB_DIR = DB_DIR / "folders"
+ARCHIVE_DIR = DB_DIR / "archive"
+RESPONSE_CACHE_DIR = DB_DIR / "response_cache"
+FOLDER_ACTIVITY_PATH = DB_DIR / "folder_activity.json"
+INGEST_MANIFEST_PATH = DB_DIR / "ingest_manifest.json"
 JAVA_DIR = BASE_DIR / "java"
 CONFIG_PATH = BASE_DIR / "config.json"
 ACTIVE_TABLES_PATH = BASE_DIR / "active_tables.json"
 PROPERTY_DIR = BASE_DIR / "properties"
 SERVER_LOGS_DIR = BASE_DIR / "server_logs"
+UPLOAD_MANIFEST_PATH = UPLOAD_DIR / "upload_manifest.json"
 
-for d in [UPLOAD_DIR, OUTPUT_DIR, LOG_DIR, DB_DIR,PROPERTY_DIR,SERVER_LOGS_DIR]:
+for d in [UPLOAD_DIR, OUTPUT_DIR, LOG_DIR, DB_DIR,FOLDER_DB_DIR,ARCHIVE_DIR,PROPERTY_DIR,SERVER_LOGS_DIR]:
     d.mkdir(parents=True, exist_ok=True)
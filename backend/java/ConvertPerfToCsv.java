@@ -19,6 +19,12 @@ public class ConvertPerfToCsv {
     static final byte BIG_DECIMAL_TYPE = 9;
     static final byte OBJECT_TYPE = 10;
 
+    // Names written to <table>.schema.json, indexed by type code
+    static final String[] TYPE_NAMES = {
+        "NULL", "BYTE", "SHORT", "INTEGER", "LONG", "FLOAT", "DOUBLE",
+        "BOOLEAN", "TIMESTAMP_AS_LONG", "BIG_DECIMAL", "OBJECT"
+    };
+
     private static final Logger logger = Logger.getLogger(ConvertPerfToCsv.class.getName());
 
     static {
@@ -44,19 +50,132 @@ public class ConvertPerfToCsv {
     }
 
     public static void main(String[] args) throws Exception {
+        if (args.length == 1 && "--worker".equals(args[0])) {
+            runWorker();
+            return;
+        }
         if (args.length < 2) {
-            logger.severe("Usage: java ConvertPerfToCsv <input.gz> <outputDir>");
+            logger.severe("Usage: java ConvertPerfToCsv <input.gz> <outputDir> [profile] | --worker");
             System.exit(1);
         }
         File input = new File(args[0]);
         File outDir = new File(args[1]);
+        Profile profile = Profile.parse(args.length > 2 ? args[2] : "");
         outDir.mkdirs();
         logger.info("Starting conversion for " + input.getAbsolutePath());
-        convertAllMembers(input, outDir);
+        convertAllMembers(input, outDir, null, profile);
         logger.info("✅ Conversion finished");
     }
 
-    static void convertAllMembers(File inputGz, File outDir) throws Exception {
+    /**
+     * Long-lived mode: reads one job per stdin line ("<input.gz>\t<outputDir>[\t<profile>]")
+     * and answers on stdout with "TABLE\t<name>\t<rows>" per table, then "DONE" or "ERROR\t<msg>".
+     */
+    static void runWorker() throws IOException {
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, "UTF-8"));
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        out.println("READY");
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.isEmpty()) continue;
+            String[] job = line.split("\t", 3);
+            if (job.length < 2) {
+                out.println("ERROR\tMalformed job: " + line);
+                continue;
+            }
+            try {
+                File input = new File(job[0]);
+                File outDir = new File(job[1]);
+                Profile profile = Profile.parse(job.length > 2 ? job[2] : "");
+                outDir.mkdirs();
+                logger.info("Starting conversion for " + input.getAbsolutePath());
+                convertAllMembers(input, outDir, out, profile);
+                logger.info("✅ Conversion finished");
+                out.println("DONE");
+            } catch (Exception e) {
+                logger.log(Level.SEVERE, "Conversion failed for " + job[0], e);
+                out.println("ERROR\t" + String.valueOf(e).replace('\n', ' ').replace('\t', ' '));
+            }
+        }
+        logger.info("Worker input closed, exiting");
+    }
+
+    /**
+     * Subset to convert: "tables=A,B;columns=X,Table.Y;from=<ms>;to=<ms>" (all parts optional).
+     * Plain column names are kept in every table, "Table.Column" only in that table;
+     * LE_TIMESTAMP is always kept. The window applies to LE_TIMESTAMP; tables without it are not filtered.
+     */
+    static class Profile {
+        Set<String> tables;
+        Set<String> columns;
+        Map<String, Set<String>> tableColumns = new HashMap<>();
+        Long fromMs;
+        Long toMs;
+
+        static Profile parse(String spec) {
+            Profile p = new Profile();
+            for (String part : spec.split(";")) {
+                int eq = part.indexOf('=');
+                if (eq < 0) continue;
+                String key = part.substring(0, eq).trim();
+                String value = part.substring(eq + 1).trim();
+                if (value.isEmpty()) continue;
+                switch (key) {
+                    case "tables":
+                        p.tables = new HashSet<>(Arrays.asList(value.split(",")));
+                        break;
+                    case "columns":
+                        for (String c : value.split(",")) {
+                            int dot = c.indexOf('.');
+                            if (dot < 0) {
+                                if (p.columns == null) p.columns = new HashSet<>();
+                                p.columns.add(c);
+                            } else {
+                                p.tableColumns.computeIfAbsent(c.substring(0, dot), k -> new HashSet<>()).add(c.substring(dot + 1));
+                            }
+                        }
+                        break;
+                    case "from":
+                        p.fromMs = Long.parseLong(value);
+                        break;
+                    case "to":
+                        p.toMs = Long.parseLong(value);
+                        break;
+                    default:
+                        logger.warning("Ignoring unknown profile key: " + key);
+                }
+            }
+            return p;
+        }
+
+        boolean wantsTable(String table) {
+            return tables == null || tables.contains(table);
+        }
+
+        boolean wantsColumn(String table, String column) {
+            if ("LE_TIMESTAMP".equals(column)) return true;
+            if (columns == null && !tableColumns.containsKey(table)) return true;
+            return (columns != null && columns.contains(column))
+                || tableColumns.getOrDefault(table, Collections.emptySet()).contains(column);
+        }
+
+        boolean hasWindow() {
+            return fromMs != null || toMs != null;
+        }
+
+        boolean inWindow(Object timestamp) {
+            if (!(timestamp instanceof Number)) return false;
+            long ts = ((Number) timestamp).longValue();
+            return (fromMs == null || ts >= fromMs) && (toMs == null || ts <= toMs);
+        }
+    }
+
+    static void convertAllMembers(File inputGz, File outDir, PrintStream progress) throws Exception {
+        convertAllMembers(inputGz, outDir, progress, Profile.parse(""));
+    }
+
+    static void convertAllMembers(File inputGz, File outDir, PrintStream progress, Profile profile) throws Exception {
         List<Map<String,Object>> summary = new ArrayList<>();
 
         try (FileInputStream fis = new FileInputStream(inputGz);
@@ -89,26 +208,58 @@ public class ConvertPerfToCsv {
                     columnNames[i] = (String) ois.readObject();
                 }
 
+                byte[] columnTypes = new byte[nColumns];
+                if (!profile.wantsTable(tableName)) {
+                    // Rows still have to be decoded to reach the next table
+                    while (ois.readBoolean()) {
+                        for (int i = 0; i < nColumns; i++) readValue(ois, ois.readByte());
+                    }
+                    logger.info("Skipped table (not in profile): " + tableName);
+                    continue;
+                }
+
+                boolean[] keep = new boolean[nColumns];
+                List<String> keptNames = new ArrayList<>();
+                for (int i = 0; i < nColumns; i++) {
+                    keep[i] = profile.wantsColumn(tableName, columnNames[i]);
+                    if (keep[i]) keptNames.add(columnNames[i]);
+                }
+                int windowColumn = profile.hasWindow() ? Arrays.asList(columnNames).indexOf("LE_TIMESTAMP") : -1;
+
                 File csv = new File(outDir, tableName + ".csv");
                 int rowCount = 0;
+                Object[] row = new Object[nColumns];
                 try (PrintWriter pw = new PrintWriter(new OutputStreamWriter(new FileOutputStream(csv), "UTF-8"))) {
-                    List<String> header = new ArrayList<>(Arrays.asList(columnNames));
+                    List<String> header = new ArrayList<>(keptNames);
                     header.add("latestSample");
                     pw.println(String.join(",", header));
 
                     while (ois.readBoolean()) {
-                        List<String> vals = new ArrayList<>();
-                        for (String col : columnNames) {
+                        for (int i = 0; i < nColumns; i++) {
                             byte type = ois.readByte();
-                            Object val = readValue(ois, type);
-                            vals.add(val == null ? "" : escape(val.toString()));
+                            columnTypes[i] = widen(columnTypes[i], type);
+                            row[i] = readValue(ois, type);
+                        }
+                        if (windowColumn >= 0 && !profile.inWindow(row[windowColumn])) continue;
+
+                        List<String> vals = new ArrayList<>();
+                        for (int i = 0; i < nColumns; i++) {
+                            if (keep[i]) vals.add(row[i] == null ? "" : escape(row[i].toString()));
                         }
                         vals.add("0"); // latestSample
                         pw.println(String.join(",", vals));
                         rowCount++;
                     }
                 }
+
+                String[] schemaNames = keptNames.toArray(new String[0]);
+                byte[] schemaTypes = new byte[schemaNames.length];
+                for (int i = 0, j = 0; i < nColumns; i++) {
+                    if (keep[i]) schemaTypes[j++] = columnTypes[i];
+                }
+                writeSchema(outDir, tableName, schemaNames, schemaTypes);
                 logger.info("Processed table: " + tableName + " → " + rowCount + " rows, CSV: " + csv.getAbsolutePath());
+                if (progress != null) progress.println("TABLE\t" + tableName + "\t" + rowCount);
 
                 Map<String,Object> tableSummary = new LinkedHashMap<>();
                 tableSummary.put("tableName", tableName);
@@ -130,6 +281,51 @@ public class ConvertPerfToCsv {
         logger.info("Wrote summary: " + summaryFile.getAbsolutePath());
     }
 
+    /**
+     * Column type after seeing a value of the given type: mixed integer types widen to LONG,
+     * mixed numeric types to DOUBLE, anything else mixed to OBJECT.
+     */
+    static byte widen(byte current, byte type) {
+        if (type == NULL_TYPE || type == current) return current;
+        if (current == NULL_TYPE) return (type > NULL_TYPE && type <= OBJECT_TYPE) ? type : OBJECT_TYPE;
+        if (isIntegral(current) && isIntegral(type)) return LONG_TYPE;
+        if (isNumeric(current) && isNumeric(type)) return DOUBLE_TYPE;
+        return OBJECT_TYPE;
+    }
+
+    static boolean isIntegral(byte type) {
+        return type == BYTE_TYPE || type == SHORT_TYPE || type == INTEGER_TYPE
+            || type == LONG_TYPE || type == TIMESTAMP_AS_LONG_TYPE;
+    }
+
+    static boolean isNumeric(byte type) {
+        return isIntegral(type) || type == FLOAT_TYPE || type == DOUBLE_TYPE || type == BIG_DECIMAL_TYPE;
+    }
+
+    /**
+     * Writes <table>.schema.json with each column's name and type code, so the importer
+     * can create typed tables instead of guessing from CSV text.
+     */
+    static void writeSchema(File outDir, String tableName, String[] columnNames, byte[] columnTypes) throws IOException {
+        File schemaFile = new File(outDir, tableName + ".schema.json");
+        try (PrintWriter pw = new PrintWriter(new OutputStreamWriter(new FileOutputStream(schemaFile), "UTF-8"))) {
+            pw.println("{");
+            pw.println("  \"tableName\": \"" + jsonEscape(tableName) + "\",");
+            pw.println("  \"columns\": [");
+            for (int i = 0; i < columnNames.length; i++) {
+                pw.println("    {\"name\": \"" + jsonEscape(columnNames[i]) + "\", \"type\": \""
+                        + TYPE_NAMES[columnTypes[i]] + "\", \"code\": " + columnTypes[i] + "},");
+            }
+            pw.println("    {\"name\": \"latestSample\", \"type\": \"INTEGER\", \"code\": " + INTEGER_TYPE + "}");
+            pw.println("  ]");
+            pw.println("}");
+        }
+    }
+
+    static String jsonEscape(String s) {
+        return s.replace("\\", "\\\\").replace("\"", "\\\"");
+    }
+
     static Object readValue(ObjectInputStream ois, byte type) throws Exception {
         switch (type) {
             case NULL_TYPE: return null;
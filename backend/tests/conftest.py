@@ -0,0 +1,69 @@
+import logging
+import sqlite3
+
+import pytest
+
+import app.services.catalog as catalog
+import app.services.config as config
+import app.services.connections as connections
+import app.services.response_cache as response_cache
+
+FOLDER = "t"
+
+
+@pytest.fixture(autouse=True, scope="session")
+def log_file(tmp_path_factory):
+    """
+    Write the app's log file (app/utils/logging.py attaches it to LOG_DIR at import)
+    under a temporary directory, so test runs never append to backend/logs/upload.log.
+    """
+    root = logging.getLogger()
+    path = tmp_path_factory.mktemp("logs") / "upload.log"
+    for handler in [h for h in root.handlers if isinstance(h, logging.FileHandler)]:
+        root.removeHandler(handler)
+        handler.close()
+        replacement = logging.FileHandler(path, encoding="utf-8")
+        replacement.setFormatter(handler.formatter)
+        root.addHandler(replacement)
+    yield path
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """
+    An empty active upload folder FOLDER with its own database under tmp_path, default
+    config (SQLite analytics engine) and no cached responses or catalog.
+    Yields load(table_name, columns, rows), which creates a table in it and inserts rows.
+    """
+    monkeypatch.setattr(connections, "DB_PATH", tmp_path / "shared.db")
+    monkeypatch.setattr(connections, "FOLDER_DB_DIR", tmp_path / "folders")
+    monkeypatch.setattr(connections, "ACTIVE_TABLES_PATH", tmp_path / "active_tables.json")
+    monkeypatch.setattr(connections, "_active_dataset", None)
+    monkeypatch.setattr(config, "CONFIG_PATH", tmp_path / "config.json")
+    monkeypatch.setattr(config, "_cached_config", None)
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_DIR", tmp_path / "response_cache")
+    monkeypatch.setattr(catalog, "_key", None)
+    (tmp_path / "folders").mkdir()
+    connections.set_active_dataset(FOLDER, [])
+
+    def load(table_name: str, columns: str, rows: list[tuple]) -> None:
+        with connections.write_connection(FOLDER) as conn:
+            conn.execute(f'CREATE TABLE "{table_name}" ({columns})')
+            conn.executemany(f'INSERT INTO "{table_name}" VALUES ({", ".join("?" * len(rows[0]))})', rows)
+            conn.commit()
+        response_cache.invalidate_responses(f"test table {table_name}")
+
+    yield load
+
+    connections.close_connections()
+
+
+@pytest.fixture
+def raw(dataset):
+    """
+    Plain connection to the active folder's database, for the reference queries.
+    """
+    conn = sqlite3.connect(connections.folder_db_path(FOLDER))
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
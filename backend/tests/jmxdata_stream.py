@@ -0,0 +1,236 @@
+"""
+Write JMXData.gz files the way java.io.ObjectOutputStream does, for the decoder tests:
+primitives in 1024-byte block-data records (so values split across records), shared
+strings as back-references, long strings, modified UTF-8, and the value objects
+(BigDecimal, boxed numbers, java.sql.Timestamp) found in real JMXData.
+"""
+import gzip
+import struct
+from pathlib import Path
+
+_BASE_WIRE_HANDLE = 0x7E0000
+_MAX_BLOCK_SIZE = 1024
+
+
+def modified_utf8(text: str) -> bytes:
+    """
+    Java's modified UTF-8: NUL as two bytes, characters outside the BMP as surrogate pairs.
+    """
+    out = bytearray()
+    units = struct.unpack(f">{len(text.encode('utf-16-be')) // 2}H", text.encode("utf-16-be"))
+    for unit in units:
+        if 0 < unit < 0x80:
+            out.append(unit)
+        elif unit < 0x800:
+            out += bytes([0xC0 | unit >> 6, 0x80 | unit & 0x3F])
+        else:
+            out += bytes([0xE0 | unit >> 12, 0x80 | unit >> 6 & 0x3F, 0x80 | unit & 0x3F])
+    return bytes(out)
+
+
+class BigDecimal:
+    """
+    java.math.BigDecimal(unscaled * 10^-scale).
+    """
+
+    def __init__(self, unscaled: int, scale: int):
+        self.unscaled = unscaled
+        self.scale = scale
+
+
+class Boxed:
+    """
+    A boxed primitive (java.lang.Integer, java.lang.Double, ...) written with readObject.
+    """
+
+    CLASSES = {
+        "Integer": ("I", 1360826667806852920),
+        "Long": ("J", 4290774380558885855),
+        "Double": ("D", -9172774392245257468),
+    }
+
+    def __init__(self, class_name: str, value):
+        self.class_name = class_name
+        self.value = value
+
+
+class Timestamp:
+    """
+    java.sql.Timestamp(epoch_ms): Date.writeObject writes the whole seconds, the rest is in nanos.
+    """
+
+    def __init__(self, epoch_ms: int):
+        self.epoch_ms = epoch_ms
+
+
+class ObjectStreamWriter:
+    def __init__(self):
+        self._out = bytearray(b"\xac\xed\x00\x05")
+        self._block = bytearray()
+        self._handles = {}
+        self._next_handle = _BASE_WIRE_HANDLE
+
+    # -- block data ----------------------------------------------------------
+
+    def _flush(self) -> None:
+        block = self._block
+        for start in range(0, len(block), _MAX_BLOCK_SIZE):
+            chunk = block[start:start + _MAX_BLOCK_SIZE]
+            if len(chunk) <= 0xFF:
+                self._out += bytes([0x77, len(chunk)]) + chunk
+            else:
+                self._out += b"\x7a" + struct.pack(">I", len(chunk)) + chunk
+        self._block = bytearray()
+
+    def write(self, fmt: str, value) -> None:
+        self._block += struct.pack(">" + fmt, value)
+
+    # -- objects -------------------------------------------------------------
+
+    def _assign(self, key=None) -> None:
+        if key is not None:
+            self._handles[key] = self._next_handle
+        self._next_handle += 1
+
+    def _reference(self, key) -> bool:
+        if key not in self._handles:
+            return False
+        self._out += b"\x71" + struct.pack(">I", self._handles[key])
+        return True
+
+    def _utf(self, text: str) -> bytes:
+        data = modified_utf8(text)
+        return struct.pack(">H", len(data)) + data
+
+    def _string(self, text: str) -> None:
+        if self._reference(("string", text)):
+            return
+        data = modified_utf8(text)
+        if len(data) <= 0xFFFF:
+            self._out += b"\x74" + struct.pack(">H", len(data)) + data
+        else:
+            self._out += b"\x7c" + struct.pack(">q", len(data)) + data
+        self._assign(("string", text))
+
+    def _class_desc(self, name: str, suid: int, flags: int, fields: list, super_desc=None) -> None:
+        """
+        fields are (type code, name, class name string or None); super_desc writes the superclass.
+        """
+        if self._reference(("class", name)):
+            return
+        self._out += b"\x72" + self._utf(name) + struct.pack(">q", suid)
+        self._assign(("class", name))
+        self._out += bytes([flags]) + struct.pack(">H", len(fields))
+        for type_code, field_name, class_name in fields:
+            self._out += type_code.encode() + self._utf(field_name)
+            if class_name:
+                self._string(class_name)
+        self._out += b"\x78"
+        if super_desc:
+            super_desc()
+        else:
+            self._out += b"\x70"
+
+    def _number_desc(self) -> None:
+        self._class_desc("java.lang.Number", -8742448824652078965, 0x02, [])
+
+    def _big_integer(self, value: int) -> None:
+        self._out += b"\x73"
+        self._class_desc(
+            "java.math.BigInteger", -8287574255936472291, 0x03,
+            [("I", "bitCount", None), ("I", "bitLength", None), ("I", "firstNonzeroByteNum", None),
+             ("I", "lowestSetBit", None), ("I", "signum", None), ("[", "magnitude", "[B")],
+            self._number_desc,
+        )
+        self._assign()
+        magnitude = abs(value).to_bytes((abs(value).bit_length() + 7) // 8, "big")
+        self._out += struct.pack(">iiiii", -1, -1, -2, -2, (value > 0) - (value < 0))
+        self._out += b"\x75"
+        self._class_desc("[B", -5984413125824719648, 0x02, [])
+        self._assign()
+        self._out += struct.pack(">i", len(magnitude)) + magnitude + b"\x78"
+
+    def _big_decimal(self, value: BigDecimal) -> None:
+        self._out += b"\x73"
+        self._class_desc(
+            "java.math.BigDecimal", 6108874887143696463, 0x03,
+            [("I", "scale", None), ("L", "intVal", "Ljava/math/BigInteger;")],
+            self._number_desc,
+        )
+        self._assign()
+        self._out += struct.pack(">i", value.scale)
+        self._big_integer(value.unscaled)
+        self._out += b"\x78"
+
+    def _boxed(self, value: Boxed) -> None:
+        type_code, suid = Boxed.CLASSES[value.class_name]
+        self._out += b"\x73"
+        self._class_desc(f"java.lang.{value.class_name}", suid, 0x02, [(type_code, "value", None)], self._number_desc)
+        self._assign()
+        self._out += struct.pack(">" + {"I": "i", "J": "q", "D": "d"}[type_code], value.value)
+
+    def _timestamp(self, value: Timestamp) -> None:
+        self._out += b"\x73"
+        self._class_desc(
+            "java.sql.Timestamp", 2745179027874758501, 0x02, [("I", "nanos", None)],
+            lambda: self._class_desc("java.util.Date", 7523967970034938905, 0x03, []),
+        )
+        self._assign()
+        seconds_ms = value.epoch_ms // 1000 * 1000
+        # Date's writeObject data, then Timestamp's fields
+        self._out += bytes([0x77, 8]) + struct.pack(">q", seconds_ms) + b"\x78"
+        self._out += struct.pack(">i", (value.epoch_ms - seconds_ms) * 1_000_000)
+
+    def write_object(self, value) -> None:
+        self._flush()
+        if value is None:
+            self._out += b"\x70"
+        elif isinstance(value, str):
+            self._string(value)
+        elif isinstance(value, BigDecimal):
+            self._big_decimal(value)
+        elif isinstance(value, Boxed):
+            self._boxed(value)
+        elif isinstance(value, Timestamp):
+            self._timestamp(value)
+        else:
+            raise TypeError(f"Cannot serialize {value!r}")
+
+    def getvalue(self) -> bytes:
+        self._flush()
+        return bytes(self._out)
+
+
+# Block-data format of each value type code (see app/services/jmxdata.py); None means readObject
+VALUE_FORMATS = {1: "b", 2: "h", 3: "i", 4: "q", 5: "f", 6: "d", 7: "?", 8: "q", 9: None, 10: None}
+
+
+def write_jmxdata(path: Path, tables: list) -> None:
+    """
+    Write tables as ConvertPerfToCsv.convertAllMembers reads them:
+    tables are (name, columns, rows) and each row is a list of (type code, value).
+    """
+    writer = ObjectStreamWriter()
+    for part in (13, 0, 1, 2):
+        writer.write("i", part)
+    writer.write_object("M030")
+
+    for name, columns, rows in tables:
+        writer.write_object(name)
+        writer.write("i", len(columns))
+        for column in columns:
+            writer.write_object(column)
+        for row in rows:
+            writer.write("?", True)
+            for type_code, value in row:
+                writer.write("b", type_code)
+                if type_code == 0:
+                    continue
+                if VALUE_FORMATS[type_code] is None:
+                    writer.write_object(value)
+                else:
+                    writer.write(VALUE_FORMATS[type_code], value)
+        writer.write("?", False)
+
+    with gzip.open(path, "wb") as gz:
+        gz.write(writer.getvalue())
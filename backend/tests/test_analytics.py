@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+
+import pytest
+
+import app.services.analytics as analytics
+import app.services.config as config
+from app.services.connections import write_connection
+
+pytest.importorskip("duckdb")
+
+# Mixed storage classes: integers in a REAL column, numbers and text in a TEXT column
+COLUMNS = "LE_TIMESTAMP INTEGER, JVM_ID TEXT, ELAPSED REAL, VALUE TEXT"
+ROWS = [(1000 + i, f"j{i % 3}", i if i % 2 else i / 4, None if i % 5 == 0 else i if i % 3 else f"v{i}") for i in range(500)]
+QUERY = """
+    SELECT JVM_ID, COUNT(*) AS n, SUM(ELAPSED) AS elapsed, COUNT(VALUE) AS n_value,
+           MAX(LE_TIMESTAMP) AS last_ts, MIN(CAST(VALUE AS VARCHAR)) AS first_value
+    FROM "{table}"
+    GROUP BY JVM_ID
+    ORDER BY JVM_ID
+"""
+
+
+@pytest.fixture
+def duckdb_engine(dataset, monkeypatch):
+    """
+    The duckdb engine with a fresh DuckDB; yields set_budget(mb) for analyticsMemoryMb.
+    """
+    monkeypatch.setattr(analytics, "_duckdb", None)
+    monkeypatch.setattr(analytics, "_loaded", OrderedDict())
+    monkeypatch.setattr(analytics, "_table_locks", {})
+    monkeypatch.setattr(config, "_cached_config", dict(config.load_config(), analyticsEngine="duckdb"))
+    dataset("t_A", COLUMNS, ROWS)
+    dataset("t_B", COLUMNS, ROWS[:100])
+
+    def set_budget(mb: float) -> None:
+        config._cached_config["analyticsMemoryMb"] = mb
+
+    yield set_budget
+    analytics.close_analytics()
+
+
+def _loaded_in_duckdb() -> set[str]:
+    return {row[0] for row in analytics._database().execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+
+
+@pytest.mark.parametrize("table", ["t_A", "t_B"])
+def test_duckdb_matches_sqlite(duckdb_engine, table):
+    query = QUERY.format(table=table)
+    assert analytics._run_duckdb(query, [table], []) == analytics._run_sqlite(query, [])
+
+
+def test_replaced_table_is_reloaded(duckdb_engine):
+    query = QUERY.format(table="t_A")
+    analytics._run_duckdb(query, ["t_A"], [])
+    with write_connection("t") as conn:
+        conn.execute('DELETE FROM "t_A" WHERE LE_TIMESTAMP > 1100')
+        conn.commit()
+    assert analytics._run_duckdb(query, ["t_A"], []) == analytics._run_sqlite(query, [])
+
+
+def test_copies_beyond_the_budget_are_dropped(duckdb_engine):
+    duckdb_engine(1)
+    analytics._run_duckdb(QUERY.format(table="t_A"), ["t_A"], [])
+    analytics._run_duckdb(QUERY.format(table="t_B"), ["t_B"], [])
+    assert list(analytics._loaded) == ["t_a", "t_b"]
+    assert all(size > 0 for _, size in analytics._loaded.values())
+
+    # Tables of the running query are kept even when they alone exceed the budget
+    duckdb_engine(0)
+    analytics._run_duckdb(QUERY.format(table="t_B"), ["t_B"], [])
+    assert list(analytics._loaded) == ["t_b"]
+    assert _loaded_in_duckdb() == {"t_b"}
+    assert analytics._run_duckdb(QUERY.format(table="t_A"), ["t_A"], []) == analytics._run_sqlite(QUERY.format(table="t_A"), [])
+
+
+def test_loads_of_other_tables_do_not_wait(duckdb_engine):
+    results = []
+    # A load of t_A in progress holds only t_A's lock
+    with analytics._table_lock("t_a"):
+        worker = threading.Thread(
+            target=lambda: results.append(analytics._run_duckdb(QUERY.format(table="t_B"), ["t_B"], []))
+        )
+        worker.start()
+        worker.join(timeout=30)
+        assert not worker.is_alive()
+    assert results == [analytics._run_sqlite(QUERY.format(table="t_B"), [])]
@@ -0,0 +1,52 @@
+import os
+import time
+
+import app.services.archive as archive
+import app.services.config as config
+import app.services.connections as connections
+from app.api.endpoints.delete import delete_data
+from app.services.connections import write_connection
+
+
+def _folder_database(folder: str) -> None:
+    with write_connection(folder) as conn:
+        conn.execute(f'CREATE TABLE "{folder}_A" (LE_TIMESTAMP INTEGER)')
+        conn.commit()
+
+
+def test_deleting_the_active_folder_clears_the_active_dataset(dataset):
+    dataset("t_A", "LE_TIMESTAMP INTEGER", [(1,)])
+    _folder_database("other")
+
+    delete_data({"folders": ["other"]})
+    assert connections.active_dataset() == {"folder": "t", "tables": []}
+
+    delete_data({"folders": ["t"]})
+    assert connections.active_dataset() == {"folder": None, "tables": []}
+    assert not connections.folder_db_path("t").exists()
+
+
+def test_auto_delete_removes_old_folder_databases_and_archives(dataset, tmp_path, monkeypatch):
+    uploads = tmp_path / "uploads"
+    monkeypatch.setattr(config, "UPLOAD_DIR", uploads)
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path / "output_csv")
+    monkeypatch.setattr(config, "LOG_DIR", tmp_path / "logs")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    config.save_config(dict(config.load_config(), autoDelete=True, days=7))
+
+    old = time.time() - 30 * 86_400
+    for folder in ["old", "new", "t"]:
+        (uploads / folder).mkdir(parents=True)
+        _folder_database(folder)
+        (tmp_path / "archive" / folder).mkdir(parents=True)
+    for folder in ["old", "t"]:
+        os.utime(uploads / folder, (old, old))
+
+    config.auto_delete_data()
+
+    assert sorted(p.name for p in uploads.iterdir()) == ["new", "t"]
+    assert sorted(p.name for p in (tmp_path / "archive").iterdir()) == ["new", "t"]
+    assert not list(connections.FOLDER_DB_DIR.glob("old.db*"))
+    # The active upload is kept however old it is
+    assert connections.folder_db_path("t").exists() and connections.folder_db_path("new").exists()
+    assert connections.active_folder() == "t"
@@ -0,0 +1,190 @@
+import csv
+import json
+import random
+import shutil
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+import app.services.connections as connections
+from app.services.converter import CONVERTER_CLASS, compile_converter
+from app.services.database import import_jmxdata_to_sqlite
+from app.services.jmxdata import iter_jmxdata_tables
+from jmxdata_stream import BigDecimal, Boxed, Timestamp, write_jmxdata
+
+BASE_MS = 1_735_689_600_000  # 2025-01-01 00:00 UTC
+
+
+def _tables() -> list:
+    """
+    (name, columns, rows) with every value type code, enough rows to span many block-data
+    records, and columns that widen partway through the table.
+    """
+    rng = random.Random(5)
+    stats = []
+    for i in range(2500):
+        stats.append([
+            (8, BASE_MS + i * 60_000),
+            (10, f"jvm{i % 3}"),
+            (3, rng.randint(-5, 500)),
+            (6, rng.random() * 100),
+            (0, None) if i % 7 == 0 else (4, 2**40 + i),
+            (9, BigDecimal(rng.randint(-10**12, 10**12), rng.randint(-2, 4))),
+            (7, i % 2 == 0),
+            (5, rng.choice([0.1, -2.5, 3.4028235e38, 1e-5])),
+            (2, -7 * i % 32_000),
+            (1, i % 256 - 128),
+            (10, 'has,comma "quoted"' if i % 5 == 0 else None),
+            (10, Boxed("Integer", i) if i % 3 else Boxed("Double", i / 8)),
+        ])
+    stats_columns = ["LE_TIMESTAMP", "JVM_ID", "ACTIVECONTEXTSMAX", "D", "L", "BD", "B", "F", "S", "BY", "TXT", "BOXED"]
+
+    text = [
+        [(10, value)]
+        for value in ["plain", "nul\x00byte", "é and ß", "emoji 😀 pair", "line\nbreak", "x" * 70_000, "", None, "plain"]
+    ]
+    timestamps = [[(10, Timestamp(BASE_MS + i * 86_400_123))] for i in range(20)]
+
+    # A: int -> text, B: null -> double, C: int -> long -> double, D: double -> text
+    widening = []
+    for i in range(60):
+        widening.append([
+            (10, "0123") if i == 40 else (3, i),
+            (6, i / 4) if i >= 30 else (0, None),
+            (3, i) if i < 20 else (4, 2**40 + i) if i < 45 else (6, i + 0.5),
+            (10, "n/a") if i == 55 else (6, i * 1.5),
+        ])
+
+    return [
+        ("MSHealthStats", stats_columns, stats),
+        ("Text", ["VALUE"], text),
+        ("Timestamps", ["WHEN"], timestamps),
+        ("Widening", ["A", "B", "C", "D"], widening),
+        ("Empty", ["A"], []),
+    ]
+
+
+def _expected(value):
+    # What the decoder yields for a serialized value
+    if isinstance(value, BigDecimal):
+        if value.scale <= 0:
+            return value.unscaled * 10 ** -value.scale
+        return float(f"{value.unscaled}e-{value.scale}")
+    if isinstance(value, Boxed):
+        return value.value
+    if isinstance(value, Timestamp):
+        return value.epoch_ms
+    return value
+
+
+@pytest.fixture
+def jmxdata(tmp_path):
+    path = tmp_path / "JMXData.gz"
+    write_jmxdata(path, _tables())
+    return path
+
+
+def test_rows_round_trip(jmxdata):
+    tables = {name: (columns, rows) for name, columns, rows in _tables()}
+    seen = []
+    for table in iter_jmxdata_tables(jmxdata):
+        columns, rows = tables[table.name]
+        assert table.columns == columns
+        decoded = [row for batch in table.batches(batch_size=97) for row in batch]
+        assert decoded == [tuple(_expected(value) for _, value in row) + (0,) for row in rows]
+        assert table.row_count == len(rows)
+        seen.append(table.name)
+    assert seen == list(tables)
+
+
+def test_unread_tables_are_skipped(jmxdata):
+    # Tables nobody reads are skipped by the iterator, and the next one still decodes
+    for table in iter_jmxdata_tables(jmxdata):
+        if table.name == "Widening":
+            rows = [row for batch in table.batches() for row in batch]
+            break
+    assert rows[40] == ("0123", 40 / 4, 2**40 + 40, 60.0, 0)
+
+
+def test_column_types_widen_like_the_converter(jmxdata):
+    types = {}
+    for table in iter_jmxdata_tables(jmxdata):
+        table.skip()
+        types[table.name] = table.column_types()
+    assert types["MSHealthStats"] == ["INTEGER", "TEXT", "INTEGER", "REAL", "INTEGER", "REAL", "INTEGER", "REAL",
+                                      "INTEGER", "INTEGER", "TEXT", "TEXT", "INTEGER"]
+    assert types["Widening"] == ["TEXT", "REAL", "REAL", "TEXT", "INTEGER"]
+    assert types["Empty"] == ["", "INTEGER"]
+
+
+def _java_cell(value) -> str:
+    # The CSV text ConvertPerfToCsv writes for a decoded value (numbers compared by value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+@pytest.mark.skipif(shutil.which("java") is None, reason="needs a JVM to run ConvertPerfToCsv")
+def test_rows_match_java_converter(jmxdata, tmp_path):
+    if not compile_converter() or not CONVERTER_CLASS.exists():
+        pytest.skip("Java converter could not be compiled")
+    # Run from tmp_path/run so the converter's log (../backend/logs) stays under tmp_path
+    (tmp_path / "run").mkdir()
+    out_dir = tmp_path / "csv"
+    subprocess.run(
+        ["java", "-Duser.timezone=UTC", "-cp", str(CONVERTER_CLASS.parent), "ConvertPerfToCsv", str(jmxdata), str(out_dir)],
+        cwd=tmp_path / "run", check=True, capture_output=True,
+    )
+    timestamp_tables = {"Timestamps"}
+
+    for table in iter_jmxdata_tables(jmxdata):
+        decoded = [row for batch in table.batches() for row in batch]
+        with open(out_dir / f"{table.name}.csv", encoding="utf-8", newline="") as f:
+            header, *cells = list(csv.reader(f))
+        assert header == table.columns + ["latestSample"]
+        assert len(cells) == len(decoded)
+        for row, csv_row in zip(decoded, cells):
+            for value, cell in zip(row, csv_row):
+                if table.name in timestamp_tables and value is not None:
+                    parsed = datetime.strptime(cell[:23], "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+                    assert round(parsed.timestamp() * 1000) == value
+                elif isinstance(value, float):
+                    assert float(cell) == value
+                elif isinstance(value, int) and not isinstance(value, bool):
+                    assert Decimal(cell) == value  # BigDecimals with a negative scale print as 1.2E+5
+                else:
+                    assert cell == _java_cell(value)
+
+        schema = json.loads((out_dir / f"{table.name}.schema.json").read_text(encoding="utf-8"))
+        assert [column["code"] for column in schema["columns"][:-1]] == table.type_codes
+
+
+def _folder_rows(folder: str, table: str) -> tuple[list, list]:
+    conn = sqlite3.connect(connections.folder_db_path(folder))
+    try:
+        declared = [row[2] for row in conn.execute(f"PRAGMA table_info('{folder}_{table}')")]
+        columns = ", ".join(f'typeof("{row[1]}"), "{row[1]}"' for row in conn.execute(f"PRAGMA table_info('{folder}_{table}')"))
+        return declared, conn.execute(f"SELECT {columns} FROM '{folder}_{table}' ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+def test_import_types_match_single_batch(dataset, jmxdata):
+    # Small batches make columns widen after their table was created (the retype_table path)
+    batched = import_jmxdata_to_sqlite(jmxdata, "batched", batch_size=7)
+    whole = import_jmxdata_to_sqlite(jmxdata, "whole", batch_size=100_000)
+    assert [rows for _, rows in batched] == [rows for _, rows in whole] == [len(rows) for _, _, rows in _tables()]
+
+    for name, _, _ in _tables():
+        assert _folder_rows("batched", name) == _folder_rows("whole", name)
+
+    declared, rows = _folder_rows("batched", "Widening")
+    assert declared == ["TEXT", "REAL", "REAL", "TEXT", "INTEGER"]
+    assert rows[40][:2] == ("text", "0123")
+    assert rows[0][:4] == ("text", "0", "null", None)
+    assert [row[4] for row in rows[:46:15]] == ["real"] * 4
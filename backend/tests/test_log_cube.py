@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from app.services.connections import active_folder, read_connection, write_connection
+from app.services.log_cube import HOUR_MS, build_log_cube, log_event_counts
+
+TABLE = "t_MiscLogEvents"
+BASE_MS = 1_735_689_600_000  # 2025-01-01 00:00 UTC
+
+RANGES = [
+    (None, None),
+    (BASE_MS + 7 * HOUR_MS, BASE_MS + 30 * HOUR_MS - 1),  # whole hours only
+    (BASE_MS + 7 * HOUR_MS + 1_234, BASE_MS + 30 * HOUR_MS + 987_654),  # partial hours at both edges
+    (BASE_MS + 7 * HOUR_MS + 1_234, None),
+    (None, BASE_MS + 30 * HOUR_MS + 987_654),
+    (BASE_MS + 5 * HOUR_MS + 60_000, BASE_MS + 5 * HOUR_MS + 120_000),  # inside a single hour
+    (BASE_MS + 5 * HOUR_MS + 60_000, BASE_MS + 6 * HOUR_MS + 1),  # edges in adjacent hours
+]
+
+# (filters, params) on LE_LEVEL/JVM_ID
+FILTERS = [
+    ([], []),
+    (["JVM_ID = ?"], ["j2"]),
+    (["LE_LEVEL IN (?, ?)", "JVM_ID = ?"], ["ERROR", "WARN", "j1"]),
+]
+
+
+@pytest.fixture
+def log_events(dataset):
+    rng = random.Random(3)
+    rows = [
+        (
+            None if i % 97 == 0 else BASE_MS + rng.randrange(0, 48 * HOUR_MS),
+            rng.choice(["ERROR", "WARN", "INFO"]),
+            rng.choice(["wt.a", "wt.b", None]),
+            rng.choice(["j1", "j2", None]),
+        )
+        for i in range(4000)
+    ]
+    dataset(TABLE, "LE_TIMESTAMP INTEGER, LE_LEVEL TEXT, LE_LOGGERNAME TEXT, JVM_ID TEXT", rows)
+    with write_connection(active_folder()) as conn:
+        return build_log_cube(conn, TABLE, TABLE)
+
+
+def _counts(sql: str, params: list) -> dict:
+    conn = read_connection()
+    try:
+        query = f"SELECT LE_LOGGERNAME, LE_LEVEL, SUM(n) FROM ({sql}) GROUP BY LE_LOGGERNAME, LE_LEVEL"
+        return {(row[0], row[1]): row[2] for row in conn.execute(query, params)}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("start_ms, end_ms", RANGES)
+@pytest.mark.parametrize("filters, params", FILTERS)
+def test_cube_counts_match_raw_counts(raw, log_events, start_ms, end_ms, filters, params):
+    assert log_events is not None
+    where, where_params = list(filters), list(params)
+    if start_ms is not None:
+        where.append("LE_TIMESTAMP >= ?")
+        where_params.append(start_ms)
+    if end_ms is not None:
+        where.append("LE_TIMESTAMP <= ?")
+        where_params.append(end_ms)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    expected = {
+        (row[0], row[1]): row[2]
+        for row in raw.execute(
+            f'SELECT LE_LOGGERNAME, LE_LEVEL, COUNT(*) FROM "{TABLE}" {where_sql} GROUP BY 1, 2', where_params
+        )
+    }
+
+    sql, sql_params, tables = log_event_counts(
+        TABLE, log_events, "LE_LOGGERNAME, LE_LEVEL", filters, params, start_ms, end_ms
+    )
+    assert _counts(sql, sql_params) == expected
+
+    # Only the partial hours at the edges read the table itself
+    partial_start = start_ms is not None and start_ms % HOUR_MS != 0
+    partial_end = end_ms is not None and (end_ms + 1) % HOUR_MS != 0
+    assert (TABLE in tables) == (partial_start or partial_end)
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+import app.api.endpoints.charts.active_contexts as active_contexts
+import app.api.endpoints.charts.active_sessions_summary as active_sessions_summary
+import app.api.endpoints.charts.active_users as active_users
+
+TABLE = "t_SMHealthStats"
+SESSIONS = "t_ServletSessionStats"
+BASE_MS = 1_735_689_600_000  # 2025-01-01 00:00 UTC
+
+
+@pytest.fixture
+def stats(dataset):
+    dataset(
+        TABLE,
+        "LE_TIMESTAMP INTEGER, JVM_ID TEXT, ACTIVECONTEXTSMAX INTEGER",
+        [(BASE_MS + i * 60_000, f"j{i % 2}", i) for i in range(10)],
+    )
+    dataset(
+        SESSIONS,
+        "LE_TIMESTAMP INTEGER, JVM_ID TEXT, ACTIVESESSIONSMAX INTEGER, SESSIONSCREATED INTEGER, "
+        "SESSIONSDESTROYED INTEGER, SESSIONSACTIVATED INTEGER, SESSIONSPASSIVATED INTEGER, ELAPSEDSECONDS REAL",
+        [(BASE_MS + i * 60_000, f"j{i % 2}", i, 1, 1, 0, 0, 0.5) for i in range(10)],
+    )
+
+
+@pytest.fixture
+def failing_once(monkeypatch):
+    """
+    Make the next pd.read_sql_query call fail, like a locked or half-swapped table would.
+    """
+    real = pd.read_sql_query
+    calls = []
+
+    def read_sql_query(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_sql_query", read_sql_query)
+    return calls
+
+
+@pytest.mark.parametrize("call, empty", [
+    (lambda: active_contexts.fetch_active_context_chart(TABLE), "rows"),
+    (lambda: active_contexts.fetch_active_contexts_by_jvm(TABLE), "rows"),
+    (lambda: active_sessions_summary.active_sessions_graph(), "nodes"),
+    (lambda: active_users.active_users_jvms(), "jvms"),
+])
+def test_failures_are_not_cached(stats, failing_once, call, empty):
+    failed = call()
+    assert "error" in failed and not failed[empty]
+    answered = call()
+    assert "error" not in answered and answered[empty]
+    assert call() is answered  # the answer is cached
+
+
+def test_summary_failure_is_not_cached(stats, monkeypatch):
+    real = active_sessions_summary.run_aggregate
+
+    def run_aggregate(*args, **kwargs):
+        monkeypatch.setattr(active_sessions_summary, "run_aggregate", real)
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(active_sessions_summary, "run_aggregate", run_aggregate)
+    assert "error" in active_sessions_summary.active_sessions_summary()
+    assert active_sessions_summary.active_sessions_summary()["summary"]["total_samples"] == 10
@@ -0,0 +1,110 @@
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from app.services.connections import active_folder, read_connection, write_connection
+from app.services.rollups import build_rollups, rollup_query
+
+TABLE = "t_SMHealthStats"
+BASE_MS = 1_735_689_600_000  # 2025-01-01 00:00 UTC
+
+# (start_date, end_date) the rollups can answer: aligned to their day, hour or minute buckets
+ALIGNED = [
+    (None, None),
+    ("2025-01-02", "2025-01-03"),
+    ("2025-01-01 05:00:00", "2025-01-02 17:00:00"),
+    ("2025-01-01 10:30:00", "2025-01-03 02:17:00"),
+    (None, "2025-01-02 08:41:00"),
+    ("2025-01-02 23:59:00", None),
+]
+
+
+@pytest.fixture
+def health_stats(dataset):
+    # A sample every 7m13s for 3 days (so some land exactly on bucket bounds), NULL gauges and timestamps
+    rng = random.Random(11)
+    rows = []
+    for i in range(600):
+        timestamp = None if i % 53 == 0 else BASE_MS + i * 433_000
+        rows.append((timestamp, rng.choice(["j1", "j2", None]), rng.choice([None, rng.randrange(100)])))
+    rows.append((BASE_MS + 86_400_000, "j1", 1000))  # exactly at 2025-01-02 00:00
+    dataset(TABLE, "LE_TIMESTAMP INTEGER, JVM_ID TEXT, ACTIVECONTEXTSMAX INTEGER", rows)
+    with write_connection(active_folder()) as conn:
+        assert build_rollups(conn, TABLE, TABLE)
+
+
+def _raw_chart(raw, granularity: str, start_date, end_date, by_jvm: bool, jvm, limit: int) -> pd.DataFrame:
+    # The chart endpoints' raw queries (see charts/active_contexts.py), with an optional JVM filter
+    label = {
+        "hourly": "strftime('%Y-%m-%d %H:00:00', LE_TIMESTAMP / 1000, 'unixepoch')",
+        "daily": "date(LE_TIMESTAMP / 1000, 'unixepoch')",
+    }[granularity]
+    where, params = [], []
+    if start_date:
+        where.append("LE_TIMESTAMP >= strftime('%s', ?) * 1000")
+        params.append(start_date)
+    if end_date:
+        where.append("LE_TIMESTAMP <= strftime('%s', ?) * 1000")
+        params.append(end_date)
+    if jvm is not None:
+        where.append("JVM_ID = ?")
+        params.append(jvm)
+    query = f"""
+        SELECT {label} AS bucket, {"JVM_ID, " if by_jvm else ""}MAX(ACTIVECONTEXTSMAX) AS max_active,
+               MAX(LE_TIMESTAMP) AS last_ts
+        FROM "{TABLE}"
+        {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY bucket{", JVM_ID" if by_jvm else ""}
+        ORDER BY bucket
+        LIMIT ?
+    """
+    return pd.read_sql_query(query, raw, params=params + [limit])
+
+
+def _records(frame: pd.DataFrame) -> list[tuple]:
+    def plain(value):
+        return None if value is None or (isinstance(value, float) and math.isnan(value)) else float(value) if isinstance(value, (int, float)) else value
+
+    records = [tuple(plain(value) for value in row) for row in frame.itertuples(index=False)]
+    return sorted(records, key=lambda record: tuple((value is None, str(value)) for value in record))
+
+
+@pytest.mark.parametrize("granularity", ["hourly", "daily"])
+@pytest.mark.parametrize("start_date, end_date", ALIGNED)
+@pytest.mark.parametrize("by_jvm, jvm", [(True, None), (False, None), (True, "j2"), (False, "j1")])
+def test_rollup_matches_raw_query(raw, health_stats, granularity, start_date, end_date, by_jvm, jvm):
+    conn = read_connection()
+    try:
+        frame = rollup_query(
+            conn, TABLE, "ACTIVECONTEXTSMAX", "max_active", granularity, start_date, end_date, 10_000, by_jvm, jvm
+        )
+    finally:
+        conn.close()
+    assert frame is not None
+    expected = _raw_chart(raw, granularity, start_date, end_date, by_jvm, jvm, 10_000)
+    assert list(frame.columns) == list(expected.columns)
+    assert _records(frame) == _records(expected)
+
+
+def test_rollup_limit_keeps_first_buckets(raw, health_stats):
+    conn = read_connection()
+    try:
+        frame = rollup_query(conn, TABLE, "ACTIVECONTEXTSMAX", "max_active", "hourly", "2025-01-01 10:30:00", None, 7, False)
+    finally:
+        conn.close()
+    assert _records(frame) == _records(_raw_chart(raw, "hourly", "2025-01-01 10:30:00", None, False, None, 7))
+
+
+@pytest.mark.parametrize("granularity, start_date, end_date", [
+    ("hourly", "2025-01-01 10:30:15", None),
+    ("daily", None, "2025-01-02 08:41:07"),
+    ("raw", None, None),
+])
+def test_rollup_declines_what_it_cannot_answer(health_stats, granularity, start_date, end_date):
+    conn = read_connection()
+    try:
+        assert rollup_query(conn, TABLE, "ACTIVECONTEXTSMAX", "max_active", granularity, start_date, end_date) is None
+    finally:
+        conn.close()
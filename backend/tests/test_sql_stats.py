@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+import app.services.sql_stats as sql_stats
+
+TABLE = "t_TopSQLStats"
+BASE_MS = 1_735_689_600_000  # 2025-01-01 00:00 UTC
+
+# (fetch_top_sql_stats filters, reference WHERE, reference params)
+FILTERS = [
+    ({}, "", []),
+    ({"jvm_id": "j1"}, "WHERE JVM_Id = ?", ["j1"]),
+    (
+        {"start_time": str(BASE_MS + 1_234_567), "end_time": str(BASE_MS + 50_000_017), "jvm_id": "j2", "min_secs": 0.7},
+        "WHERE LE_Timestamp >= ? AND StartTime <= ? AND JVM_Id = ? AND ElapsedSeconds >= ?",
+        [str(BASE_MS + 1_234_567), str(BASE_MS + 50_000_017), "j2", 0.7],
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(sql_stats, "_totals", type(sql_stats._totals)())
+    monkeypatch.setattr(sql_stats, "_anchors", type(sql_stats._anchors)())
+    monkeypatch.setattr(sql_stats, "_indexes", type(sql_stats._indexes)())
+
+
+@pytest.fixture
+def top_sql(dataset):
+    # Few distinct sort key values and many NULLs, so ties and NULL ordering are exercised
+    rng = random.Random(7)
+    rows = []
+    for _ in range(1500):
+        start = rng.choice([None, BASE_MS + rng.randrange(0, 60_000_000, 600_000)])
+        rows.append((
+            rng.choice([None, start]),
+            start,
+            rng.choice([None, 0.5, 1.5, 2.5, 9.0]),
+            round(rng.random() * 3, 2),
+            rng.choice(["j1", "j2"]),
+            "SELECT 1",
+        ))
+    dataset(
+        TABLE,
+        "LE_Timestamp INTEGER, StartTime INTEGER, MaxSeconds REAL, ElapsedSeconds REAL, JVM_Id TEXT, SQLText TEXT",
+        rows,
+    )
+
+
+def _expected(raw, sort: bool, where: str, params: list, page: int, page_size: int) -> list[dict]:
+    order = ", ".join(f"{sql_stats._q(column)} {direction}" for column, direction in sql_stats.SORT_KEYS[sort])
+    query = f'SELECT * FROM "{TABLE}" {where} ORDER BY {order} LIMIT ? OFFSET ?'
+    return [dict(row) for row in raw.execute(query, params + [page_size, (page - 1) * page_size])]
+
+
+def _fetch(filters: dict, sort: bool, page: int = 1, page_size: int = 37, cursor=None) -> dict:
+    arguments = {"start_time": None, "end_time": None, "jvm_id": None, "jvm_start_time": None, "min_secs": None}
+    arguments.update(filters)
+    return sql_stats.fetch_top_sql_stats(
+        **arguments, sort_by_elapsed_time=sort, page=page, page_size=page_size, cursor=cursor
+    )
+
+
+@pytest.mark.parametrize("sort", [True, False])
+def test_after_matches_sort_order(raw, top_sql, sort):
+    keys = sql_stats.SORT_KEYS[sort]
+    order = ", ".join(f"{sql_stats._q(column)} {direction}" for column, direction in keys)
+    columns = ", ".join(sql_stats._q(column) for column, _ in keys)
+    ordered = raw.execute(f'SELECT {columns} FROM "{TABLE}" ORDER BY {order}').fetchall()
+    expected_rowids = [row["rowid"] for row in ordered]
+
+    for position in range(0, len(ordered), 97):
+        values = list(ordered[position])
+        where, params = sql_stats._after(keys, values)
+        after = [row[0] for row in raw.execute(f'SELECT rowid FROM "{TABLE}" WHERE {where} ORDER BY {order}', params)]
+        assert after == expected_rowids[position + 1:]
+
+        segmented = []
+        for where, params in sql_stats._segments(keys, values):
+            segmented += [row[0] for row in raw.execute(f'SELECT rowid FROM "{TABLE}" WHERE {where} ORDER BY {order}', params)]
+        assert segmented == expected_rowids[position + 1:]
+
+
+@pytest.mark.parametrize("sort", [True, False])
+@pytest.mark.parametrize("filters, where, params", FILTERS)
+def test_cursor_walk_matches_offset_pages(raw, top_sql, sort, filters, where, params):
+    cursor, page = None, 1
+    while True:
+        result = _fetch(filters, sort, cursor=cursor)
+        assert result["results"] == _expected(raw, sort, where, params, page, 37)
+        if not result["next_cursor"]:
+            break
+        cursor, page = result["next_cursor"], page + 1
+    assert result["total"] == raw.execute(f'SELECT COUNT(*) FROM "{TABLE}" {where}', params).fetchone()[0]
+
+
+@pytest.mark.parametrize("sort", [True, False])
+@pytest.mark.parametrize("filters, where, params", FILTERS)
+def test_page_jumps_match_offset_pages(raw, top_sql, monkeypatch, sort, filters, where, params):
+    # A small stride makes most jumps start from the anchor index
+    monkeypatch.setattr(sql_stats, "ANCHOR_STRIDE", 50)
+    for page in [5, 3, 1, 2, 3, 4, 30, 12, 41, 40, 60, 2, 25]:
+        assert _fetch(filters, sort, page=page)["results"] == _expected(raw, sort, where, params, page, 37)
+
+
+def test_invalid_cursor(top_sql):
+    assert _fetch({}, True, cursor="not a cursor")["error"] == "Invalid cursor"
@@ -0,0 +1,123 @@
+import gzip
+import shutil
+import sqlite3
+import zipfile
+
+import pytest
+
+import app.api.endpoints.upload as upload
+import app.services.archive as archive
+import app.services.config as config
+import app.services.connections as connections
+import app.services.ingest_manifest as ingest_manifest
+import app.services.upload_manifest as upload_manifest
+from app.services.jobs import IngestJob
+from app.services.preview import preview_folder
+from jmxdata_stream import write_jmxdata
+
+BASE_MS = 1_735_689_600_000  # 2025-01-01 00:00 UTC
+TABLES = [
+    (name, ["LE_TIMESTAMP", "JVM_ID", "VALUE"], [[(8, BASE_MS + i * 60_000), (10, f"j{i % 2}"), (3, i)] for i in range(rows)])
+    for name, rows in [("First", 300), ("Second", 400)]
+]
+
+
+@pytest.fixture
+def upload_env(dataset, tmp_path, monkeypatch):
+    """
+    Upload outputs, manifests and routed files under tmp_path; yields configure(**options)
+    for config.json.
+    """
+    monkeypatch.setattr(upload, "OUTPUT_DIR", tmp_path / "output_csv")
+    monkeypatch.setattr(upload, "ROUTED_EXTENSIONS", {".log": tmp_path / "server_logs", ".properties": tmp_path / "properties"})
+    monkeypatch.setattr(upload, "archive_cold_folders", lambda: [])
+    monkeypatch.setattr(ingest_manifest, "INGEST_MANIFEST_PATH", tmp_path / "ingest_manifest.json")
+    monkeypatch.setattr(upload_manifest, "UPLOAD_MANIFEST_PATH", tmp_path / "upload_manifest.json")
+    monkeypatch.setattr(archive, "FOLDER_ACTIVITY_PATH", tmp_path / "folder_activity.json")
+
+    def configure(**options) -> None:
+        config.save_config(dict(config.load_config(), **options))
+
+    yield configure
+
+
+def _row_counts(folder: str, tables: list[str]) -> list[int]:
+    conn = sqlite3.connect(connections.folder_db_path(folder))
+    try:
+        return [conn.execute(f"SELECT COUNT(*) FROM '{table}'").fetchone()[0] for table in tables]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("converter", [
+    "python",
+    "parquet",
+    pytest.param("java", marks=pytest.mark.skipif(shutil.which("java") is None, reason="needs a JVM")),
+])
+def test_progressive_preview_starts_with_the_first_converted_table(upload_env, tmp_path, monkeypatch, converter):
+    upload_env(converter=converter, progressiveIngest=True, previewRows=50)
+    write_jmxdata(tmp_path / "JMXData.gz", TABLES)
+
+    activations = []
+    write_active_tables = upload._write_active_tables
+
+    def record(folder_name: str, tables: list[str], preview: bool = False) -> None:
+        write_active_tables(folder_name, tables, preview)
+        activations.append((sorted(tables), preview, _row_counts(folder_name, sorted(tables))))
+
+    monkeypatch.setattr(upload, "_write_active_tables", record)
+    job = IngestJob("up", "up.zip")
+    result = upload._convert_and_import(job, "up", tmp_path, [("MethodServer", tmp_path / "JMXData.gz")], "hash")
+
+    assert "error" not in result
+    # Each table's sample goes live as soon as it is converted, then the full import replaces them
+    assert activations == [
+        (["up_First"], True, [50]),
+        (["up_First", "up_Second"], True, [50, 50]),
+        (["up_First", "up_Second"], False, [300, 400]),
+    ]
+    assert preview_folder() is None
+    assert result["failed_tables"] == []
+
+
+def test_failed_direct_import_drops_its_previews(upload_env, tmp_path):
+    upload_env(converter="python", progressiveIngest=True, previewRows=50)
+    write_jmxdata(tmp_path / "JMXData.gz", TABLES)
+    # Cut the stream inside the second table
+    data = gzip.decompress((tmp_path / "JMXData.gz").read_bytes())
+    (tmp_path / "JMXData.gz").write_bytes(gzip.compress(data[:-200]))
+
+    job = IngestJob("up", "up.zip")
+    result = upload._convert_and_import(job, "up", tmp_path, [("MethodServer", tmp_path / "JMXData.gz")], "hash")
+
+    assert result["message"] == "Native converter failed"
+    assert preview_folder() is None
+    assert connections.active_dataset() == {"folder": "t", "tables": []}
+    conn = sqlite3.connect(connections.folder_db_path("up"))
+    try:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall() == []
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("members", [None, {"server.log": b"log line\n", "wt.properties": b"a=b\n"}])
+def test_upload_without_jmxdata_leaves_nothing_behind(upload_env, tmp_path, monkeypatch, members):
+    # None: not a zip at all; otherwise a zip without JMXData.gz
+    monkeypatch.setattr(upload, "UPLOAD_DIR", tmp_path / "uploads")
+    folder_name = upload._create_upload_folder_name()
+    folder_path = tmp_path / "uploads" / folder_name
+    folder_path.mkdir(parents=True)
+    zip_path = folder_path / "bundle.zip"
+    if members is None:
+        zip_path.write_bytes(b"not a zip")
+    else:
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            for name, data in members.items():
+                zf.writestr(f"MethodServer/{name}", data)
+
+    result = upload._process_upload(IngestJob(folder_name, zip_path.name), folder_name, folder_path, zip_path, "hash")
+
+    assert "error" in result
+    assert not folder_path.exists()
+    assert not any((directory / folder_name).exists() for directory in upload.ROUTED_EXTENSIONS.values())
+    assert upload._create_upload_folder_name() == folder_name
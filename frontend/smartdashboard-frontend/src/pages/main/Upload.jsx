@@ -7,8 +7,22 @@ export default function Upload() {
   const [details, setDetails] = useState(null);
   const [dragActive, setDragActive] = useState(false);
   const [loading, setLoading] = useState(false);
+  const [progress, setProgress] = useState(null);
   const navigate = useNavigate();
 
+  // ✅ Poll the ingest job until it completes or fails
+  const waitForJob = async (statusUrl) => {
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const res = await axios.get(`http://localhost:8000${statusUrl}`);
+      const job = res.data;
+      setProgress(job);
+      if (job.status === "completed" || job.status === "failed" || job.status === "unknown") {
+        return job;
+      }
+    }
+  };
+
   const handleFile = async (file) => {
     console.log("📂 Selected file:", file.name);
 
@@ -23,18 +37,27 @@ export default function Upload() {
     try {
       setLoading(true);
       setMessage("⏳ Uploading...");
+      setDetails(null);
+      setProgress(null);
       const res = await axios.post("http://localhost:8000/upload", formData, {
         headers: { "Content-Type": "multipart/form-data" },
       });
 
-      console.log("✅ Upload response:", res.data);
+      console.log("✅ Upload queued:", res.data);
 
-      setMessage(res.data.message);
-      setDetails({
-        converter_success: res.data.converter_success,
-        csv_count: res.data.csv_count,
-        tables: res.data.tables || [],
-      });
+      const job = await waitForJob(res.data.status_url);
+      const result = job.result || {};
+
+      console.log("✅ Upload job finished:", job);
+
+      setMessage(result.message || job.error || "❌ Upload failed.");
+      if (job.status === "completed") {
+        setDetails({
+          converter_success: result.converter_success,
+          csv_count: result.csv_count,
+          tables: result.tables || [],
+        });
+      }
 
       // ✅ Refresh Performance page if converter succeeded
       /*   if (res.data.converter_success && res.data.tables && res.data.tables.length > 0) {
@@ -48,6 +71,7 @@ export default function Upload() {
       setMessage("❌ Upload failed.");
     } finally {
       setLoading(false);
+      setProgress(null);
     }
   };
 
@@ -86,7 +110,16 @@ export default function Upload() {
         </div>
 
         {/* Message */}
-        {loading && <div className="upload-message">⏳ Uploading…</div>}
+        {loading && (
+          <div className="upload-message">
+            {progress
+              ? `⏳ ${progress.stage}${progress.current_table ? ` · ${progress.current_table}` : ""}` +
+                (progress.rows_done ? ` · ${progress.rows_done.toLocaleString()}${progress.rows_total ? ` / ${progress.rows_total.toLocaleString()}` : ""} rows` : "") +
+                (progress.rows_per_sec ? ` · ${Math.round(progress.rows_per_sec).toLocaleString()} rows/s` : "") +
+                (progress.eta_seconds != null ? ` · ETA ${Math.ceil(progress.eta_seconds)}s` : "")
+              : "⏳ Uploading…"}
+          </div>
+        )}
         {!loading && message && <div className="upload-message">{message}</div>}
 
         {/* Upload details */}